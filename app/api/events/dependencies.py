@@ -0,0 +1,87 @@
+from typing import Awaitable, Callable, Optional, Union
+from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import get_current_user, check_permissions
+from app.db.base import get_db
+from app.db.models.event import Event
+from app.db.models.user import User
+from app.db.repositories.event import EventRepository
+from app.db.repositories.permission import PermissionRepository
+from app.schemas.event import Event as EventSchema
+from app.services.event_cache import event_cache
+
+
+class EventAccess:
+    """the event a request targets together with the caller's role on it"""
+
+    __slots__ = ("event", "role", "user")
+
+    def __init__(self, event: Union[Event, EventSchema], role: str, user: User):
+        self.event = event
+        self.role = role
+        self.user = user
+
+
+def require_event_role(
+    min_role: str = "VIEWER",
+    hide_without_role: bool = False,
+    cached: bool = False,
+    skip_if_match: bool = False
+) -> Callable[..., Awaitable[Optional[EventAccess]]]:
+    """
+    Build a dependency that authorizes the current user on the `event_id` path parameter
+
+    The event and the caller's role are loaded with one query and handed to the route, which
+    must not look either up again. A missing event is a 404 and a role below min_role a 403;
+    with hide_without_role, users without any role get the same 404 as for a missing event.
+
+    With cached, the event comes from the event cache as a read-only schema and the role
+    from the permission cache, so a warm read does not query either table. Only routes
+    that do not write the event may use it.
+
+    With skip_if_match, a request carrying If-Match gets None without any lookup: the
+    route's conditional write checks the role and version itself and only falls back to
+    a diagnostic lookup when it matches nothing.
+    """
+    async def dependency(
+        event_id: str,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user),
+        if_match: Optional[str] = Header(None, include_in_schema=False),
+    ) -> Optional[EventAccess]:
+        if skip_if_match and if_match is not None:
+            return None
+
+        if cached:
+            event = await event_cache.get(event_id)
+            role = event and await PermissionRepository().get_role(
+                db,
+                event_id=event_id,
+                user_id=current_user.id
+            )
+        else:
+            event, role = await EventRepository().get_by_id_with_permissions(
+                db,
+                event_id=event_id,
+                user_id=current_user.id
+            )
+
+        if not event or (hide_without_role and not role):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=(
+                    "Event not found or you don't have permission to access it"
+                    if hide_without_role else "Event not found"
+                ),
+            )
+
+        if not role or not check_permissions(min_role, role):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions",
+            )
+
+        return EventAccess(event, role, current_user)
+
+    return dependency
@@ -1,74 +1,113 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
-
-from app.core.security import get_current_user
+import json
+import tempfile
+
+from app.core.config import settings
+from app.core.recurrence import as_utc
+from app.core.security import get_current_user, check_permissions
+from app.api.events.dependencies import EventAccess, require_event_role
+from app.core.utils import event_etag, list_etag, etag_matches
 from app.db.base import get_db
 from app.db.models.user import User
+from app.db.models.event import VERSIONED_FIELDS, FIELD_BITS, fields_from_mask
 from app.db.repositories.event import EventRepository
+from app.db.repositories.group import GroupRepository
 from app.db.repositories.permission import PermissionRepository
-from app.services.notification import get_notification_service, NotificationService
+from app.db.repositories.user import UserRepository
 from app.schemas.event import (
+    EVENT_FIELDS,
+    EVENT_PERMISSION_LIST,
+    AgendaItem,
     Event, 
     EventCreate, 
     EventUpdate, 
     EventBatch,
+    EventBatchDelete,
+    EventBatchItemResult,
+    EventBatchUpdate,
     EventPermission,
     EventShare,
     EventVersion,
     EventChangelog,
-    EventDiff
+    EventDiff,
+    dump_rows,
+    event_fields_adapter
 )
-from app.core.exceptions import ResourceNotFoundError, AuthorizationError, ConflictError
+from app.services.agenda import agenda_cache
+from app.services.calendar_io import export_calendar, read_ics
+from app.services.event_ingest import ingest_events, records_for
+from app.services.event_list_cache import event_list_cache
+from app.services.idempotency import idempotency_store
+from app.core.exceptions import ResourceNotFoundError, ValidationError
 
 router = APIRouter()
 
+INGEST_SPOOL_BYTES = 1024 * 1024
+
 
 @router.post("", response_model=Event, status_code=status.HTTP_201_CREATED)
 async def create_event(
     event_in: EventCreate,
-    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    notification_service: NotificationService = Depends(get_notification_service),
 ) -> Any:
     """
     Create a new event
+    
+    With an Idempotency-Key header, retries get the stored response of the first request
     """
     event_repo = EventRepository()
     
-    
-    conflicts = await event_repo.check_event_conflicts(
-        db,
-        user_id=current_user.id,
-        start_time=event_in.start_time,
-        end_time=event_in.end_time
-    )
-    
-    if conflicts:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Event conflicts with {len(conflicts)} existing events",
+    async def create() -> Any:
+        conflicts = await event_repo.check_event_conflicts(
+            db,
+            user_id=current_user.id,
+            start_time=event_in.start_time,
+            end_time=event_in.end_time
+        )
+        
+        if conflicts:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Event conflicts with {len(conflicts)} existing events",
+            )
+        
+        return await event_repo.create_with_owner(
+            db,
+            obj_in=event_in,
+            user_id=current_user.id
         )
     
-    
-    event = await event_repo.create_with_owner(
-        db,
-        obj_in=event_in,
-        user_id=current_user.id
-    )
-    
+    if not idempotency_key:
+        return await create()
+    return await _idempotent(current_user, "create_event", idempotency_key, event_in, create, Event)
+
 
-    background_tasks.add_task(
-        notification_service.notify_event_created,
-        event_id=event.id,
-        event_title=event.title,
-        creator_id=current_user.id,
-        db=db
+async def _idempotent(
+    current_user: User,
+    scope: str,
+    idempotency_key: str,
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+    response_type: Any
+) -> Response:
+    """run a creation handler at most once per Idempotency-Key and answer with its response"""
+    status_code, body, replayed = await idempotency_store.run(
+        user_id=current_user.id,
+        scope=scope,
+        key=idempotency_key,
+        payload=payload,
+        handler=handler,
+        response_type=response_type,
+        status_code=status.HTTP_201_CREATED
     )
-    
-    return event
+    headers = {"Idempotency-Replayed": "true"} if replayed else None
+    return JSONResponse(content=body, status_code=status_code, headers=headers)
 
 
 @router.get("", response_model=List[Event])
@@ -77,80 +116,422 @@ async def get_events(
     limit: int = 100,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated event fields to return"),
+    ids: Optional[str] = Query(None, description="Comma-separated event ids to get instead of a page"),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Get all events the user has access to
+    
+    Pages come from the event list cache, keyed by the user's events_generation, so a
+    repeated request only loads the user. The page carries an ETag over its (id, version)
+    pairs; a matching If-None-Match is answered with 304. Pages too large to cache are
+    validated with an id/version-only query instead
+    
+    With fields, only those columns (plus id and current_version) are selected and
+    returned. With ids, the accessible events among them are returned in the order
+    given, in one query; paging and date filters do not apply
+    
+    Events are read as plain rows and serialized once through a precompiled TypeAdapter;
+    the JSON response bypasses a second validation against the response model
     """
     event_repo = EventRepository()
+    selected = _parse_fields(fields)
+    representation = f"{'ids' if ids is not None else 'page'}:{','.join(selected)}"
     
-    events = await event_repo.get_events_for_user(
+    if ids is not None:
+        rows = await event_repo.get_event_rows_by_ids_for_user(
+            db,
+            event_ids=_parse_ids(ids),
+            user_id=current_user.id,
+            fields=selected
+        )
+        events = dump_rows(event_fields_adapter(selected), rows)
+    else:
+        if if_none_match and not event_list_cache.cacheable(limit):
+            pairs = await event_repo.get_event_versions_for_user(
+                db,
+                user_id=current_user.id,
+                skip=skip,
+                limit=limit,
+                start_date=start_date,
+                end_date=end_date
+            )
+            etag = list_etag(pairs, representation)
+            
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
+        events = await event_list_cache.get_page(
+            user_id=current_user.id,
+            generation=current_user.events_generation,
+            skip=skip,
+            limit=limit,
+            start_date=start_date,
+            end_date=end_date,
+            load=lambda session: event_repo.get_event_rows_for_user(
+                session,
+                user_id=current_user.id,
+                fields=selected,
+                skip=skip,
+                limit=limit,
+                start_date=start_date,
+                end_date=end_date
+            ),
+            fields=selected
+        )
+    
+    etag = list_etag(((event["id"], event["current_version"]) for event in events), representation)
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    return JSONResponse(content=events, headers={"ETag": etag})
+
+
+def _parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Parse ?fields= into a field tuple in EVENT_FIELDS order, always with id and
+    current_version
+    """
+    if fields is None:
+        return EVENT_FIELDS
+    wanted = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = wanted.difference(EVENT_FIELDS)
+    if unknown:
+        raise ValidationError(f"Unknown event fields: {', '.join(sorted(unknown))}")
+    wanted.update(("id", "current_version"))
+    return tuple(field for field in EVENT_FIELDS if field in wanted)
+
+
+def _parse_ids(ids: str) -> List[str]:
+    """parse ?ids= into unique ids, in the order given"""
+    event_ids = list(dict.fromkeys(event_id.strip() for event_id in ids.split(",") if event_id.strip()))
+    if len(event_ids) > settings.EVENT_MULTI_GET_MAX_IDS:
+        raise ValidationError(f"At most {settings.EVENT_MULTI_GET_MAX_IDS} ids can be requested at once")
+    return event_ids
+
+
+@router.get("/agenda", response_model=List[AgendaItem])
+async def get_agenda(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get the user's next occurrences, recurring events expanded, soonest first
+    
+    Served from a per-user agenda kept current from the user's change feed; occurrences
+    further out than AGENDA_HORIZON_DAYS are not listed
+    """
+    return await agenda_cache.get_upcoming(db, user=current_user, limit=limit)
+
+
+@router.get("/calendar.ics", response_class=StreamingResponse)
+async def export_events_ics(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Export the user's events as an iCalendar file, streamed a page of events at a time
+    """
+    user_id = current_user.id
+    
+    async def body():
+        try:
+            async for part in export_calendar(db, user_id=user_id, start_date=start_date, end_date=end_date):
+                yield part
+        finally:
+            # get_db may already have closed the session; release what the stream used
+            await db.close()
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/calendar; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="events.ics"'}
+    )
+
+
+@router.post("/calendar.ics")
+async def import_events_ics(
+    request: Request,
+    check_conflicts: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Import the VEVENTs of an iCalendar upload as new events owned by the user
+    
+    The upload is parsed as it arrives and imported in chunks like `POST /ingest`, with
+    the same NDJSON results; records are numbered by VEVENT
+    """
+    results = ingest_events(
         db,
         user_id=current_user.id,
-        skip=skip,
-        limit=limit,
-        start_date=start_date,
-        end_date=end_date
+        records=read_ics(request.stream()),
+        check_conflicts=check_conflicts
     )
-    
-    return events
+    return await _spooled_ndjson(results)
 
 
 @router.get("/{event_id}", response_model=Event)
 async def get_event(
-    event_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    access: EventAccess = Depends(require_event_role("VIEWER", hide_without_role=True, cached=True)),
+) -> Any:
+    """
+    Get a specific event by ID
+    
+    Served from the event cache, keyed by the event's current version. A matching
+    If-None-Match is answered with 304 from the cached event
+    """
+    event = access.event
+    etag = event_etag(event.id, event.current_version)
+    
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
+    return event
+
+
+def _parse_if_match(if_match: str, event_id: str) -> int:
+    """parse an If-Match header holding an event version or an event etag"""
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    etag_event_id, _, value = value.strip('"').rpartition(".")
+    if etag_event_id and etag_event_id != event_id:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match does not refer to this event",
+        )
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="If-Match must contain the event's current version",
+        )
+
+
+# the batch routes are declared before the /{event_id} routes, which would otherwise match them
+
+@router.patch("/batch", response_model=List[EventBatchItemResult])
+async def update_batch_events(
+    batch: EventBatchUpdate,
+    atomic: bool = Query(True, description="Fail the whole batch if any event fails"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    Get a specific event by ID
+    Update multiple events in a single request
+    
+    Events and the caller's roles are loaded with one query and new time ranges are
+    checked for conflicts in one sweep; the batch is written in one transaction. With
+    atomic (the default) any failing event rejects the whole batch with the failures as
+    detail, otherwise every event is written in its own savepoint and reported on its own
     """
     event_repo = EventRepository()
+    event_ids = _unique_batch_ids([item.id for item in batch.events])
+    found = await event_repo.get_many_with_permissions(db, event_ids=event_ids, user_id=current_user.id)
+    
+    results: Dict[str, EventBatchItemResult] = {}
+    ranges = {}
+    moved = []
+    for item in batch.events:
+        error = _batch_access_error(found.get(item.id), "EDITOR")
+        event = found[item.id][0] if not error else None
+        if not error and item.expected_version is not None and item.expected_version != event.current_version:
+            error = (
+                status.HTTP_412_PRECONDITION_FAILED,
+                f"Event has been modified (current version is {event.current_version})"
+            )
+        if not error:
+            start_time = item.start_time or event.start_time
+            end_time = item.end_time or event.end_time
+            if as_utc(end_time) < as_utc(start_time):
+                error = (status.HTTP_422_UNPROCESSABLE_ENTITY, "End time must be after start time")
+            else:
+                ranges[item.id] = (start_time, end_time)
+                if item.start_time or item.end_time:
+                    moved.append(item.id)
+        if error:
+            results[item.id] = EventBatchItemResult(id=item.id, status=error[0], detail=error[1])
+    
+    conflicts = await event_repo.count_conflicts_for_ranges(
+        db,
+        user_id=current_user.id,
+        ranges=ranges,
+        moved=moved
+    )
+    for event_id, count in conflicts.items():
+        if count:
+            results[event_id] = EventBatchItemResult(
+                id=event_id,
+                status=status.HTTP_409_CONFLICT,
+                detail=f"Event conflicts with {count} existing events"
+            )
     
-    event, role = await event_repo.get_by_id_with_permissions(
+    _raise_if_atomic_batch_failed(atomic, results)
+    
+    updates = [(found[item.id][0], item) for item in batch.events if item.id not in results]
+    events, failed = await event_repo.update_batch(
         db,
-        event_id=event_id,
-        user_id=current_user.id
+        updates=updates,
+        user_id=current_user.id,
+        change_comment=batch.change_comment,
+        atomic=atomic
     )
+    for event in events:
+        results[event.id] = EventBatchItemResult(id=event.id, status=status.HTTP_200_OK, event=event)
+    for event_id, detail in failed.items():
+        results[event_id] = EventBatchItemResult(
+            id=event_id,
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail
+        )
+    _raise_if_atomic_batch_failed(atomic, {event_id: results[event_id] for event_id in failed})
     
-    if not event or not role:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found or you don't have permission to access it",
+    return [results[event_id] for event_id in event_ids]
+
+
+@router.delete("/batch", response_model=List[EventBatchItemResult])
+async def delete_batch_events(
+    batch: EventBatchDelete,
+    atomic: bool = Query(True, description="Fail the whole batch if any event fails"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Delete multiple events in a single request
+    
+    Events and the caller's roles are loaded with one query and the batch is deleted in
+    one transaction. With atomic (the default) any failing event rejects the whole batch,
+    otherwise every event is deleted in its own savepoint and reported on its own
+    """
+    event_repo = EventRepository()
+    event_ids = _unique_batch_ids(batch.ids)
+    found = await event_repo.get_many_with_permissions(db, event_ids=event_ids, user_id=current_user.id)
+    
+    results: Dict[str, EventBatchItemResult] = {}
+    for event_id in event_ids:
+        error = _batch_access_error(found.get(event_id), "OWNER")
+        if error:
+            results[event_id] = EventBatchItemResult(id=event_id, status=error[0], detail=error[1])
+    
+    _raise_if_atomic_batch_failed(atomic, results)
+    
+    events = [found[event_id][0] for event_id in event_ids if event_id not in results]
+    deleted_ids = [event.id for event in events]
+    failed = await event_repo.delete_batch(db, events=events, deleted_by=current_user.id, atomic=atomic)
+    for event_id, detail in failed.items():
+        results[event_id] = EventBatchItemResult(
+            id=event_id,
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail
         )
+    _raise_if_atomic_batch_failed(atomic, results)
+    for event_id in deleted_ids:
+        results.setdefault(event_id, EventBatchItemResult(id=event_id, status=status.HTTP_204_NO_CONTENT))
     
-    return event
+    return [results[event_id] for event_id in event_ids]
+
+
+def _unique_batch_ids(event_ids: List[str]) -> List[str]:
+    """reject batches naming an event more than once"""
+    duplicates = sorted({event_id for event_id in event_ids if event_ids.count(event_id) > 1})
+    if duplicates:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Events listed more than once: {', '.join(duplicates)}",
+        )
+    return event_ids
+
+
+def _batch_access_error(found: Optional[Tuple[Any, Optional[str]]], min_role: str) -> Optional[Tuple[int, str]]:
+    """the (status, detail) a batch item fails with for a missing event or too low a role"""
+    if not found:
+        return status.HTTP_404_NOT_FOUND, "Event not found"
+    if not found[1] or not check_permissions(min_role, found[1]):
+        return status.HTTP_403_FORBIDDEN, "Not enough permissions"
+    return None
+
+
+def _raise_if_atomic_batch_failed(atomic: bool, results: Dict[str, EventBatchItemResult]) -> None:
+    """reject an atomic batch with the status of its first failure and every failure as detail"""
+    if atomic and results:
+        failures = list(results.values())
+        raise HTTPException(
+            status_code=failures[0].status,
+            detail=[failure.dict(exclude={"event"}) for failure in failures],
+        )
 
 
 @router.put("/{event_id}", response_model=Event)
 async def update_event(
     event_id: str,
     event_in: EventUpdate,
-    background_tasks: BackgroundTasks,
+    response: Response,
     change_comment: Optional[str] = None,
+    if_match: Optional[str] = Header(None, description="Expected current_version of the event"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    notification_service: NotificationService = Depends(get_notification_service),
+    access: Optional[EventAccess] = Depends(require_event_role("EDITOR", skip_if_match=True)),
 ) -> Any:
     """
     Update an event
+    
+    With an `If-Match` header holding the current version (or the event's ETag) the update
+    is a single compare-and-swap write, and a stale version is rejected with 412 instead of
+    silently overwriting
     """
     event_repo = EventRepository()
-    permission_repo = PermissionRepository()
     
-    
-    event, role = await event_repo.get_by_id_with_permissions(
-        db,
-        event_id=event_id,
-        user_id=current_user.id
-    )
-    
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
+    if if_match is not None:
+        expected_version = _parse_if_match(if_match, event_id)
+        
+        event = await event_repo.update_if_version(
+            db,
+            event_id=event_id,
+            expected_version=expected_version,
+            obj_in=event_in,
+            user_id=current_user.id,
+            change_comment=change_comment
         )
+        
+        if not event:
+            event, role = await event_repo.get_by_id_with_permissions(
+                db,
+                event_id=event_id,
+                user_id=current_user.id
+            )
+            
+            if not event:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Event not found",
+                )
+            
+            if not role or not check_permissions("EDITOR", role):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not enough permissions",
+                )
+            
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail=f"Event has been modified (current version is {event.current_version})",
+            )
+        
+        response.headers["ETag"] = event_etag(event.id, event.current_version)
+        return event
+    
+    event = access.event
     
     if event_in.start_time or event_in.end_time:
         start_time = event_in.start_time or event.start_time
@@ -158,7 +539,7 @@ async def update_event(
         
         conflicts = await event_repo.check_event_conflicts(
             db,
-            user_id=current_user.id,
+            user_id=access.user.id,
             start_time=start_time,
             end_time=end_time,
             event_id=event_id
@@ -170,175 +551,169 @@ async def update_event(
                 detail=f"Event conflicts with {len(conflicts)} existing events",
             )
     
- 
-    if not await permission_repo.check_permission(
-        db,
-        event_id=event_id,
-        user_id=current_user.id,
-        required_role="EDITOR"
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
-    
     event = await event_repo.update_with_version(
         db,
         db_obj=event,
         obj_in=event_in,
-        user_id=current_user.id,
+        user_id=access.user.id,
         change_comment=change_comment
     )
     
-    background_tasks.add_task(
-        notification_service.notify_event_updated,
-        event_id=event.id,
-        event_title=event.title,
-        updater_id=current_user.id,
-        db=db
-    )
-    
+    response.headers["ETag"] = event_etag(event.id, event.current_version)
     return event
 
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_event(
     event_id: str,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    notification_service: NotificationService = Depends(get_notification_service),
+    access: EventAccess = Depends(require_event_role("OWNER")),
 ):
     """
     Delete an event
     """
     event_repo = EventRepository()
-    permission_repo = PermissionRepository()
-    
-    event, role = await event_repo.get_by_id_with_permissions(
-        db,
-        event_id=event_id,
-        user_id=current_user.id
-    )
-    
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
-        )
     
-    if role != "OWNER":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
-    
-    permissions = await permission_repo.get_by_event(db, event_id=event_id)
-    affected_users = [permission.user_id for permission in permissions]
-    
-    event_title = event.title
-    
-    await event_repo.delete(db, id=event_id)
-    
-    background_tasks.add_task(
-        notification_service.notify_event_deleted,
-        event_id=event_id,
-        event_title=event_title,
-        deleter_id=current_user.id,
-        affected_users=affected_users,
-        db=db
-    )
+    await event_repo.delete(db, id=event_id, deleted_by=access.user.id)
 
 
 @router.post("/batch", response_model=List[Event], status_code=status.HTTP_201_CREATED)
 async def create_batch_events(
     events_in: EventBatch,
+    idempotency_key: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Create multiple events in a single request
+    
+    With an Idempotency-Key header, retries get the stored response of the first request
     """
     event_repo = EventRepository()
-    created_events = []
     
-    for event_in in events_in.events:
-        conflicts = await event_repo.check_event_conflicts(
-            db,
-            user_id=current_user.id,
-            start_time=event_in.start_time,
-            end_time=event_in.end_time
-        )
+    async def create() -> Any:
+        created_events = []
         
-        if conflicts:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Event conflicts with existing events: {event_in.title}",
+        for event_in in events_in.events:
+            conflicts = await event_repo.check_event_conflicts(
+                db,
+                user_id=current_user.id,
+                start_time=event_in.start_time,
+                end_time=event_in.end_time
+            )
+            
+            if conflicts:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Event conflicts with existing events: {event_in.title}",
+                )
+        
+        for event_in in events_in.events:
+            event = await event_repo.create_with_owner(
+                db,
+                obj_in=event_in,
+                user_id=current_user.id
             )
+            created_events.append(event)
+        
+        return created_events
     
-    for event_in in events_in.events:
-        event = await event_repo.create_with_owner(
-            db,
-            obj_in=event_in,
-            user_id=current_user.id
-        )
-        created_events.append(event)
+    if not idempotency_key:
+        return await create()
+    return await _idempotent(current_user, "create_batch_events", idempotency_key, events_in, create, List[Event])
+
+
+@router.post("/ingest")
+async def ingest_events_stream(
+    request: Request,
+    check_conflicts: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Create events from a stream of EventCreate records, sent as NDJSON
+    (application/x-ndjson) or concatenated msgpack objects (application/msgpack)
     
-    return created_events
+    Records are validated as the body arrives and committed in chunks of
+    EVENT_INGEST_CHUNK_SIZE. The response streams one NDJSON line per chunk with the
+    created ids and the rejected records, then a summary line. With check_conflicts,
+    overlapping records are rejected as well
+    """
+    records = records_for(request.headers.get("content-type"), request.stream())
+    results = ingest_events(
+        db,
+        user_id=current_user.id,
+        records=records,
+        check_conflicts=check_conflicts
+    )
+    return await _spooled_ndjson(results)
+
+
+async def _spooled_ndjson(results: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """
+    Write results to a spool file as NDJSON while the request body is read, then stream it
+    
+    Clients and proxies generally do not read a response before they finished sending,
+    so results are spooled rather than interleaved with the upload; the spool keeps up
+    to INGEST_SPOOL_BYTES in memory and moves to disk beyond that
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=INGEST_SPOOL_BYTES)
+    try:
+        async for result in results:
+            spool.write(json.dumps(result).encode("utf-8") + b"\n")
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    
+    def read() -> Iterator[bytes]:
+        with spool:
+            yield from iter(lambda: spool.read(INGEST_SPOOL_BYTES), b"")
+    
+    return StreamingResponse(read(), media_type="application/x-ndjson")
 
 
 @router.post("/{event_id}/share", response_model=List[EventPermission])
 async def share_event(
     event_id: str,
     share_data: EventShare,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    notification_service: NotificationService = Depends(get_notification_service),
+    access: EventAccess = Depends(require_event_role("OWNER")),
 ) -> Any:
     """
-    Share an event with other users
-    """
-    event_repo = EventRepository()
-    permission_repo = PermissionRepository()
+    Share an event with other users and groups
     
-    event, role = await event_repo.get_by_id_with_permissions(
-        db,
-        event_id=event_id,
-        user_id=current_user.id
-    )
+    All users and groups are validated with one query each and their permissions written
+    with one upsert; sharing with a group stores a single row however large the group is.
+    A user or group listed twice gets the last role given
+    """
+    roles = {user_permission.user_id: user_permission.role for user_permission in share_data.users}
+    group_roles = {group_permission.group_id: group_permission.role for group_permission in share_data.groups}
     
-    if not event:
+    existing = await UserRepository().get_existing_ids(db, user_ids=list(roles))
+    missing = [user_id for user_id in roles if user_id not in existing]
+    if missing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
+            detail=f"Users not found: {', '.join(missing)}",
         )
     
-    if not await permission_repo.check_permission(db, event_id=event_id, user_id=current_user.id, required_role="OWNER"):
+    existing = await GroupRepository().get_existing_ids(db, group_ids=list(group_roles))
+    missing = [group_id for group_id in group_roles if group_id not in existing]
+    if missing:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Groups not found: {', '.join(missing)}",
         )
     
-    permissions = []
-    for user_permission in share_data.users:
-        permission = await permission_repo.create_permission(
-            db,
-            event_id=event_id,
-            user_id=user_permission.user_id,
-            role=user_permission.role
-        )
-        permissions.append(permission)
-        
-        background_tasks.add_task(
-            notification_service.notify_permission_changed,
-            event_id=event_id,
-            event_title=event.title,
-            user_id=user_permission.user_id,
-            role=user_permission.role,
-            changer_id=current_user.id,
-            db=db
-        )
+    permissions = await PermissionRepository().upsert_permissions(
+        db,
+        event_id=event_id,
+        roles=roles,
+        group_roles=group_roles,
+        changed_by=access.user.id,
+        event_title=access.event.title
+    )
     
     return permissions
 
@@ -347,71 +722,31 @@ async def share_event(
 async def get_event_permissions(
     event_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    access: EventAccess = Depends(require_event_role("OWNER")),
 ) -> Any:
     """
     Get all permissions for an event
     """
-    event_repo = EventRepository()
     permission_repo = PermissionRepository()
     
-    event, role = await event_repo.get_by_id_with_permissions(
-        db,
-        event_id=event_id,
-        user_id=current_user.id
-    )
-    
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
-        )
-    
-    if role != "OWNER":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
+    permissions = await permission_repo.get_rows_by_event(db, event_id=event_id)
     
-    permissions = await permission_repo.get_by_event(db, event_id=event_id)
-    
-    return permissions
+    return JSONResponse(content=dump_rows(EVENT_PERMISSION_LIST, permissions))
 
 
 @router.put("/{event_id}/permissions/{user_id}", response_model=EventPermission)
 async def update_event_permission(
     event_id: str,
     user_id: str,
-    background_tasks: BackgroundTasks,
     role: str = Query(..., description="Role: OWNER, EDITOR, VIEWER"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    notification_service: NotificationService = Depends(get_notification_service),
+    access: EventAccess = Depends(require_event_role("OWNER")),
 ) -> Any:
     """
     Update permissions for a user
     """
-    event_repo = EventRepository()
     permission_repo = PermissionRepository()
     
-    event, current_role = await event_repo.get_by_id_with_permissions(
-        db,
-        event_id=event_id,
-        user_id=current_user.id
-    )
-    
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
-        )
-    
-    if current_role != "OWNER":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
-    
     if role not in ["OWNER", "EDITOR", "VIEWER"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -424,17 +759,8 @@ async def update_event_permission(
             db,
             event_id=event_id,
             user_id=user_id,
-            role=role
-        )
-        
-        background_tasks.add_task(
-            notification_service.notify_permission_changed,
-            event_id=event_id,
-            event_title=event.title,
-            user_id=user_id,
             role=role,
-            changer_id=current_user.id,
-            db=db
+            changed_by=access.user.id
         )
     except ResourceNotFoundError:
         raise HTTPException(
@@ -450,33 +776,14 @@ async def delete_event_permission(
     event_id: str,
     user_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    access: EventAccess = Depends(require_event_role("OWNER")),
 ):
     """
     Remove access for a user
     """
-    event_repo = EventRepository()
     permission_repo = PermissionRepository()
     
-    event, role = await event_repo.get_by_id_with_permissions(
-        db,
-        event_id=event_id,
-        user_id=current_user.id
-    )
-    
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
-        )
-    
-    if role != "OWNER":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
-    
-    if user_id == event.created_by:
+    if user_id == access.event.created_by:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot remove owner's permission",
@@ -495,36 +802,42 @@ async def delete_event_permission(
         )
 
 
-@router.get("/{event_id}/history/{version_id}", response_model=EventVersion)
-async def get_event_version(
+@router.delete("/{event_id}/groups/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_event_group_permission(
     event_id: str,
-    version_id: int,
+    group_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> Any:
+    access: EventAccess = Depends(require_event_role("OWNER")),
+):
     """
-    Get a specific version of an event
+    Remove access for a group
     """
-    event_repo = EventRepository()
     permission_repo = PermissionRepository()
     
-    event, role = await event_repo.get_by_id_with_permissions(
+    success = await permission_repo.delete_group_permission(
         db,
         event_id=event_id,
-        user_id=current_user.id
+        group_id=group_id
     )
     
-    if not event:
+    if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
-        )
-    
-    if not role:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
+            detail="Permission not found",
         )
+
+
+@router.get("/{event_id}/history/{version_id}", response_model=EventVersion)
+async def get_event_version(
+    event_id: str,
+    version_id: int,
+    db: AsyncSession = Depends(get_db),
+    access: EventAccess = Depends(require_event_role("VIEWER")),
+) -> Any:
+    """
+    Get a specific version of an event
+    """
+    event_repo = EventRepository()
     
     version = await event_repo.get_version(
         db,
@@ -546,43 +859,20 @@ async def rollback_event(
     event_id: str,
     version_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    access: EventAccess = Depends(require_event_role("EDITOR")),
 ) -> Any:
     """
     Rollback to a previous version
     """
     event_repo = EventRepository()
-    permission_repo = PermissionRepository()
-    
-    event, role = await event_repo.get_by_id_with_permissions(
-        db,
-        event_id=event_id,
-        user_id=current_user.id
-    )
-    
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
-        )
-    
-    if not await permission_repo.check_permission(
-        db,
-        event_id=event_id,
-        user_id=current_user.id,
-        required_role="EDITOR"
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
     
     try:
         event = await event_repo.rollback_to_version(
             db,
             event_id=event_id,
             version_number=version_id,
-            user_id=current_user.id
+            user_id=access.user.id,
+            db_obj=access.event
         )
     except ResourceNotFoundError as e:
         raise HTTPException(
@@ -596,35 +886,59 @@ async def rollback_event(
 @router.get("/{event_id}/changelog", response_model=List[EventChangelog])
 async def get_event_changelog(
     event_id: str,
+    field: Optional[str] = Query(None, description="Only return versions that changed this field"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    access: EventAccess = Depends(require_event_role("VIEWER")),
 ) -> Any:
     """
     Get a chronological log of all changes to an event
+    
+    With `field`, versions are filtered in the database using the changed-fields bitmask
     """
     event_repo = EventRepository()
-    permission_repo = PermissionRepository()
-    
-    
-    event, role = await event_repo.get_by_id_with_permissions(
-        db,
-        event_id=event_id,
-        user_id=current_user.id
-    )
     
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
+    if field is not None:
+        if field not in FIELD_BITS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Field must be one of: {', '.join(VERSIONED_FIELDS)}",
+            )
+        
+        versions = await event_repo.get_versions_changing(
+            db,
+            event_id=event_id,
+            field_mask=FIELD_BITS[field]
         )
-    
-    if not role:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
+        previous_versions = await event_repo.get_versions_by_number(
+            db,
+            event_id=event_id,
+            version_numbers=[version.version_number - 1 for version in versions]
         )
+        
+        changelog = []
+        for version in versions:
+            prev_version = previous_versions.get(version.version_number - 1)
+            if prev_version is None:
+                continue
+            
+            changelog.append(EventChangelog(
+                version_number=version.version_number,
+                changed_by=version.changed_by,
+                changed_at=version.changed_at,
+                change_comment=version.change_comment,
+                changes=[
+                    EventDiff(
+                        field=changed_field,
+                        old_value=getattr(prev_version, changed_field),
+                        new_value=getattr(version, changed_field)
+                    )
+                    for changed_field in fields_from_mask(version.changed_fields)
+                ]
+            ))
+        
+        return changelog
     
-    versions = await event_repo.get_versions(db, event_id=event_id)
+    versions = await event_repo.get_version_rows(db, event_id=event_id)
     
     changelog = []
     prev_version = None
@@ -667,31 +981,12 @@ async def get_event_diff(
     version_id1: int,
     version_id2: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    access: EventAccess = Depends(require_event_role("VIEWER")),
 ) -> Any:
     """
     Get a diff between two versions
     """
     event_repo = EventRepository()
-    permission_repo = PermissionRepository()
-    
-    event, role = await event_repo.get_by_id_with_permissions(
-        db,
-        event_id=event_id,
-        user_id=current_user.id
-    )
-    
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
-        )
-    
-    if not role:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
     
     version1 = await event_repo.get_version(
         db,
@@ -0,0 +1,127 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List
+
+from app.core.security import get_current_user
+from app.db.base import get_db
+from app.db.models.user import User
+from app.db.repositories.group import GroupRepository
+from app.db.repositories.user import UserRepository
+from app.schemas.group import Group, GroupCreate, GroupMembers
+
+router = APIRouter()
+
+
+async def _check_users_exist(db: AsyncSession, user_ids: List[str]) -> None:
+    existing = await UserRepository().get_existing_ids(db, user_ids=user_ids)
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Users not found: {', '.join(missing)}",
+        )
+
+
+async def _get_own_group(db: AsyncSession, group_id: str, user: User):
+    group = await GroupRepository().get_by_id(db, id=group_id)
+    if not group:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Group not found",
+        )
+    if group.created_by != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    return group
+
+
+@router.post("", response_model=Group, status_code=status.HTTP_201_CREATED)
+async def create_group(
+    group_in: GroupCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Create a group, optionally with its first members
+    """
+    member_ids = list(dict.fromkeys(group_in.member_ids))
+    await _check_users_exist(db, member_ids)
+    
+    return await GroupRepository().create_with_members(
+        db,
+        name=group_in.name,
+        created_by=current_user.id,
+        member_ids=member_ids
+    )
+
+
+@router.get("", response_model=List[Group])
+async def get_groups(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get the groups the user created or belongs to
+    """
+    return await GroupRepository().get_for_user(db, user_id=current_user.id)
+
+
+@router.get("/{group_id}/members", response_model=List[str])
+async def get_group_members(
+    group_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get the ids of a group's members
+    """
+    group_repo = GroupRepository()
+    members = (await group_repo.get_member_ids(db, group_ids=[group_id]))[group_id]
+    
+    group = await group_repo.get_by_id(db, id=group_id)
+    if not group or (group.created_by != current_user.id and current_user.id not in members):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Group not found",
+        )
+    
+    return members
+
+
+@router.post("/{group_id}/members", status_code=status.HTTP_204_NO_CONTENT)
+async def add_group_members(
+    group_id: str,
+    members_in: GroupMembers,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Add users to a group; they gain access to every event shared with it
+    """
+    await _get_own_group(db, group_id, current_user)
+    
+    user_ids = list(dict.fromkeys(members_in.user_ids))
+    await _check_users_exist(db, user_ids)
+    
+    await GroupRepository().add_members(db, group_id=group_id, user_ids=user_ids)
+
+
+@router.delete("/{group_id}/members/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_group_member(
+    group_id: str,
+    user_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Remove a user from a group
+    """
+    await _get_own_group(db, group_id, current_user)
+    
+    if not await GroupRepository().remove_member(db, group_id=group_id, user_id=user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Member not found",
+        )
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict
+
+from app.core.security import get_current_user
+from app.db.models.user import User
+from app.services.outbox import get_outbox_dispatcher, OutboxDispatcher
+from app.services.notification_worker import get_notification_worker_pool, NotificationWorkerPool
+from app.services.notification import get_notification_service, NotificationService
+from app.services.notification_push import get_notification_broker, NotificationBroker
+from app.services.permission_cache import get_permission_cache, PermissionCache
+from app.services.event_cache import get_event_cache, EventCache
+from app.services.event_list_cache import get_event_list_cache, EventListCache
+from app.services.agenda import get_agenda_cache, AgendaCache
+from app.services.idempotency import get_idempotency_store, IdempotencyStore
+
+router = APIRouter()
+
+
+@router.get("", response_model=Dict[str, Any])
+async def get_metrics(
+    current_user: User = Depends(get_current_user),
+    outbox_dispatcher: OutboxDispatcher = Depends(get_outbox_dispatcher),
+    notification_worker_pool: NotificationWorkerPool = Depends(get_notification_worker_pool),
+    notification_service: NotificationService = Depends(get_notification_service),
+    notification_broker: NotificationBroker = Depends(get_notification_broker),
+    permission_cache: PermissionCache = Depends(get_permission_cache),
+    event_cache: EventCache = Depends(get_event_cache),
+    event_list_cache: EventListCache = Depends(get_event_list_cache),
+    agenda_cache: AgendaCache = Depends(get_agenda_cache),
+    idempotency_store: IdempotencyStore = Depends(get_idempotency_store),
+) -> Any:
+    """
+    Get operational metrics for background subsystems (superusers only)
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    
+    return {
+        "outbox": await outbox_dispatcher.metrics(),
+        "notification_workers": notification_worker_pool.metrics(),
+        "notification_store": notification_service.metrics(),
+        "notification_push": notification_broker.metrics(),
+        "permission_cache": permission_cache.metrics(),
+        "event_cache": event_cache.metrics(),
+        "event_list_cache": event_list_cache.metrics(),
+        "agenda": agenda_cache.metrics(),
+        "idempotency": idempotency_store.metrics(),
+    }
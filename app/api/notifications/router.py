@@ -1,38 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Header, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, List, Dict, Optional
 
 from app.core.security import get_current_user
 from app.db.base import get_db
 from app.db.models.user import User
+from app.schemas.notification import NotificationReadRequest, UnreadCount
 from app.services.notification import get_notification_service, NotificationService
+from app.services.notification_push import get_notification_broker, NotificationBroker
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[Dict[str, Any]])
 async def get_notifications(
+    after: Optional[str] = Query(None, description="Only return notifications following this id"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Maximum number of notifications to return"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
     notification_service: NotificationService = Depends(get_notification_service),
 ) -> Any:
     """
-    Get all notifications for the current user
+    Get notifications for the current user, oldest first
+    
+    Without after, returns the newest notifications. Ids increase, so passing the last id
+    seen as after fetches only what is new.
     """
-    notifications = await notification_service.get_notifications(current_user.id)
+    notifications = await notification_service.get_notifications(
+        current_user.id,
+        after=after,
+        limit=limit
+    )
     return notifications
 
 
+@router.get("/unread_count", response_model=UnreadCount)
+async def get_unread_count(
+    current_user: User = Depends(get_current_user),
+    notification_service: NotificationService = Depends(get_notification_service),
+) -> Any:
+    """
+    Get the number of unread notifications for the current user
+    """
+    return UnreadCount(unread=await notification_service.get_unread_count(current_user.id))
+
+
+@router.get("/stream")
+async def stream_notifications(
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    after: Optional[str] = Query(None, description="Resume after this notification id when the Last-Event-ID header cannot be set"),
+    current_user: User = Depends(get_current_user),
+    notification_broker: NotificationBroker = Depends(get_notification_broker),
+) -> Any:
+    """
+    Push new notifications for the current user as server-sent events
+    
+    Reconnecting with Last-Event-ID replays the notifications missed in between
+    """
+    return StreamingResponse(
+        notification_broker.stream(current_user.id, last_event_id=last_event_id or after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/read", status_code=status.HTTP_204_NO_CONTENT)
 async def mark_all_as_read(
     background_tasks: BackgroundTasks,
+    read_in: Optional[NotificationReadRequest] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
     notification_service: NotificationService = Depends(get_notification_service),
 ):
     """
-    Mark all notifications as read
+    Mark all notifications as read, or only those listed in the body's ids
     """
+    if read_in is not None:
+        background_tasks.add_task(
+            notification_service.mark_many_as_read,
+            user_id=current_user.id,
+            notification_ids=read_in.ids
+        )
+        return
+    
     background_tasks.add_task(
         notification_service.mark_as_read,
         user_id=current_user.id
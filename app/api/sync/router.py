@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any
+
+from app.core.security import get_current_user
+from app.db.base import get_db
+from app.db.models.user import User
+from app.db.repositories.event import EventRepository
+from app.db.repositories.change import ChangeRepository, TOMBSTONE_CHANGES, CHANGE_REVOKED
+from app.schemas.sync import SyncResponse, SyncTombstone
+
+router = APIRouter()
+
+
+@router.get("", response_model=SyncResponse)
+async def sync(
+    cursor: int = Query(0, ge=0, description="Cursor returned by the previous sync, 0 for a full sync"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum number of changes to consume"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get the events created, updated, shared, revoked or deleted since a cursor
+
+    Several changes to the same event collapse into its current state, or a tombstone
+    when the event is no longer visible
+    """
+    change_repo = ChangeRepository()
+    event_repo = EventRepository()
+
+    changes = await change_repo.get_changes_since(
+        db,
+        user_id=current_user.id,
+        cursor=cursor,
+        limit=limit + 1
+    )
+
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    if not changes:
+        return SyncResponse(cursor=cursor)
+
+    latest = {}
+    for change in changes:
+        latest[change.event_id] = change
+
+    live_ids = [
+        event_id for event_id, change in latest.items()
+        if change.change_type not in TOMBSTONE_CHANGES
+    ]
+    events = await event_repo.get_events_by_ids_for_user(
+        db,
+        event_ids=live_ids,
+        user_id=current_user.id
+    )
+    visible_ids = {event.id for event in events}
+
+    tombstones = []
+    for event_id, change in latest.items():
+        if change.change_type in TOMBSTONE_CHANGES:
+            tombstones.append(SyncTombstone(
+                event_id=event_id,
+                change_type=change.change_type,
+                seq=change.seq
+            ))
+        elif event_id not in visible_ids:
+            tombstones.append(SyncTombstone(
+                event_id=event_id,
+                change_type=CHANGE_REVOKED,
+                seq=change.seq
+            ))
+
+    return SyncResponse(
+        cursor=changes[-1].seq,
+        has_more=has_more,
+        events=events,
+        tombstones=tombstones
+    )
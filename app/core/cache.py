@@ -0,0 +1,230 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from collections import OrderedDict
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# marker for "not in the cache", so that None can be cached as a value
+MISSING = object()
+
+
+class TTLCache:
+    """in-process LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """return the cached value, or MISSING when absent or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        value, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """cache a value, evicting the least recently used entries past max_size"""
+        self._entries[key] = (value, self.clock() + (self.ttl if ttl is None else ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """drop one entry"""
+        self._entries.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """drop every entry whose key matches, returning how many were dropped"""
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """drop every entry"""
+        self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        """report size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+# stored in L1 for loads that found nothing, so that misses are cached too
+NEGATIVE = object()
+
+
+class TwoTierCache:
+    """
+    Read-through cache with an in-process LRU (L1) in front of an optional Redis (L2)
+
+    Values must be JSON-serializable when Redis is used. A load returning None is cached
+    as well, for negative_ttl seconds. Concurrent misses for one key share a single load
+    (single-flight), so a burst of requests for a cold key reaches the source once.
+    Keys are namespaced by prefix and KEY_VERSION; bump KEY_VERSION when the layout of
+    cached values changes so old entries are never read back.
+    """
+
+    KEY_VERSION = 1
+
+    def __init__(
+        self,
+        prefix: str,
+        client=None,
+        max_size: int = 10000,
+        ttl: float = 300,
+        negative_ttl: float = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.prefix = f"{prefix}:v{self.KEY_VERSION}"
+        self.client = client
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.l1 = TTLCache(max_size, ttl, clock)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.negative_hits = 0
+
+    def key(self, *parts: Any) -> str:
+        """build a namespaced key from its parts"""
+        return ":".join([self.prefix, *map(str, parts)])
+
+    async def get_or_load(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        l1_ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Return the cached value of key, calling load() on a miss in both tiers
+
+        ttl applies to L2 and, unless l1_ttl is given, to L1 as well
+        """
+        value = self.l1.get(key)
+        if value is not MISSING:
+            if value is NEGATIVE:
+                self.negative_hits += 1
+                return None
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        task = asyncio.ensure_future(self._fill(key, load, ttl, l1_ttl))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        l1_ttl: Optional[float] = None,
+    ) -> None:
+        """cache a value in both tiers"""
+        ttl = self.ttl if ttl is None else ttl
+        if value is None:
+            ttl = min(ttl, self.negative_ttl)
+        l1_ttl = ttl if l1_ttl is None else min(l1_ttl, ttl)
+        self.l1.set(key, NEGATIVE if value is None else value, l1_ttl)
+
+        if self.client is None:
+            return
+        try:
+            await self.client.set(key, json.dumps(value), ex=max(int(ttl), 1))
+        except Exception as e:
+            logger.warning(f"Error writing {self.prefix} cache to Redis: {e}")
+            self.l2_errors += 1
+
+    async def delete(self, *keys: str) -> None:
+        """drop keys from both tiers"""
+        for key in keys:
+            self.l1.delete(key)
+        if self.client is None or not keys:
+            return
+        try:
+            await self.client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Error deleting from {self.prefix} cache in Redis: {e}")
+            self.l2_errors += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """report hit rates of both tiers, loads and how many misses were coalesced"""
+        return {
+            "l1": self.l1.metrics(),
+            "l2": {
+                "enabled": self.client is not None,
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "errors": self.l2_errors,
+            },
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "negative_hits": self.negative_hits,
+        }
+
+    async def _fill(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Any]],
+        ttl: Optional[float],
+        l1_ttl: Optional[float],
+    ) -> Any:
+        if self.client is not None:
+            try:
+                raw = await self.client.get(key)
+            except Exception as e:
+                logger.warning(f"Error reading {self.prefix} cache from Redis: {e}")
+                self.l2_errors += 1
+                raw = None
+            if raw is not None:
+                self.l2_hits += 1
+                value = json.loads(raw)
+                if l1_ttl is None:
+                    l1_ttl = self.ttl if ttl is None else ttl
+                self.l1.set(key, NEGATIVE if value is None else value, l1_ttl)
+                return value
+            self.l2_misses += 1
+
+        self.loads += 1
+        value = await load()
+        await self.set(key, value, ttl, l1_ttl)
+        return value
@@ -14,6 +14,45 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./app.db"
     REDIS_URL: Optional[str] = None
     RATE_LIMIT_PER_MINUTE: int = 60
+    PERMISSION_CACHE_SIZE: int = 10000
+    PERMISSION_CACHE_L1_TTL_SECONDS: float = 5.0
+    PERMISSION_CACHE_TTL_SECONDS: int = 300
+    EVENT_CACHE_SIZE: int = 10000
+    EVENT_CACHE_TTL_SECONDS: int = 300
+    EVENT_CACHE_VERSION_TTL_SECONDS: float = 5.0
+    EVENT_CACHE_NEGATIVE_TTL_SECONDS: int = 30
+    EVENT_LIST_CACHE_SIZE: int = 1000
+    EVENT_LIST_CACHE_TTL_SECONDS: int = 300
+    EVENT_LIST_CACHE_MAX_PAGE: int = 100
+    EVENT_MULTI_GET_MAX_IDS: int = 100
+    AGENDA_CACHE_SIZE: int = 10000
+    AGENDA_HORIZON_DAYS: int = 365
+    AGENDA_MAX_ENTRIES: int = 500
+    AGENDA_MAX_AGE_SECONDS: int = 3600
+    AGENDA_MAX_CHANGES: int = 200
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+    IDEMPOTENCY_LOCK_TTL_SECONDS: int = 60
+    EVENT_INGEST_CHUNK_SIZE: int = 1000
+    EVENT_INGEST_MAX_RECORD_BYTES: int = 1024 * 1024
+    ICS_EXPORT_PAGE_SIZE: int = 500
+    ICS_PARSE_BATCH_SIZE: int = 500
+    ICS_PARSE_WORKERS: int = 2
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_BACKEND: Optional[str] = None
+    NOTIFICATION_WORKERS: int = 4
+    NOTIFICATION_QUEUE_SIZE: int = 1000
+    NOTIFICATION_FANOUT_BATCH_SIZE: int = 100
+    NOTIFICATION_COALESCE_WINDOW_SECONDS: float = 0.0
+    NOTIFICATION_MAX_PER_USER: int = 500
+    NOTIFICATION_TTL_SECONDS: int = 7 * 24 * 3600
+    NOTIFICATION_MEMORY_MAX_TOTAL: int = 1_000_000
+    NOTIFICATION_PUSH_HEARTBEAT_SECONDS: float = 15.0
+    NOTIFICATION_PUSH_MAX_PENDING: int = 100
+    NOTIFICATION_PUSH_POLL_INTERVAL_SECONDS: float = 1.0
     
     class Config:
         env_file = ".env"
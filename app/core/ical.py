@@ -0,0 +1,273 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import re
+
+from dateutil import tz
+
+from app.core.recurrence import as_utc
+
+
+CALENDAR_HEADER = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "PRODID:-//Collaborative Event Management System//EN\r\n"
+    "CALSCALE:GREGORIAN\r\n"
+)
+CALENDAR_FOOTER = "END:VCALENDAR\r\n"
+
+# rrule parts mapped onto RecurrencePattern fields; WKST is accepted and dropped
+RRULE_FIELDS = {
+    "FREQ": "frequency",
+    "INTERVAL": "interval",
+    "UNTIL": "until",
+    "COUNT": "count",
+    "BYDAY": "by_day",
+    "BYMONTHDAY": "by_month_day",
+    "BYMONTH": "by_month",
+}
+
+DURATION = re.compile(
+    r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+def escape_text(value: str) -> str:
+    """escape a TEXT value (RFC 5545 3.3.11)"""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def unescape_text(value: str) -> str:
+    """reverse escape_text"""
+    return re.sub(
+        r"\\(.)",
+        lambda match: "\n" if match.group(1) in "nN" else match.group(1),
+        value
+    )
+
+
+def fold(line: str) -> str:
+    """fold a content line at 75 octets, without splitting UTF-8 sequences, and end it with CRLF"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    start, limit = 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # step back off UTF-8 continuation bytes
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_datetime(value: Any) -> str:
+    """format a datetime as a UTC DATE-TIME; naive values are taken as UTC"""
+    return as_utc(value).strftime("%Y%m%dT%H%M%SZ")
+
+
+def format_rrule(pattern: Dict[str, Any]) -> str:
+    """build the RRULE value of a stored recurrence pattern"""
+    parts = [f"FREQ={pattern['frequency'].upper()}"]
+    if (pattern.get("interval") or 1) != 1:
+        parts.append(f"INTERVAL={pattern['interval']}")
+    if pattern.get("until"):
+        parts.append(f"UNTIL={format_datetime(pattern['until'])}")
+    if pattern.get("count"):
+        parts.append(f"COUNT={pattern['count']}")
+    for part, field in (("BYDAY", "by_day"), ("BYMONTHDAY", "by_month_day"), ("BYMONTH", "by_month")):
+        if pattern.get(field):
+            parts.append(f"{part}={','.join(str(value) for value in pattern[field])}")
+    return ";".join(parts)
+
+
+def format_vevent(event: Any, dtstamp: datetime) -> str:
+    """render an event as a folded VEVENT"""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{event.id}",
+        f"DTSTAMP:{format_datetime(dtstamp)}",
+        f"DTSTART:{format_datetime(event.start_time)}",
+        f"DTEND:{format_datetime(event.end_time)}",
+        f"SUMMARY:{escape_text(event.title)}",
+    ]
+    if event.description:
+        lines.append(f"DESCRIPTION:{escape_text(event.description)}")
+    if event.location:
+        lines.append(f"LOCATION:{escape_text(event.location)}")
+    if event.is_recurring and event.recurrence_pattern:
+        lines.append(f"RRULE:{format_rrule(event.recurrence_pattern)}")
+    lines.append(f"SEQUENCE:{(event.current_version or 1) - 1}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+def unfold(lines: Iterable[str]) -> Iterator[str]:
+    """join folded continuation lines"""
+    current = None
+    for line in lines:
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def parse_content_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    """split a content line into (NAME, {PARAM: value}, value)"""
+    head, separator, value = _split_unquoted(line, ":")
+    if not separator:
+        raise ValueError(f"Malformed line: {line[:40]}")
+    name, *params = _split_all_unquoted(head, ";")
+    parameters = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parameters[key.upper()] = param_value.strip('"')
+    return name.upper(), parameters, value
+
+
+def parse_datetime(value: str, params: Dict[str, str]) -> Tuple[datetime, bool]:
+    """
+    Parse a DATE or DATE-TIME value into (datetime, is_date)
+
+    UTC and TZID values are returned timezone-aware; floating times and dates are
+    returned naive and taken as UTC like the rest of the API
+    """
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d"), True
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc), False
+    parsed = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    if "TZID" in params:
+        zone = tz.gettz(params["TZID"])
+        if zone is None:
+            raise ValueError(f"Unknown time zone {params['TZID']}")
+        parsed = parsed.replace(tzinfo=zone)
+    return parsed, False
+
+
+def parse_duration(value: str) -> timedelta:
+    """parse a DURATION value"""
+    match = DURATION.match(value)
+    if match is None:
+        raise ValueError(f"Invalid duration {value}")
+    parts = {key: int(part) for key, part in match.groupdict().items() if part and key != "sign"}
+    duration = timedelta(**parts)
+    return -duration if match.group("sign") == "-" else duration
+
+
+def parse_rrule(value: str) -> Dict[str, Any]:
+    """map an RRULE value onto RecurrencePattern fields"""
+    pattern: Dict[str, Any] = {}
+    for part in value.split(";"):
+        key, _, part_value = part.partition("=")
+        key = key.upper()
+        if key == "WKST":
+            continue
+        if key not in RRULE_FIELDS:
+            raise ValueError(f"Unsupported RRULE part {key}")
+        field = RRULE_FIELDS[key]
+        if key == "FREQ":
+            pattern[field] = part_value.lower()
+        elif key in ("INTERVAL", "COUNT"):
+            pattern[field] = int(part_value)
+        elif key == "UNTIL":
+            pattern[field] = as_utc(parse_datetime(part_value, {})[0])
+        elif key == "BYDAY":
+            if any(not day.isalpha() for day in part_value.split(",")):
+                raise ValueError("Unsupported RRULE BYDAY with ordinals")
+            pattern[field] = part_value.upper().split(",")
+        else:
+            pattern[field] = [int(number) for number in part_value.split(",")]
+    if "frequency" not in pattern:
+        raise ValueError("RRULE without FREQ")
+    return pattern
+
+
+def parse_vevent(lines: List[str]) -> Dict[str, Any]:
+    """
+    Parse the lines of one VEVENT, BEGIN and END included, into EventCreate fields
+
+    Times are normalized to naive UTC. Properties of nested components (VALARM) are
+    skipped. A missing DTEND is derived from DURATION, or is one day after an all-day
+    DTSTART and equal to any other
+    """
+    properties: Dict[str, Tuple[Dict[str, str], str]] = {}
+    depth = 0
+    for line in unfold(lines):
+        if not line.strip():
+            continue
+        name, params, value = parse_content_line(line)
+        if name == "BEGIN":
+            depth += 1
+        elif name == "END":
+            depth -= 1
+        elif depth == 1:
+            properties.setdefault(name, (params, value))
+
+    if "DTSTART" not in properties:
+        raise ValueError("VEVENT without DTSTART")
+    start_time, all_day = parse_datetime(properties["DTSTART"][1], properties["DTSTART"][0])
+    if "DTEND" in properties:
+        end_time = parse_datetime(properties["DTEND"][1], properties["DTEND"][0])[0]
+    elif "DURATION" in properties:
+        end_time = start_time + parse_duration(properties["DURATION"][1])
+    else:
+        end_time = start_time + timedelta(days=1) if all_day else start_time
+
+    record: Dict[str, Any] = {
+        "title": unescape_text(properties.get("SUMMARY", ({}, ""))[1]) or "Untitled",
+        "start_time": as_utc(start_time),
+        "end_time": as_utc(end_time),
+    }
+    for name, field in (("DESCRIPTION", "description"), ("LOCATION", "location")):
+        if name in properties:
+            record[field] = unescape_text(properties[name][1])
+    if "RRULE" in properties:
+        record["is_recurring"] = True
+        record["recurrence_pattern"] = parse_rrule(properties["RRULE"][1])
+    return record
+
+
+def parse_vevents(blocks: List[Tuple[int, List[str]]]) -> List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Parse numbered VEVENT blocks into (number, record, error); run in a worker process
+    for large uploads, so it only takes and returns picklable values
+    """
+    parsed = []
+    for number, lines in blocks:
+        try:
+            parsed.append((number, parse_vevent(lines), None))
+        except ValueError as e:
+            parsed.append((number, None, str(e)))
+    return parsed
+
+
+def _split_unquoted(text: str, separator: str) -> Tuple[str, str, str]:
+    quoted = False
+    for index, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif char == separator and not quoted:
+            return text[:index], separator, text[index + 1:]
+    return text, "", ""
+
+
+def _split_all_unquoted(text: str, separator: str) -> List[str]:
+    parts = []
+    while True:
+        head, found, text = _split_unquoted(text, separator)
+        parts.append(head)
+        if not found:
+            return parts
@@ -0,0 +1,75 @@
+from typing import Any, Dict, Iterator, Optional, Tuple
+from datetime import datetime, timezone
+
+from dateutil import rrule
+from dateutil.parser import isoparse
+
+
+FREQUENCIES = {
+    "daily": rrule.DAILY,
+    "weekly": rrule.WEEKLY,
+    "monthly": rrule.MONTHLY,
+    "yearly": rrule.YEARLY,
+}
+
+WEEKDAYS = {
+    "MO": rrule.MO,
+    "TU": rrule.TU,
+    "WE": rrule.WE,
+    "TH": rrule.TH,
+    "FR": rrule.FR,
+    "SA": rrule.SA,
+    "SU": rrule.SU,
+}
+
+
+def as_utc(value: Any) -> Optional[datetime]:
+    """normalize a datetime or ISO string to a naive UTC datetime"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = isoparse(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def build_rule(start: datetime, pattern: Dict[str, Any]) -> rrule.rrule:
+    """build the rrule of a stored recurrence pattern, starting at the event's start"""
+    return rrule.rrule(
+        FREQUENCIES[pattern["frequency"].lower()],
+        dtstart=start,
+        interval=pattern.get("interval") or 1,
+        until=as_utc(pattern.get("until")),
+        count=pattern.get("count"),
+        byweekday=[WEEKDAYS[day] for day in pattern["by_day"]] if pattern.get("by_day") else None,
+        bymonthday=pattern.get("by_month_day") or None,
+        bymonth=pattern.get("by_month") or None,
+    )
+
+
+def occurrences(
+    start_time: Any,
+    end_time: Any,
+    is_recurring: bool,
+    recurrence_pattern: Optional[Dict[str, Any]],
+    after: datetime,
+    before: datetime,
+) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    Yield the (start, end) of an event's occurrences starting in [after, before), in order
+
+    Every occurrence keeps the duration of the first one. Events without a usable
+    recurrence pattern have a single occurrence
+    """
+    start, end = as_utc(start_time), as_utc(end_time)
+    if not is_recurring or not recurrence_pattern:
+        if after <= start < before:
+            yield start, end
+        return
+
+    duration = end - start
+    for occurrence in build_rule(start, recurrence_pattern).xafter(after, inc=True):
+        if occurrence >= before:
+            return
+        yield occurrence, occurrence + duration
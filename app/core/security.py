@@ -80,12 +80,19 @@ async def get_current_user(
     return user
 
 
+# Role hierarchy: OWNER > EDITOR > VIEWER
+ROLE_HIERARCHY = {
+    "OWNER": 3,
+    "EDITOR": 2,
+    "VIEWER": 1
+}
+
+
 def check_permissions(required_role: str, user_role: str) -> bool:
     """check if the user has the required role"""
-    role_hierarchy = {
-        "OWNER": 3,
-        "EDITOR": 2,
-        "VIEWER": 1
-    }
-    
-    return role_hierarchy.get(user_role, 0) >= role_hierarchy.get(required_role, 0)
+    return ROLE_HIERARCHY.get(user_role, 0) >= ROLE_HIERARCHY.get(required_role, 0)
+
+
+def highest_role(roles) -> Optional[str]:
+    """pick the strongest of several roles a user holds, e.g. directly and through groups"""
+    return max((role for role in roles if role), key=lambda role: ROLE_HIERARCHY.get(role, 0), default=None)
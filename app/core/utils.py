@@ -1,3 +1,5 @@
+import hashlib
+from typing import Iterable, Optional, Tuple
 from passlib.context import CryptContext
 
 # password hashing
@@ -10,4 +12,30 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """hash a password"""
-    return pwd_context.hash(password) 
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+def event_etag(event_id: str, version: int) -> str:
+    """build the strong etag for a single event version"""
+    return f'"{event_id}.{version}"'
+
+
+def list_etag(pairs: Iterable[Tuple[str, int]], representation: str = "") -> str:
+    """
+    build the strong etag for a page of (event_id, version) pairs
+
+    representation names the shape of the body (such as its field set), so that
+    different views of the same events never share an etag
+    """
+    digest = hashlib.sha1(f"{representation}|".encode("utf-8"))
+    for event_id, version in pairs:
+        digest.update(f"{event_id}.{version};".encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """check an If-None-Match header against an etag"""
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -1,2 +1,5 @@
 from app.db.models.user import User
-from app.db.models.event import Event, EventPermission, EventVersion
+from app.db.models.group import Group, GroupMembership
+from app.db.models.event import Event, EventPermission, EventVersion, EventChange
+from app.db.models.outbox import OutboxMessage
+from app.db.models.notification import Notification, NotificationCounter
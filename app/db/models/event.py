@@ -1,11 +1,32 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Text, JSON, Index
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import FunctionElement
 import uuid
 
 from app.db.base import Base
 
 
+# fields tracked by event versions, in bit order for EventVersion.changed_fields
+VERSIONED_FIELDS = (
+    "title",
+    "description",
+    "start_time",
+    "end_time",
+    "location",
+    "is_recurring",
+    "recurrence_pattern",
+)
+
+FIELD_BITS = {field: 1 << index for index, field in enumerate(VERSIONED_FIELDS)}
+
+
+def fields_from_mask(mask: int) -> list:
+    """return the versioned fields whose bits are set in a changed-fields mask"""
+    return [field for field in VERSIONED_FIELDS if mask & FIELD_BITS[field]]
+
+
 class Event(Base):
     """event model for the event management system"""
     
@@ -26,10 +47,16 @@ class Event(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     current_version = Column(Integer, default=1)
+    # changed-fields bitmask of current_version, written by the update that created it
+    changed_fields = Column(Integer, nullable=False, default=0, server_default="0")
     
     creator = relationship("User", foreign_keys=[created_by], backref="created_events")
     permissions = relationship("EventPermission", back_populates="event", cascade="all, delete-orphan")
     versions = relationship("EventVersion", back_populates="event", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_events_id_current_version", "id", "current_version"),
+    )
 
 
 class EventPermission(Base):
@@ -39,7 +66,9 @@ class EventPermission(Base):
     
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     event_id = Column(String, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # exactly one of user_id and group_id is set
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    group_id = Column(String, ForeignKey("groups.id", ondelete="CASCADE"), nullable=True)
     role = Column(String, nullable=False)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -47,6 +76,12 @@ class EventPermission(Base):
     
     event = relationship("Event", back_populates="permissions")
     user = relationship("User")
+    
+    __table_args__ = (
+        Index("ix_event_permissions_event_id_user_id", "event_id", "user_id", unique=True),
+        Index("ix_event_permissions_event_id_group_id", "event_id", "group_id", unique=True),
+        Index("ix_event_permissions_group_id", "group_id"),
+    )
 
 
 class EventVersion(Base):
@@ -69,6 +104,59 @@ class EventVersion(Base):
     changed_by = Column(String, ForeignKey("users.id"), nullable=False)
     changed_at = Column(DateTime(timezone=True), server_default=func.now())
     change_comment = Column(Text, nullable=True)
+    changed_fields = Column(Integer, nullable=False, default=0, server_default="0")
     
     event = relationship("Event", back_populates="versions")
     user = relationship("User", foreign_keys=[changed_by])
+    
+    __table_args__ = (
+        Index("ix_event_versions_event_id_changed_fields", "event_id", "changed_fields"),
+    )
+
+
+class current_txid(FunctionElement):
+    """id of the writing transaction on Postgres, NULL on databases with a single writer"""
+    type = BigInteger()
+    inherit_cache = True
+
+
+class txid_horizon(FunctionElement):
+    """lowest transaction id still running as of the current snapshot, on Postgres"""
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(current_txid)
+def _compile_current_txid(element, compiler, **kw):
+    return "NULL"
+
+
+@compiles(current_txid, "postgresql")
+def _compile_current_txid_postgresql(element, compiler, **kw):
+    return "pg_current_xact_id()::text::bigint"
+
+
+@compiles(txid_horizon, "postgresql")
+def _compile_txid_horizon_postgresql(element, compiler, **kw):
+    return "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+
+
+class EventChange(Base):
+    """model for the per-user change feed used by delta sync"""
+    
+    __tablename__ = "event_changes"
+    
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    # seqs are taken before commit, so on Postgres the feed is ordered by writing transaction
+    txid = Column(BigInteger, nullable=True, default=current_txid())
+    event_id = Column(String, nullable=False)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    change_type = Column(String, nullable=False)
+    version = Column(Integer, nullable=True)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_event_changes_user_id_seq", "user_id", "seq"),
+        Index("ix_event_changes_user_id_txid_seq", "user_id", "txid", "seq"),
+        {"sqlite_autoincrement": True},
+    )
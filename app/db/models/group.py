@@ -0,0 +1,36 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+
+from app.db.base import Base
+
+
+class Group(Base):
+    """model for a named set of users that events can be shared with as a whole"""
+    
+    __tablename__ = "groups"
+    
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    name = Column(String, nullable=False)
+    created_by = Column(String, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    memberships = relationship("GroupMembership", back_populates="group", cascade="all, delete-orphan")
+
+
+class GroupMembership(Base):
+    """model for a user's membership in a group"""
+    
+    __tablename__ = "group_memberships"
+    
+    group_id = Column(String, ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    group = relationship("Group", back_populates="memberships")
+    
+    __table_args__ = (
+        # resolves a user's groups for access checks
+        Index("ix_group_memberships_user_id", "user_id"),
+    )
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.sql import func, false
+
+from app.db.base import Base
+
+
+class Notification(Base):
+    """model for notifications stored by the database notification backend"""
+    
+    __tablename__ = "notifications"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    type = Column(String, nullable=False)
+    event_id = Column(String, nullable=True)
+    data = Column(JSON, nullable=False)
+    read = Column(Boolean, nullable=False, default=False, server_default=false())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_notifications_user_id_id", "user_id", "id"),
+        Index("ix_notifications_user_id_read", "user_id", "read"),
+        {"sqlite_autoincrement": True},
+    )
+
+
+class NotificationCounter(Base):
+    """model for the maintained count of a user's unread notifications"""
+    
+    __tablename__ = "notification_counters"
+    
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class OutboxMessage(Base):
+    """model for change events written alongside the change and delivered by the dispatcher"""
+    
+    __tablename__ = "outbox"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    topic = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_outbox_processed_at_id", "processed_at", "id"),
+        {"sqlite_autoincrement": True},
+    )
@@ -0,0 +1,280 @@
+from typing import Optional, List, Iterable, Dict
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import and_, or_, insert, literal, update, func, case, tuple_
+from sqlalchemy.orm import aliased
+
+from app.db.repositories.base import BaseRepository
+from app.db.repositories.group import event_user_ids_query, events_user_ids_query
+from app.db.models.event import EventChange, EventPermission, txid_horizon
+from app.db.models.group import GroupMembership
+from app.db.models.user import User
+
+
+CHANGE_CREATED = "created"
+CHANGE_UPDATED = "updated"
+CHANGE_SHARED = "shared"
+CHANGE_REVOKED = "revoked"
+CHANGE_DELETED = "deleted"
+
+# change types after which the event is no longer visible to the user
+TOMBSTONE_CHANGES = {CHANGE_REVOKED, CHANGE_DELETED}
+
+
+class ChangeRepository(BaseRepository[EventChange, BaseModel, BaseModel]):
+    """
+    Repository for the per-user change feed behind delta sync
+
+    Writers call these methods inside their own transaction and commit themselves,
+    so a change row is only visible together with the change it describes. Every
+    recorded change also bumps the affected users' events_generation, which keys the
+    event list cache
+    """
+
+    def __init__(self):
+        super().__init__(EventChange)
+
+    async def record_for_users(
+        self,
+        db: AsyncSession,
+        *,
+        event_id: str,
+        change_type: str,
+        user_ids: Iterable[str],
+        version: Optional[int] = None
+    ) -> None:
+        """
+        Record a change for an explicit set of users, as one executemany
+        """
+        rows = [
+            {"event_id": event_id, "user_id": user_id, "change_type": change_type, "version": version}
+            for user_id in user_ids
+        ]
+        if rows:
+            await db.execute(insert(EventChange), rows)
+            await self._bump_generations(db, [row["user_id"] for row in rows])
+
+    async def record_events_for_user(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str,
+        change_type: str,
+        versions: Dict[str, Optional[int]]
+    ) -> None:
+        """
+        Record a change of several events for a single user, as one executemany
+        """
+        rows = [
+            {"event_id": event_id, "user_id": user_id, "change_type": change_type, "version": version}
+            for event_id, version in versions.items()
+        ]
+        if rows:
+            await db.execute(insert(EventChange), rows)
+            await self._bump_generations(db, [user_id])
+
+    async def record_for_event_users(
+        self,
+        db: AsyncSession,
+        *,
+        event_id: str,
+        change_type: str,
+        version: Optional[int] = None
+    ) -> None:
+        """
+        Record a change for every user with access to the event, directly or through a group
+
+        Written as a single INSERT ... SELECT over event_permissions and group memberships
+        """
+        user_ids = event_user_ids_query(event_id).subquery()
+        query = insert(EventChange).from_select(
+            ["event_id", "user_id", "change_type", "version"],
+            select(
+                literal(event_id),
+                user_ids.c.user_id,
+                literal(change_type),
+                literal(version)
+            )
+        )
+        await db.execute(query)
+        await self._bump_generations(db, select(user_ids.c.user_id))
+
+    async def record_for_events(
+        self,
+        db: AsyncSession,
+        *,
+        change_type: str,
+        versions: Dict[str, Optional[int]]
+    ) -> None:
+        """
+        Record a change of several events for every user with access to them
+
+        versions maps each event id to the version the change produced (or None), and the
+        rows for all events are written with one INSERT ... SELECT
+        """
+        if not versions:
+            return
+        pairs = events_user_ids_query(versions).subquery()
+        versions_given = {event_id: version for event_id, version in versions.items() if version is not None}
+        version = case(versions_given, value=pairs.c.event_id) if versions_given else literal(None)
+        query = insert(EventChange).from_select(
+            ["event_id", "user_id", "change_type", "version"],
+            select(
+                pairs.c.event_id,
+                pairs.c.user_id,
+                literal(change_type),
+                version
+            )
+        )
+        await db.execute(query)
+        await self._bump_generations(db, select(pairs.c.user_id))
+
+    async def record_for_group_members(
+        self,
+        db: AsyncSession,
+        *,
+        group_id: str,
+        user_ids: List[str],
+        change_type: str
+    ) -> None:
+        """
+        Record a change of every event shared with a group for some of its members
+        """
+        query = insert(EventChange).from_select(
+            ["event_id", "user_id", "change_type", "version"],
+            select(
+                EventPermission.event_id,
+                GroupMembership.user_id,
+                literal(change_type),
+                literal(None)
+            ).join(
+                GroupMembership,
+                GroupMembership.group_id == EventPermission.group_id
+            ).where(
+                and_(
+                    EventPermission.group_id == group_id,
+                    GroupMembership.user_id.in_(user_ids)
+                )
+            )
+        )
+        await db.execute(query)
+        await self._bump_generations(db, user_ids)
+
+    async def record_revoked_for_group_member(
+        self,
+        db: AsyncSession,
+        *,
+        group_id: str,
+        user_id: str,
+        remaining_group_ids: Iterable[str]
+    ) -> None:
+        """
+        Record revocations for a user who left a group, skipping events they can still
+        access directly or through another group
+        """
+        other = aliased(EventPermission)
+        still_held = select(other.id).where(
+            and_(
+                other.event_id == EventPermission.event_id,
+                or_(
+                    other.user_id == user_id,
+                    other.group_id.in_(list(remaining_group_ids))
+                )
+            )
+        )
+        query = insert(EventChange).from_select(
+            ["event_id", "user_id", "change_type", "version"],
+            select(
+                EventPermission.event_id,
+                literal(user_id),
+                literal(CHANGE_REVOKED),
+                literal(None)
+            ).where(
+                and_(
+                    EventPermission.group_id == group_id,
+                    ~still_held.exists()
+                )
+            )
+        )
+        await db.execute(query)
+        await self._bump_generations(db, [user_id])
+
+    @staticmethod
+    async def _bump_generations(db: AsyncSession, user_ids) -> None:
+        """
+        Bump the events_generation of the given users (a list or a select of ids) in one UPDATE
+        """
+        query = update(User).where(User.id.in_(user_ids)).values(
+            events_generation=User.events_generation + 1,
+            # a profile timestamp, not touched by event changes
+            updated_at=User.updated_at
+        ).execution_options(synchronize_session=False)
+        await db.execute(query)
+
+    async def get_changes_since(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str,
+        cursor: int = 0,
+        limit: int = 500
+    ) -> List[EventChange]:
+        """
+        Get a user's changes after a cursor, oldest first
+
+        seqs are taken before commit, so on Postgres a lower seq can become visible after
+        a higher one was served. There changes are ordered by writing transaction and only
+        served below the snapshot's xmin, the oldest transaction still running: no change
+        can commit behind the cursor. The cursor stays the seq of the last change served.
+        SQLite holds its write lock until commit, so seqs are visible in order.
+        """
+        if not _orders_by_txid(db):
+            query = select(EventChange).where(
+                and_(
+                    EventChange.user_id == user_id,
+                    EventChange.seq > cursor
+                )
+            ).order_by(EventChange.seq).limit(limit)
+            result = await db.execute(query)
+            return result.scalars().all()
+
+        conditions = [EventChange.user_id == user_id, EventChange.txid < txid_horizon()]
+        if cursor:
+            cursor_txid = select(EventChange.txid).where(EventChange.seq == cursor).scalar_subquery()
+            conditions.append(
+                tuple_(EventChange.txid, EventChange.seq) > tuple_(func.coalesce(cursor_txid, 0), cursor)
+            )
+        query = select(EventChange).where(
+            and_(*conditions)
+        ).order_by(EventChange.txid, EventChange.seq).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def get_latest_seq(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str
+    ) -> int:
+        """
+        Get the seq of a user's latest change, 0 without any
+        """
+        if not _orders_by_txid(db):
+            query = select(func.max(EventChange.seq)).where(EventChange.user_id == user_id)
+            result = await db.execute(query)
+            return result.scalar() or 0
+
+        query = select(EventChange.seq).where(
+            and_(
+                EventChange.user_id == user_id,
+                EventChange.txid < txid_horizon()
+            )
+        ).order_by(EventChange.txid.desc(), EventChange.seq.desc()).limit(1)
+        result = await db.execute(query)
+        return result.scalar() or 0
+
+
+def _orders_by_txid(db: AsyncSession) -> bool:
+    """whether the feed is ordered by writing transaction rather than by seq"""
+    return db.get_bind().dialect.name == "postgresql"
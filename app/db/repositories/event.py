@@ -1,13 +1,68 @@
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Callable, Awaitable
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, or_, between
+from sqlalchemy import and_, or_, between, update, delete, insert, exists, literal, bindparam, case, cast, func, JSON, Text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm.util import identity_key
+from collections import defaultdict
 from datetime import datetime
+import uuid
 
 from app.db.repositories.base import BaseRepository
-from app.db.models.event import Event, EventPermission, EventVersion
-from app.schemas.event import EventCreate, EventUpdate, EventVersionBase
+from app.db.repositories.group import GroupRepository, held_by, event_user_ids_query, events_user_ids_query
+from app.db.repositories.change import ChangeRepository, CHANGE_CREATED, CHANGE_UPDATED, CHANGE_DELETED
+from app.db.repositories.outbox import (
+    OutboxRepository,
+    TOPIC_EVENT_CREATED,
+    TOPIC_EVENT_UPDATED,
+    TOPIC_EVENT_DELETED
+)
+from app.db.models.event import Event, EventPermission, EventVersion, VERSIONED_FIELDS, FIELD_BITS
+from app.db.models.group import GroupMembership
+from app.schemas.event import EVENT_FIELDS, EventCreate, EventUpdate, EventVersionBase
 from app.core.exceptions import ResourceNotFoundError, AuthorizationError, ConflictError
+from app.core.recurrence import as_utc
+from app.core.security import highest_role
+from app.services.event_cache import event_cache
+from app.services.permission_cache import permission_cache
+
+
+def _values_differ(old_value: Any, new_value: Any) -> bool:
+    """compare two field values, tolerating naive datetimes read back from sqlite"""
+    if isinstance(old_value, datetime) and isinstance(new_value, datetime):
+        if (old_value.tzinfo is None) != (new_value.tzinfo is None):
+            return old_value.replace(tzinfo=None) != new_value.replace(tzinfo=None)
+    return old_value != new_value
+
+
+def compute_changed_fields(old: Any, new: Any) -> int:
+    """build the changed-fields bitmask between two event-like objects"""
+    mask = 0
+    for field in VERSIONED_FIELDS:
+        if _values_differ(getattr(old, field), getattr(new, field)):
+            mask |= FIELD_BITS[field]
+    return mask
+
+
+def changed_fields_expression(update_data: Dict[str, Any]):
+    """
+    SQL expression for the changed-fields bitmask of an update, evaluated against the row
+    being updated, so that in an UPDATE's SET clause it compares with the old values
+    """
+    mask = literal(0)
+    for field, value in update_data.items():
+        if field not in FIELD_BITS:
+            continue
+        column = getattr(Event, field)
+        if field == "recurrence_pattern":
+            # json has no equality operator on postgres, so compare the serialized documents
+            differs = func.coalesce(cast(column, Text), "null").is_distinct_from(
+                cast(literal(value, JSON), Text)
+            )
+        else:
+            differs = column.is_distinct_from(value)
+        mask = mask + case((differs, FIELD_BITS[field]), else_=0)
+    return mask
 
 
 class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
@@ -28,44 +83,98 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
         """
         Get an event by ID with permission check
         Returns (event, role) or (None, None) if not found or no permission
+        
+        A user holding several roles (directly and through groups) gets the highest one
         """
+        group_ids = await GroupRepository().get_group_ids_for_user(db, user_id=user_id)
         query = select(Event, EventPermission.role).join(
             EventPermission, 
             and_(
                 EventPermission.event_id == Event.id,
-                EventPermission.user_id == user_id
+                held_by(user_id, group_ids)
             ),
             isouter=True
         ).where(Event.id == event_id)
         
         result = await db.execute(query)
-        row = result.first()
+        rows = result.all()
         
-        if not row:
+        if not rows:
             return None, None
         
-        return row[0], row[1]
+        role = highest_role(row[1] for row in rows)
+        permission_cache.prime(event_id, user_id, role)
+        return rows[0][0], role
     
-    async def get_events_for_user(
+    async def get_many_with_permissions(
         self, 
         db: AsyncSession, 
         *, 
+        event_ids: List[str], 
+        user_id: str
+    ) -> Dict[str, Tuple[Event, Optional[str]]]:
+        """
+        Get several events with the user's role on each, in one query
+        
+        Returns {event_id: (event, role)}; events that do not exist are left out and
+        events the user holds no role on map to a None role
+        """
+        if not event_ids:
+            return {}
+        group_ids = await GroupRepository().get_group_ids_for_user(db, user_id=user_id)
+        query = select(Event, EventPermission.role).join(
+            EventPermission, 
+            and_(
+                EventPermission.event_id == Event.id,
+                held_by(user_id, group_ids)
+            ),
+            isouter=True
+        ).where(Event.id.in_(event_ids))
+        
+        result = await db.execute(query)
+        events: Dict[str, Event] = {}
+        roles: Dict[str, List[Optional[str]]] = defaultdict(list)
+        for event, role in result.all():
+            events[event.id] = event
+            roles[event.id].append(role)
+        
+        found = {}
+        for event_id, event in events.items():
+            role = highest_role(roles[event_id])
+            permission_cache.prime(event_id, user_id, role)
+            found[event_id] = (event, role)
+        return found
+    
+    @staticmethod
+    def _accessible_by(user_id: str, group_ids: Iterable[str]):
+        """
+        Condition matching events a user holds a permission on, directly or through a group
+        
+        An EXISTS rather than a join, so events reachable several ways are returned once
+        """
+        return exists().where(
+            and_(
+                EventPermission.event_id == Event.id,
+                held_by(user_id, group_ids)
+            )
+        )
+    
+    def _events_for_user_query(
+        self,
+        *columns: Any,
         user_id: str,
+        group_ids: Iterable[str] = (),
         skip: int = 0,
         limit: int = 100,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
-    ) -> List[Event]:
+    ):
         """
-        Get all events that the user has access to
+        Build the paged query for events a user can access, selecting the given columns
+        
+        Pages are ordered by (start_time, id) so the same page can be re-read column by column
         """
-        query = select(Event).join(
-            EventPermission,
-            and_(
-                EventPermission.event_id == Event.id,
-                EventPermission.user_id == user_id
-            )
-        )
+        query = select(*columns).where(self._accessible_by(user_id, group_ids))
         
         # Apply date filtering if provided
         if start_date and end_date:
@@ -87,7 +196,157 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
         elif end_date:
             query = query.where(Event.start_time <= end_date)
         
-        query = query.offset(skip).limit(limit)
+        return query.order_by(Event.start_time, Event.id).offset(skip).limit(limit)
+    
+    async def get_events_for_user(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Event]:
+        """
+        Get all events that the user has access to
+        """
+        query = self._events_for_user_query(
+            Event,
+            user_id=user_id,
+            group_ids=await GroupRepository().get_group_ids_for_user(db, user_id=user_id),
+            skip=skip,
+            limit=limit,
+            start_date=start_date,
+            end_date=end_date
+        )
+        result = await db.execute(query)
+        return result.scalars().all()
+    
+    async def get_event_versions_for_user(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Tuple[str, int]]:
+        """
+        Get (id, current_version) pairs for the same page as get_events_for_user
+        
+        Used to validate cached list pages without loading full rows
+        """
+        query = self._events_for_user_query(
+            Event.id,
+            Event.current_version,
+            user_id=user_id,
+            group_ids=await GroupRepository().get_group_ids_for_user(db, user_id=user_id),
+            skip=skip,
+            limit=limit,
+            start_date=start_date,
+            end_date=end_date
+        )
+        result = await db.execute(query)
+        return [(row[0], row[1]) for row in result.all()]
+    
+    async def get_event_rows_for_user(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: str,
+        fields: Iterable[str] = EVENT_FIELDS,
+        skip: int = 0,
+        limit: int = 100,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the same page as get_events_for_user as plain rows of the given columns
+        
+        The read-only fast path for lists: a Core select of plain columns, with no ORM
+        objects, identity map or relationship attributes
+        """
+        query = self._events_for_user_query(
+            *(getattr(Event, field) for field in fields),
+            user_id=user_id,
+            group_ids=await GroupRepository().get_group_ids_for_user(db, user_id=user_id),
+            skip=skip,
+            limit=limit,
+            start_date=start_date,
+            end_date=end_date
+        )
+        result = await db.execute(query)
+        return [dict(row) for row in result.mappings()]
+    
+    async def get_event_rows_by_ids_for_user(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_ids: List[str], 
+        user_id: str,
+        fields: Iterable[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the events among event_ids that the user has access to as plain rows of only
+        the given columns, in one query and in the order of event_ids
+        """
+        if not event_ids:
+            return []
+        group_ids = await GroupRepository().get_group_ids_for_user(db, user_id=user_id)
+        query = select(*(getattr(Event, field) for field in fields)).where(
+            and_(
+                Event.id.in_(event_ids),
+                self._accessible_by(user_id, group_ids)
+            )
+        )
+        result = await db.execute(query)
+        rows = {row["id"]: dict(row) for row in result.mappings()}
+        return [rows[event_id] for event_id in event_ids if event_id in rows]
+    
+    async def get_upcoming_for_user(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: str,
+        after: datetime
+    ) -> List[Event]:
+        """
+        Get the events a user can access that start after a point in time or recur
+        
+        Recurring events are returned regardless of their first start, since later
+        occurrences may still be upcoming
+        """
+        group_ids = await GroupRepository().get_group_ids_for_user(db, user_id=user_id)
+        query = select(Event).where(
+            and_(
+                self._accessible_by(user_id, group_ids),
+                or_(Event.start_time >= after, Event.is_recurring.is_(True))
+            )
+        )
+        result = await db.execute(query)
+        return result.scalars().all()
+    
+    async def get_events_by_ids_for_user(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_ids: List[str], 
+        user_id: str
+    ) -> List[Event]:
+        """
+        Get the events among event_ids that the user has access to, in one query
+        """
+        if not event_ids:
+            return []
+        group_ids = await GroupRepository().get_group_ids_for_user(db, user_id=user_id)
+        query = select(Event).where(
+            and_(
+                Event.id.in_(event_ids),
+                self._accessible_by(user_id, group_ids)
+            )
+        )
         result = await db.execute(query)
         return result.scalars().all()
     
@@ -100,9 +359,14 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
     ) -> Event:
         """
         Create a new event with the user as owner
+        
+        The event, owner permission, initial version and change feed entry are
+        committed in one transaction
         """
         # Create the event
-        event = await self.create(db, obj_in=obj_in, created_by=user_id)
+        event = Event(**obj_in.dict(exclude_unset=True), created_by=user_id)
+        db.add(event)
+        await db.flush()
         
         # Create owner permission
         permission = EventPermission(
@@ -128,10 +392,87 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
         )
         db.add(version)
         
+        await ChangeRepository().record_for_users(
+            db,
+            event_id=event.id,
+            change_type=CHANGE_CREATED,
+            user_ids=[user_id],
+            version=1
+        )
+        OutboxRepository().add_message(
+            db,
+            topic=TOPIC_EVENT_CREATED,
+            payload={"event_id": event.id, "event_title": event.title, "creator_id": user_id}
+        )
+        
         await db.commit()
         await db.refresh(event)
         return event
-    
+
+    async def create_many_with_owner(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: List[EventCreate],
+        user_id: str
+    ) -> List[str]:
+        """
+        Create several events with the user as owner and return their ids, in input order
+
+        Ids are assigned client-side so that events, owner permissions, initial versions,
+        change feed entries and outbox messages are each written as one executemany,
+        whatever the number of events. Everything is committed in one transaction
+        """
+        if not objs_in:
+            return []
+
+        events = []
+        for obj_in in objs_in:
+            data = obj_in.dict(exclude={"recurrence_pattern"})
+            data["recurrence_pattern"] = (
+                obj_in.recurrence_pattern.model_dump(mode="json") if obj_in.recurrence_pattern else None
+            )
+            events.append({"id": str(uuid.uuid4()), **data})
+
+        await db.execute(
+            insert(Event),
+            [{**event, "created_by": user_id, "current_version": 1} for event in events]
+        )
+        await db.execute(
+            insert(EventPermission),
+            [{"event_id": event["id"], "user_id": user_id, "role": "OWNER"} for event in events]
+        )
+        await db.execute(
+            insert(EventVersion),
+            [
+                {
+                    **{field: event[field] for field in VERSIONED_FIELDS},
+                    "event_id": event["id"],
+                    "version_number": 1,
+                    "changed_by": user_id,
+                    "change_comment": "Initial creation",
+                }
+                for event in events
+            ]
+        )
+        await ChangeRepository().record_events_for_user(
+            db,
+            user_id=user_id,
+            change_type=CHANGE_CREATED,
+            versions={event["id"]: 1 for event in events}
+        )
+        await OutboxRepository().add_messages(
+            db,
+            topic=TOPIC_EVENT_CREATED,
+            payloads=[
+                {"event_id": event["id"], "event_title": event["title"], "creator_id": user_id}
+                for event in events
+            ]
+        )
+
+        await db.commit()
+        return [event["id"] for event in events]
+
     async def update_with_version(
         self, 
         db: AsyncSession, 
@@ -163,6 +504,7 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
             changed_by=user_id,
             change_comment=change_comment
         )
+        version.changed_fields = compute_changed_fields(db_obj, version)
         db.add(version)
         
         # Update the event
@@ -174,11 +516,146 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
         
         # Update current version number
         update_data["current_version"] = new_version_number
+        update_data["changed_fields"] = version.changed_fields
+        
+        await ChangeRepository().record_for_event_users(
+            db,
+            event_id=db_obj.id,
+            change_type=CHANGE_UPDATED,
+            version=new_version_number
+        )
+        OutboxRepository().add_message(
+            db,
+            topic=TOPIC_EVENT_UPDATED,
+            payload={
+                "event_id": db_obj.id,
+                "event_title": version.title,
+                "updater_id": user_id,
+                "version": new_version_number
+            }
+        )
         
         # Update the event
         updated_event = await super().update(db, db_obj=db_obj, obj_in=update_data)
+        await event_cache.invalidate(db_obj.id)
         return updated_event
     
+    async def update_if_version(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_id: str, 
+        expected_version: int,
+        obj_in: EventUpdate, 
+        user_id: str,
+        change_comment: Optional[str] = None
+    ) -> Optional[Event]:
+        """
+        Compare-and-swap update of an event and create a new version
+        
+        Issues a single conditional UPDATE that only matches while the event is still at
+        expected_version and the user can edit it, returning the new row without a prior SELECT.
+        Returns None when nothing matched; the caller decides between 404, 403 and 412.
+        The SET clause compares the submitted values with the old ones, so changed_fields
+        only holds the fields that actually changed.
+        """
+        update_data = obj_in.dict(exclude_unset=True)
+        
+        # the user's group roles are resolved by joining group_memberships in the same statement
+        membership = and_(
+            GroupMembership.group_id == EventPermission.group_id,
+            GroupMembership.user_id == user_id
+        )
+        can_edit = (
+            select(EventPermission.id)
+            .outerjoin(GroupMembership, membership)
+            .where(
+                and_(
+                    EventPermission.event_id == Event.id,
+                    or_(EventPermission.user_id == user_id, GroupMembership.user_id.isnot(None)),
+                    EventPermission.role.in_(["OWNER", "EDITOR"])
+                )
+            )
+            .exists()
+        )
+        query = (
+            update(Event)
+            .where(
+                and_(
+                    Event.id == event_id,
+                    Event.current_version == expected_version,
+                    can_edit
+                )
+            )
+            .values(
+                **update_data,
+                current_version=Event.current_version + 1,
+                changed_fields=changed_fields_expression(update_data)
+            )
+            .returning(Event)
+            .execution_options(synchronize_session=False)
+        )
+        # an instance already loaded in this session (e.g. for authorization) would be
+        # returned as-is with its old values, so let RETURNING build a fresh one
+        loaded = db.identity_map.get(identity_key(Event, event_id))
+        if loaded is not None:
+            db.expunge(loaded)
+        result = await db.execute(query)
+        event = result.scalars().first()
+        
+        if event is None:
+            return None
+        
+        # Validate the new time range against the user's other events before committing
+        if "start_time" in update_data or "end_time" in update_data:
+            conflicts = await self.check_event_conflicts(
+                db,
+                user_id=user_id,
+                start_time=event.start_time,
+                end_time=event.end_time,
+                event_id=event_id
+            )
+            if conflicts:
+                await db.rollback()
+                raise ConflictError(f"Event conflicts with {len(conflicts)} existing events")
+        
+        version = EventVersion(
+            event_id=event.id,
+            version_number=event.current_version,
+            title=event.title,
+            description=event.description,
+            start_time=event.start_time,
+            end_time=event.end_time,
+            location=event.location,
+            is_recurring=event.is_recurring,
+            recurrence_pattern=event.recurrence_pattern,
+            changed_by=user_id,
+            change_comment=change_comment,
+            changed_fields=event.changed_fields
+        )
+        db.add(version)
+        
+        await ChangeRepository().record_for_event_users(
+            db,
+            event_id=event.id,
+            change_type=CHANGE_UPDATED,
+            version=event.current_version
+        )
+        OutboxRepository().add_message(
+            db,
+            topic=TOPIC_EVENT_UPDATED,
+            payload={
+                "event_id": event.id,
+                "event_title": event.title,
+                "updater_id": user_id,
+                "version": event.current_version
+            }
+        )
+        
+        await db.commit()
+        await event_cache.invalidate(event.id)
+        return event
+    
     async def check_event_conflicts(
         self, 
         db: AsyncSession, 
@@ -191,13 +668,8 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
         """
         Check for conflicting events for a user
         """
-        query = select(Event).join(
-            EventPermission,
-            and_(
-                EventPermission.event_id == Event.id,
-                EventPermission.user_id == user_id
-            )
-        ).where(
+        group_ids = await GroupRepository().get_group_ids_for_user(db, user_id=user_id)
+        query = select(Event).where(self._accessible_by(user_id, group_ids)).where(
             or_(
                 # Event starts during another event
                 and_(
@@ -224,6 +696,237 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
         result = await db.execute(query)
         return result.scalars().all()
     
+    async def count_conflicts_for_ranges(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: str,
+        ranges: Dict[str, Tuple[datetime, datetime]],
+        moved: Iterable[str]
+    ) -> Dict[str, int]:
+        """
+        Count the conflicts of several events' new time ranges in one query and one sweep
+        
+        ranges holds the final range of every event in a batch. Each moved event is checked
+        against the user's other events and against the rest of the batch; ranges overlap
+        as in check_event_conflicts
+        """
+        moved = set(moved)
+        if not moved:
+            return {}
+        ranges = {event_id: (as_utc(start), as_utc(end)) for event_id, (start, end) in ranges.items()}
+        window_start = min(ranges[event_id][0] for event_id in moved)
+        window_end = max(ranges[event_id][1] for event_id in moved)
+        
+        group_ids = await GroupRepository().get_group_ids_for_user(db, user_id=user_id)
+        query = select(Event.id, Event.start_time, Event.end_time).where(
+            and_(
+                self._accessible_by(user_id, group_ids),
+                Event.start_time < window_end,
+                Event.end_time > window_start,
+                Event.id.notin_(list(ranges))
+            )
+        )
+        result = await db.execute(query)
+        
+        intervals = [(as_utc(start), as_utc(end), event_id) for event_id, start, end in result.all()]
+        intervals.extend((start, end, event_id) for event_id, (start, end) in ranges.items())
+        intervals.sort(key=lambda interval: interval[0])
+        
+        conflicts = dict.fromkeys(moved, 0)
+        active: List[Tuple[datetime, datetime, str]] = []
+        for start, end, event_id in intervals:
+            active = [interval for interval in active if interval[1] > start]
+            for _, _, other_id in active:
+                if event_id in moved:
+                    conflicts[event_id] += 1
+                if other_id in moved:
+                    conflicts[other_id] += 1
+            active.append((start, end, event_id))
+        return conflicts
+    
+    async def update_batch(
+        self, 
+        db: AsyncSession, 
+        *, 
+        updates: List[Tuple[Event, EventUpdate]], 
+        user_id: str,
+        change_comment: Optional[str] = None,
+        atomic: bool = True
+    ) -> Tuple[List[Event], Dict[str, str]]:
+        """
+        Update several already authorized events, creating a version of each, and commit once
+        
+        Atomic batches are written with one statement per kind of write and, if that fails,
+        rolled back as a whole. Otherwise each event is written in its own savepoint, so an
+        event failing to write is reported while the others are kept. Returns the updated
+        events and {event_id: error}
+        """
+        event_ids = [event.id for event, _ in updates]
+        failed = await self._write_batch(
+            db,
+            items=updates,
+            write=lambda items: self._write_updates(db, items, user_id, change_comment),
+            atomic=atomic
+        )
+        
+        updated_ids = [event_id for event_id in event_ids if event_id not in failed]
+        for event_id in updated_ids:
+            await event_cache.invalidate(event_id)
+        
+        if not updated_ids:
+            return [], failed
+        query = select(Event).where(Event.id.in_(updated_ids)).execution_options(populate_existing=True)
+        result = await db.execute(query)
+        return result.scalars().all(), failed
+    
+    async def delete_batch(
+        self, 
+        db: AsyncSession, 
+        *, 
+        events: List[Event], 
+        deleted_by: str,
+        atomic: bool = True
+    ) -> Dict[str, str]:
+        """
+        Delete several already authorized events and commit once
+        
+        Like delete, queues an event_deleted message and a tombstone for every user who had
+        access. Atomic batches are written with one statement per kind of write and rolled
+        back as a whole on failure, otherwise each event is deleted in its own savepoint.
+        Returns {event_id: error}
+        """
+        event_ids = [event.id for event in events]
+        failed = await self._write_batch(
+            db,
+            items=events,
+            write=lambda items: self._write_deletes(db, items, deleted_by),
+            atomic=atomic
+        )
+        
+        for event_id in event_ids:
+            if event_id not in failed:
+                await permission_cache.invalidate(event_id)
+                await event_cache.invalidate(event_id)
+        return failed
+    
+    async def _write_batch(
+        self, 
+        db: AsyncSession, 
+        *, 
+        items: List[Any], 
+        write: Callable[[List[Any]], Awaitable[None]], 
+        atomic: bool
+    ) -> Dict[str, str]:
+        """run write over all items at once, or item by item in savepoints, then commit"""
+        event_ids = [(item[0] if isinstance(item, tuple) else item).id for item in items]
+        failed: Dict[str, str] = {}
+        if atomic:
+            try:
+                await write(items)
+            except SQLAlchemyError as e:
+                await db.rollback()
+                return dict.fromkeys(event_ids, self._error_detail(e))
+        else:
+            for event_id, item in zip(event_ids, items):
+                try:
+                    async with db.begin_nested():
+                        await write([item])
+                except SQLAlchemyError as e:
+                    failed[event_id] = self._error_detail(e)
+        
+        await db.commit()
+        return failed
+    
+    @staticmethod
+    def _error_detail(error: SQLAlchemyError) -> str:
+        return str(getattr(error, "orig", None) or error).splitlines()[0]
+    
+    async def _write_updates(
+        self, 
+        db: AsyncSession, 
+        items: List[Tuple[Event, EventUpdate]], 
+        user_id: str,
+        change_comment: Optional[str]
+    ) -> None:
+        """write new versions, events, change feed rows and outbox messages for a batch"""
+        rows_by_columns: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+        versions: Dict[str, int] = {}
+        payloads: List[Dict[str, Any]] = []
+        
+        for event, obj_in in items:
+            update_data = obj_in.dict(exclude_unset=True, exclude={"id", "expected_version"})
+            new_version_number = event.current_version + 1
+            
+            version = EventVersion(
+                event_id=event.id,
+                version_number=new_version_number,
+                changed_by=user_id,
+                change_comment=change_comment,
+                **{field: update_data.get(field, getattr(event, field)) for field in VERSIONED_FIELDS}
+            )
+            version.changed_fields = compute_changed_fields(event, version)
+            db.add(version)
+            
+            columns = tuple(sorted(update_data))
+            rows_by_columns[columns].append({
+                "b_id": event.id,
+                "b_current_version": new_version_number,
+                "b_changed_fields": version.changed_fields,
+                **{f"b_{column}": value for column, value in update_data.items()}
+            })
+            versions[event.id] = new_version_number
+            payloads.append({
+                "event_id": event.id,
+                "event_title": version.title,
+                "updater_id": user_id,
+                "version": new_version_number
+            })
+        
+        # one executemany per set of updated columns
+        table = Event.__table__
+        for columns, rows in rows_by_columns.items():
+            query = update(table).where(table.c.id == bindparam("b_id")).values({
+                "current_version": bindparam("b_current_version"),
+                "changed_fields": bindparam("b_changed_fields"),
+                **{column: bindparam(f"b_{column}") for column in columns}
+            })
+            await db.execute(query, rows)
+        
+        await OutboxRepository().add_messages(db, topic=TOPIC_EVENT_UPDATED, payloads=payloads)
+        await ChangeRepository().record_for_events(db, change_type=CHANGE_UPDATED, versions=versions)
+        await db.flush()
+    
+    async def _write_deletes(self, db: AsyncSession, events: List[Event], deleted_by: str) -> None:
+        """write outbox messages, tombstones and the deletion of a batch of events"""
+        event_ids = [event.id for event in events]
+        result = await db.execute(events_user_ids_query(event_ids))
+        affected_users: Dict[str, List[str]] = defaultdict(list)
+        for event_id, user_id in result.all():
+            affected_users[event_id].append(user_id)
+        
+        await OutboxRepository().add_messages(
+            db,
+            topic=TOPIC_EVENT_DELETED,
+            payloads=[
+                {
+                    "event_id": event.id,
+                    "event_title": event.title,
+                    "deleter_id": deleted_by,
+                    "affected_users": affected_users[event.id]
+                }
+                for event in events
+            ]
+        )
+        
+        await ChangeRepository().record_for_events(
+            db,
+            change_type=CHANGE_DELETED,
+            versions=dict.fromkeys(event_ids)
+        )
+        await db.execute(delete(Event).where(Event.id.in_(event_ids)))
+        await db.flush()
+    
     async def get_version(
         self, 
         db: AsyncSession, 
@@ -258,19 +961,79 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
         result = await db.execute(query)
         return result.scalars().all()
     
+    async def get_version_rows(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_id: str
+    ) -> List[Any]:
+        """
+        Get all versions of an event as read-only Core rows, in version order
+        """
+        query = select(EventVersion.__table__).where(
+            EventVersion.event_id == event_id
+        ).order_by(EventVersion.version_number)
+        result = await db.execute(query)
+        return result.all()
+    
+    async def get_versions_changing(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_id: str,
+        field_mask: int
+    ) -> List[EventVersion]:
+        """
+        Get the versions of an event that changed any field in field_mask
+        
+        The filter runs in the database against the (event_id, changed_fields) index
+        """
+        query = select(EventVersion).where(
+            and_(
+                EventVersion.event_id == event_id,
+                EventVersion.changed_fields.op("&")(field_mask) != 0
+            )
+        ).order_by(EventVersion.version_number)
+        result = await db.execute(query)
+        return result.scalars().all()
+    
+    async def get_versions_by_number(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_id: str,
+        version_numbers: List[int]
+    ) -> Dict[int, EventVersion]:
+        """
+        Get several versions of an event keyed by version number
+        """
+        if not version_numbers:
+            return {}
+        query = select(EventVersion).where(
+            and_(
+                EventVersion.event_id == event_id,
+                EventVersion.version_number.in_(version_numbers)
+            )
+        )
+        result = await db.execute(query)
+        return {version.version_number: version for version in result.scalars().all()}
+    
     async def rollback_to_version(
         self, 
         db: AsyncSession, 
         *, 
         event_id: str, 
         version_number: int, 
-        user_id: str
+        user_id: str,
+        db_obj: Optional[Event] = None
     ) -> Event:
         """
         Rollback an event to a previous version
+        
+        Pass db_obj when the event is already loaded to skip reading it again
         """
         # Get the event
-        event = await self.get_by_id(db, id=event_id)
+        event = db_obj if db_obj is not None else await self.get_by_id(db, id=event_id)
         if not event:
             raise ResourceNotFoundError("Event not found")
         
@@ -281,6 +1044,7 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
         
         # Create a new version (current state before rollback)
         new_version_number = event.current_version + 1
+        changed_fields = compute_changed_fields(event, version)
         
         # Update the event with the version data
         event.title = version.title
@@ -291,6 +1055,7 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
         event.is_recurring = version.is_recurring
         event.recurrence_pattern = version.recurrence_pattern
         event.current_version = new_version_number
+        event.changed_fields = changed_fields
         
         # Create a new version record
         rollback_version = EventVersion(
@@ -304,13 +1069,69 @@ class EventRepository(BaseRepository[Event, EventCreate, EventUpdate]):
             is_recurring=version.is_recurring,
             recurrence_pattern=version.recurrence_pattern,
             changed_by=user_id,
-            change_comment=f"Rollback to version {version_number}"
+            change_comment=f"Rollback to version {version_number}",
+            changed_fields=changed_fields
         )
         db.add(rollback_version)
         
+        await ChangeRepository().record_for_event_users(
+            db,
+            event_id=event.id,
+            change_type=CHANGE_UPDATED,
+            version=new_version_number
+        )
+        OutboxRepository().add_message(
+            db,
+            topic=TOPIC_EVENT_UPDATED,
+            payload={
+                "event_id": event.id,
+                "event_title": version.title,
+                "updater_id": user_id,
+                "version": new_version_number
+            }
+        )
+        
         # Save changes
         db.add(event)
         await db.commit()
+        await event_cache.invalidate(event.id)
         await db.refresh(event)
         
         return event
+    
+    async def delete(self, db: AsyncSession, *, id: Any, deleted_by: Optional[str] = None) -> bool:
+        """
+        Delete an event, leaving a tombstone in the change feed of every user who had access
+        
+        When deleted_by is given, an event_deleted message is queued for the users who had access
+        """
+        if deleted_by:
+            user_ids = event_user_ids_query(id).subquery()
+            query = select(Event.title, user_ids.c.user_id).outerjoin(
+                user_ids,
+                literal(True)
+            ).where(Event.id == id)
+            result = await db.execute(query)
+            rows = result.all()
+            
+            if rows:
+                OutboxRepository().add_message(
+                    db,
+                    topic=TOPIC_EVENT_DELETED,
+                    payload={
+                        "event_id": id,
+                        "event_title": rows[0][0],
+                        "deleter_id": deleted_by,
+                        "affected_users": [row[1] for row in rows if row[1]]
+                    }
+                )
+        
+        await ChangeRepository().record_for_event_users(
+            db,
+            event_id=id,
+            change_type=CHANGE_DELETED
+        )
+        deleted = await super().delete(db, id=id)
+        await permission_cache.invalidate(id)
+        await event_cache.invalidate(id)
+        return deleted
@@ -0,0 +1,252 @@
+from typing import Optional, List, Dict, FrozenSet, Iterable
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import and_, or_, delete, union
+
+from app.db.repositories.base import BaseRepository, dialect_insert
+from app.db.models.event import EventPermission
+from app.db.models.group import Group, GroupMembership
+from app.services.permission_cache import permission_cache
+
+
+# session.info key caching each user's group ids for the lifetime of the session, i.e. one request
+GROUP_IDS_CACHE = "group_ids"
+
+
+def held_by(user_id: str, group_ids: Iterable[str]):
+    """
+    Condition matching permissions a user holds directly or through one of their groups
+    """
+    group_ids = list(group_ids)
+    if not group_ids:
+        return EventPermission.user_id == user_id
+    return or_(EventPermission.user_id == user_id, EventPermission.group_id.in_(group_ids))
+
+
+def event_user_ids_query(event_id: str):
+    """
+    Select the ids of every user with access to an event, directly or through a group
+    """
+    direct = select(EventPermission.user_id).where(
+        and_(
+            EventPermission.event_id == event_id,
+            EventPermission.user_id.isnot(None)
+        )
+    )
+    through_groups = select(GroupMembership.user_id).join(
+        EventPermission,
+        EventPermission.group_id == GroupMembership.group_id
+    ).where(EventPermission.event_id == event_id)
+    return union(direct, through_groups)
+
+
+def events_user_ids_query(event_ids: Iterable[str]):
+    """
+    Select (event_id, user_id) for every user with access to any of several events
+    """
+    event_ids = list(event_ids)
+    direct = select(EventPermission.event_id, EventPermission.user_id).where(
+        and_(
+            EventPermission.event_id.in_(event_ids),
+            EventPermission.user_id.isnot(None)
+        )
+    )
+    through_groups = select(EventPermission.event_id, GroupMembership.user_id).join(
+        EventPermission,
+        EventPermission.group_id == GroupMembership.group_id
+    ).where(EventPermission.event_id.in_(event_ids))
+    return union(direct, through_groups)
+
+
+class GroupRepository(BaseRepository[Group, BaseModel, BaseModel]):
+    """
+    Repository for groups and their memberships
+
+    Events shared with a group are stored as a single permission row, so access checks
+    resolve the caller's group ids once per request instead of reading per-member rows
+    """
+
+    def __init__(self):
+        super().__init__(Group)
+
+    async def get_group_ids_for_user(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str
+    ) -> FrozenSet[str]:
+        """
+        Get the ids of the groups a user belongs to
+
+        Cached on the session, so every access check within a request shares one query
+        """
+        cache = db.info.setdefault(GROUP_IDS_CACHE, {})
+        if user_id not in cache:
+            query = select(GroupMembership.group_id).where(GroupMembership.user_id == user_id)
+            result = await db.execute(query)
+            cache[user_id] = frozenset(result.scalars().all())
+        return cache[user_id]
+
+    async def get_for_user(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str
+    ) -> List[Group]:
+        """
+        Get the groups a user created or belongs to
+        """
+        group_ids = await self.get_group_ids_for_user(db, user_id=user_id)
+        query = select(Group).where(
+            or_(Group.created_by == user_id, Group.id.in_(group_ids))
+        ).order_by(Group.name)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def get_existing_ids(
+        self,
+        db: AsyncSession,
+        *,
+        group_ids: List[str]
+    ) -> FrozenSet[str]:
+        """
+        Get which of the given group ids exist, in one query
+        """
+        if not group_ids:
+            return frozenset()
+        result = await db.execute(select(Group.id).where(Group.id.in_(group_ids)))
+        return frozenset(result.scalars().all())
+
+    async def get_member_ids(
+        self,
+        db: AsyncSession,
+        *,
+        group_ids: List[str]
+    ) -> Dict[str, List[str]]:
+        """
+        Get the member ids of several groups in one query, keyed by group id
+        """
+        members: Dict[str, List[str]] = {group_id: [] for group_id in group_ids}
+        if not group_ids:
+            return members
+        query = select(GroupMembership.group_id, GroupMembership.user_id).where(
+            GroupMembership.group_id.in_(group_ids)
+        )
+        result = await db.execute(query)
+        for group_id, user_id in result.all():
+            members[group_id].append(user_id)
+        return members
+
+    async def get_event_ids(
+        self,
+        db: AsyncSession,
+        *,
+        group_id: str
+    ) -> List[str]:
+        """
+        Get the ids of the events shared with a group
+        """
+        query = select(EventPermission.event_id).where(EventPermission.group_id == group_id)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def create_with_members(
+        self,
+        db: AsyncSession,
+        *,
+        name: str,
+        created_by: str,
+        member_ids: List[str]
+    ) -> Group:
+        """
+        Create a group and add its initial members
+        """
+        group = Group(name=name, created_by=created_by)
+        db.add(group)
+        await db.flush()
+        await self.add_members(db, group_id=group.id, user_ids=member_ids)
+        await db.refresh(group)
+        return group
+
+    async def add_members(
+        self,
+        db: AsyncSession,
+        *,
+        group_id: str,
+        user_ids: List[str]
+    ) -> None:
+        """
+        Add users to a group, ignoring those already in it, and commit
+
+        New members gain access to every event shared with the group, which is recorded in
+        their change feeds with one INSERT ... SELECT
+        """
+        # imported here because the change repository builds on this module's queries
+        from app.db.repositories.change import ChangeRepository, CHANGE_SHARED
+
+        if user_ids:
+            query = dialect_insert(db, GroupMembership).values([
+                {"group_id": group_id, "user_id": user_id} for user_id in user_ids
+            ]).on_conflict_do_nothing(index_elements=["group_id", "user_id"])
+            await db.execute(query)
+            await ChangeRepository().record_for_group_members(
+                db,
+                group_id=group_id,
+                user_ids=user_ids,
+                change_type=CHANGE_SHARED
+            )
+
+        event_ids = await self.get_event_ids(db, group_id=group_id)
+        await db.commit()
+        self._forget(db, user_ids)
+        for user_id in user_ids:
+            await permission_cache.invalidate_user(user_id, event_ids)
+
+    async def remove_member(
+        self,
+        db: AsyncSession,
+        *,
+        group_id: str,
+        user_id: str
+    ) -> bool:
+        """
+        Remove a user from a group and commit
+
+        Events the user can no longer reach through another permission get a revoked
+        tombstone in their change feed
+        """
+        from app.db.repositories.change import ChangeRepository, CHANGE_REVOKED
+
+        result = await db.execute(
+            delete(GroupMembership).where(
+                and_(
+                    GroupMembership.group_id == group_id,
+                    GroupMembership.user_id == user_id
+                )
+            )
+        )
+        if not result.rowcount:
+            return False
+
+        self._forget(db, [user_id])
+        remaining_group_ids = await self.get_group_ids_for_user(db, user_id=user_id)
+        await ChangeRepository().record_revoked_for_group_member(
+            db,
+            group_id=group_id,
+            user_id=user_id,
+            remaining_group_ids=remaining_group_ids
+        )
+
+        event_ids = await self.get_event_ids(db, group_id=group_id)
+        await db.commit()
+        self._forget(db, [user_id])
+        await permission_cache.invalidate_user(user_id, event_ids)
+        return True
+
+    @staticmethod
+    def _forget(db: AsyncSession, user_ids: Iterable[str]) -> None:
+        cache = db.info.get(GROUP_IDS_CACHE)
+        if cache:
+            for user_id in user_ids:
+                cache.pop(user_id, None)
@@ -0,0 +1,149 @@
+from typing import List, Dict, Any, Optional, Tuple
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import and_, case, insert, update, func
+
+from app.db.repositories.base import BaseRepository, dialect_insert
+from app.db.models.notification import Notification, NotificationCounter
+
+
+class NotificationRepository(BaseRepository[Notification, BaseModel, BaseModel]):
+    """
+    Repository for notifications of the database notification backend
+    """
+
+    def __init__(self):
+        super().__init__(Notification)
+
+    async def add_many(
+        self,
+        db: AsyncSession,
+        *,
+        deliveries: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[int]:
+        """
+        Insert notifications for many users in one statement, bump their unread counters
+        in another, and return the new ids in order
+        """
+        if not deliveries:
+            return []
+        query = insert(Notification).returning(Notification.id, sort_by_parameter_order=True)
+        result = await db.execute(query, [
+            {
+                "user_id": user_id,
+                "type": notification["type"],
+                "event_id": notification.get("event_id"),
+                "data": notification,
+            }
+            for user_id, notification in deliveries
+        ])
+        ids = list(result.scalars())
+
+        counts: Dict[str, int] = {}
+        for user_id, _ in deliveries:
+            counts[user_id] = counts.get(user_id, 0) + 1
+        query = dialect_insert(db, NotificationCounter).values([
+            {"user_id": user_id, "unread": count}
+            for user_id, count in counts.items()
+        ])
+        query = query.on_conflict_do_update(
+            index_elements=[NotificationCounter.user_id],
+            set_={"unread": NotificationCounter.unread + query.excluded.unread}
+        )
+        await db.execute(query)
+        return ids
+
+    async def get_for_user(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str,
+        after: Optional[int] = None,
+        limit: int = 100
+    ) -> List[Notification]:
+        """
+        Get a page of a user's notifications, oldest first
+
+        With after, returns the notifications following that id; without it, the newest ones
+        """
+        query = select(Notification).where(Notification.user_id == user_id)
+        if after is not None:
+            query = query.where(Notification.id > after).order_by(Notification.id).limit(limit)
+            result = await db.execute(query)
+            return result.scalars().all()
+
+        query = query.order_by(Notification.id.desc()).limit(limit)
+        result = await db.execute(query)
+        return list(reversed(result.scalars().all()))
+
+    async def get_for_users_since(
+        self,
+        db: AsyncSession,
+        *,
+        user_ids: List[str],
+        after: int,
+        limit: int = 1000
+    ) -> List[Notification]:
+        """
+        Get notifications for any of the users with an id above after, oldest first
+        """
+        if not user_ids:
+            return []
+        query = select(Notification).where(
+            and_(
+                Notification.id > after,
+                Notification.user_id.in_(user_ids)
+            )
+        ).order_by(Notification.id).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def get_last_id(self, db: AsyncSession) -> int:
+        """
+        Get the highest notification id, 0 when there are none
+        """
+        result = await db.execute(select(func.max(Notification.id)))
+        return result.scalar() or 0
+
+    async def mark_read(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str,
+        notification_ids: Optional[List[int]] = None
+    ) -> int:
+        """
+        Mark the given notifications, or all unread ones when notification_ids is None, as read,
+        keep the unread counter in step and return how many changed
+        """
+        conditions = [Notification.user_id == user_id, Notification.read.is_(False)]
+        if notification_ids is not None:
+            if not notification_ids:
+                return 0
+            conditions.append(Notification.id.in_(notification_ids))
+        result = await db.execute(update(Notification).where(and_(*conditions)).values(read=True))
+
+        if notification_ids is None:
+            unread = 0
+        elif result.rowcount:
+            unread = case(
+                (NotificationCounter.unread > result.rowcount, NotificationCounter.unread - result.rowcount),
+                else_=0
+            )
+        else:
+            return 0
+        await db.execute(
+            update(NotificationCounter).where(
+                NotificationCounter.user_id == user_id
+            ).values(unread=unread)
+        )
+        return result.rowcount
+
+    async def count_unread(self, db: AsyncSession, *, user_id: str) -> int:
+        """
+        Get a user's unread count from the maintained counter
+        """
+        query = select(NotificationCounter.unread).where(NotificationCounter.user_id == user_id)
+        result = await db.execute(query)
+        return result.scalar() or 0
@@ -0,0 +1,125 @@
+from typing import List, Dict, Any, Iterable
+from datetime import datetime, timezone
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import and_, update, func, insert
+
+from app.db.repositories.base import BaseRepository
+from app.db.models.outbox import OutboxMessage
+
+
+TOPIC_EVENT_CREATED = "event_created"
+TOPIC_EVENT_UPDATED = "event_updated"
+TOPIC_EVENT_DELETED = "event_deleted"
+TOPIC_PERMISSION_CHANGED = "permission_changed"
+TOPIC_PERMISSIONS_SHARED = "permissions_shared"
+
+# session.info flag telling the dispatcher that a commit carried outbox messages
+OUTBOX_PENDING = "outbox_pending"
+
+
+class OutboxRepository(BaseRepository[OutboxMessage, BaseModel, BaseModel]):
+    """
+    Repository for the transactional outbox
+
+    Writers add messages inside their own transaction and commit themselves,
+    so a message exists if and only if the change it describes was committed
+    """
+
+    def __init__(self):
+        super().__init__(OutboxMessage)
+
+    def add_message(self, db: AsyncSession, *, topic: str, payload: Dict[str, Any]) -> None:
+        """
+        Queue a message in the current transaction
+        """
+        db.add(OutboxMessage(topic=topic, payload=payload))
+        db.info[OUTBOX_PENDING] = True
+
+    async def add_messages(self, db: AsyncSession, *, topic: str, payloads: List[Dict[str, Any]]) -> None:
+        """
+        Queue several messages of one topic in the current transaction, as one executemany
+        """
+        if not payloads:
+            return
+        await db.execute(insert(OutboxMessage), [{"topic": topic, "payload": payload} for payload in payloads])
+        db.info[OUTBOX_PENDING] = True
+
+    async def get_pending(
+        self,
+        db: AsyncSession,
+        *,
+        limit: int = 100,
+        max_attempts: int = 5,
+        exclude_ids: Iterable[int] = ()
+    ) -> List[OutboxMessage]:
+        """
+        Get the oldest undelivered messages, skipping rows locked by another dispatcher
+        and exclude_ids, messages delivered but not yet acknowledged
+        """
+        conditions = [
+            OutboxMessage.processed_at.is_(None),
+            OutboxMessage.attempts < max_attempts
+        ]
+        exclude_ids = list(exclude_ids)
+        if exclude_ids:
+            conditions.append(OutboxMessage.id.notin_(exclude_ids))
+        query = select(OutboxMessage).where(
+            and_(*conditions)
+        ).order_by(OutboxMessage.id).limit(limit).with_for_update(skip_locked=True)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def mark_processed(self, db: AsyncSession, *, ids: List[int]) -> None:
+        """
+        Mark messages as delivered
+        """
+        if not ids:
+            return
+        query = update(OutboxMessage).where(
+            OutboxMessage.id.in_(ids)
+        ).values(
+            processed_at=datetime.now(timezone.utc),
+            attempts=OutboxMessage.attempts + 1
+        )
+        await db.execute(query)
+
+    async def mark_failed(self, db: AsyncSession, *, id: int, error: str) -> None:
+        """
+        Record a failed delivery attempt so the message is retried later
+        """
+        query = update(OutboxMessage).where(
+            OutboxMessage.id == id
+        ).values(
+            attempts=OutboxMessage.attempts + 1,
+            last_error=error
+        )
+        await db.execute(query)
+
+    async def get_backlog(self, db: AsyncSession, *, max_attempts: int = 5) -> Dict[str, Any]:
+        """
+        Get the number of pending messages and the creation time of the oldest one
+        """
+        query = select(
+            func.count(OutboxMessage.id),
+            func.min(OutboxMessage.created_at)
+        ).where(
+            and_(
+                OutboxMessage.processed_at.is_(None),
+                OutboxMessage.attempts < max_attempts
+            )
+        )
+        result = await db.execute(query)
+        pending, oldest = result.first()
+
+        query = select(func.count(OutboxMessage.id)).where(
+            and_(
+                OutboxMessage.processed_at.is_(None),
+                OutboxMessage.attempts >= max_attempts
+            )
+        )
+        result = await db.execute(query)
+        dead = result.scalar()
+
+        return {"pending": pending, "oldest_created_at": oldest, "dead": dead}
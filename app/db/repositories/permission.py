@@ -1,12 +1,25 @@
 from typing import Optional, List, Dict, Any
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 
-from app.db.repositories.base import BaseRepository
-from app.db.models.event import EventPermission
+from app.db.repositories.base import BaseRepository, dialect_insert
+from app.db.repositories.group import GroupRepository, held_by, event_user_ids_query
+from app.db.repositories.change import ChangeRepository, CHANGE_SHARED, CHANGE_REVOKED
+from app.db.repositories.outbox import (
+    OutboxRepository,
+    TOPIC_PERMISSION_CHANGED,
+    TOPIC_PERMISSIONS_SHARED
+)
+from app.db.models.event import Event, EventPermission
 from app.schemas.event import EventPermissionCreate, EventPermissionUpdate
 from app.core.exceptions import ResourceNotFoundError, AuthorizationError
+from app.core.security import check_permissions, highest_role
+from app.services.permission_cache import permission_cache
+
+# rows per multi-row INSERT, keeping bound parameters well below SQLite's and Postgres' limits
+UPSERT_CHUNK_SIZE = 1000
 
 
 class PermissionRepository(BaseRepository[EventPermission, EventPermissionCreate, EventPermissionUpdate]):
@@ -49,24 +62,68 @@ class PermissionRepository(BaseRepository[EventPermission, EventPermissionCreate
         result = await db.execute(query)
         return result.scalars().all()
     
+    async def get_rows_by_event(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_id: str
+    ) -> List[Any]:
+        """
+        Get all permissions for an event as read-only Core rows
+        """
+        query = select(EventPermission.__table__).where(EventPermission.event_id == event_id)
+        result = await db.execute(query)
+        return result.all()
+    
+    async def get_user_ids_by_event(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_id: str
+    ) -> List[str]:
+        """
+        Get the ids of all users with access to an event, directly or through a group
+        """
+        result = await db.execute(event_user_ids_query(event_id))
+        return result.scalars().all()
+    
     async def create_permission(
         self, 
         db: AsyncSession, 
         *, 
         event_id: str, 
         user_id: str, 
-        role: str
+        role: str,
+        changed_by: Optional[str] = None
     ) -> EventPermission:
         """
         Create a new permission
+        
+        When changed_by is given, a permission_changed message is queued in the same transaction
         """
         # Check if permission already exists
         existing = await self.get_by_event_and_user(db, event_id=event_id, user_id=user_id)
+        await ChangeRepository().record_for_users(
+            db,
+            event_id=event_id,
+            change_type=CHANGE_SHARED,
+            user_ids=[user_id]
+        )
+        if changed_by:
+            await self._queue_permission_changed(
+                db,
+                event_id=event_id,
+                user_id=user_id,
+                role=role,
+                changed_by=changed_by
+            )
+        
         if existing:
             # Update the role if it exists
             existing.role = role
             db.add(existing)
             await db.commit()
+            await permission_cache.invalidate(event_id, user_id)
             await db.refresh(existing)
             return existing
         
@@ -78,19 +135,154 @@ class PermissionRepository(BaseRepository[EventPermission, EventPermissionCreate
         )
         db.add(permission)
         await db.commit()
+        await permission_cache.invalidate(event_id, user_id)
         await db.refresh(permission)
         return permission
     
+    async def upsert_permissions(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_id: str, 
+        roles: Dict[str, str],
+        group_roles: Optional[Dict[str, str]] = None,
+        changed_by: Optional[str] = None,
+        event_title: Optional[str] = None
+    ) -> List[EventPermission]:
+        """
+        Grant or change many users' and groups' roles on an event in one transaction
+        
+        roles maps user ids and group_roles group ids to roles. Rows are written by
+        INSERT ... ON CONFLICT (event_id, user_id / group_id) DO UPDATE, one statement per
+        chunk of users plus one for all groups. Group members get no rows of their own; they
+        resolve access through their group ids. When changed_by is given one
+        permissions_shared message covering everything is queued with them. Callers are
+        expected to have checked that the users and groups exist.
+        """
+        group_roles = group_roles or {}
+        if not roles and not group_roles:
+            return []
+        
+        rows = [
+            {"id": str(uuid.uuid4()), "event_id": event_id, "user_id": user_id, "role": role}
+            for user_id, role in roles.items()
+        ]
+        permissions = []
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            permissions.extend(await self._upsert_rows(
+                db,
+                rows=rows[start:start + UPSERT_CHUNK_SIZE],
+                conflict_column=EventPermission.user_id
+            ))
+        
+        user_ids = set(roles)
+        if group_roles:
+            permissions.extend(await self._upsert_rows(
+                db,
+                rows=[
+                    {"id": str(uuid.uuid4()), "event_id": event_id, "group_id": group_id, "role": role}
+                    for group_id, role in group_roles.items()
+                ],
+                conflict_column=EventPermission.group_id
+            ))
+            members = await GroupRepository().get_member_ids(db, group_ids=list(group_roles))
+            user_ids.update(user_id for group_members in members.values() for user_id in group_members)
+        
+        await ChangeRepository().record_for_users(
+            db,
+            event_id=event_id,
+            change_type=CHANGE_SHARED,
+            user_ids=user_ids
+        )
+        if changed_by:
+            if event_title is None:
+                result = await db.execute(select(Event.title).where(Event.id == event_id))
+                event_title = result.scalar()
+            OutboxRepository().add_message(
+                db,
+                topic=TOPIC_PERMISSIONS_SHARED,
+                payload={
+                    "event_id": event_id,
+                    "event_title": event_title,
+                    "roles": roles,
+                    "group_roles": group_roles,
+                    "changer_id": changed_by
+                }
+            )
+        
+        await db.commit()
+        await permission_cache.invalidate(event_id)
+        return permissions
+    
+    async def _upsert_rows(
+        self, 
+        db: AsyncSession, 
+        *, 
+        rows: List[Dict[str, Any]],
+        conflict_column
+    ) -> List[EventPermission]:
+        """
+        Insert permission rows in one statement, updating the role of existing ones
+        """
+        query = dialect_insert(db, EventPermission).values(rows)
+        query = query.on_conflict_do_update(
+            index_elements=[EventPermission.event_id, conflict_column],
+            set_={"role": query.excluded.role, "updated_at": func.now()}
+        ).returning(EventPermission)
+        result = await db.execute(query, execution_options={"populate_existing": True})
+        return list(result.scalars())
+    
+    async def delete_group_permission(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_id: str, 
+        group_id: str
+    ) -> bool:
+        """
+        Revoke a group's access to an event
+        
+        Members who keep no other permission on the event get a revoked entry in their
+        change feed
+        """
+        query = select(EventPermission).where(
+            and_(
+                EventPermission.event_id == event_id,
+                EventPermission.group_id == group_id
+            )
+        )
+        permission = (await db.execute(query)).scalars().first()
+        if not permission:
+            return False
+        
+        members = (await GroupRepository().get_member_ids(db, group_ids=[group_id]))[group_id]
+        await db.delete(permission)
+        await db.flush()
+        
+        still_allowed = set((await db.execute(event_user_ids_query(event_id))).scalars().all())
+        await ChangeRepository().record_for_users(
+            db,
+            event_id=event_id,
+            change_type=CHANGE_REVOKED,
+            user_ids=[user_id for user_id in members if user_id not in still_allowed]
+        )
+        await db.commit()
+        await permission_cache.invalidate(event_id)
+        return True
+    
     async def update_permission(
         self, 
         db: AsyncSession, 
         *, 
         event_id: str, 
         user_id: str, 
-        role: str
+        role: str,
+        changed_by: Optional[str] = None
     ) -> EventPermission:
         """
         Update a permission
+        
+        When changed_by is given, a permission_changed message is queued in the same transaction
         """
         permission = await self.get_by_event_and_user(db, event_id=event_id, user_id=user_id)
         if not permission:
@@ -98,7 +290,22 @@ class PermissionRepository(BaseRepository[EventPermission, EventPermissionCreate
         
         permission.role = role
         db.add(permission)
+        await ChangeRepository().record_for_users(
+            db,
+            event_id=event_id,
+            change_type=CHANGE_SHARED,
+            user_ids=[user_id]
+        )
+        if changed_by:
+            await self._queue_permission_changed(
+                db,
+                event_id=event_id,
+                user_id=user_id,
+                role=role,
+                changed_by=changed_by
+            )
         await db.commit()
+        await permission_cache.invalidate(event_id, user_id)
         await db.refresh(permission)
         return permission
     
@@ -111,15 +318,76 @@ class PermissionRepository(BaseRepository[EventPermission, EventPermissionCreate
     ) -> bool:
         """
         Delete a permission
+        
+        A user who keeps access through a group gets a shared entry in their change feed,
+        since their role may have changed; anyone else gets a revoked one
         """
         permission = await self.get_by_event_and_user(db, event_id=event_id, user_id=user_id)
         if not permission:
             return False
         
         await db.delete(permission)
+        await db.flush()
+        
+        still_allowed = set((await db.execute(event_user_ids_query(event_id))).scalars().all())
+        await ChangeRepository().record_for_users(
+            db,
+            event_id=event_id,
+            change_type=CHANGE_SHARED if user_id in still_allowed else CHANGE_REVOKED,
+            user_ids=[user_id]
+        )
         await db.commit()
+        await permission_cache.invalidate(event_id, user_id)
         return True
     
+    async def _queue_permission_changed(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_id: str, 
+        user_id: str, 
+        role: str,
+        changed_by: str
+    ) -> None:
+        """
+        Queue a permission_changed outbox message
+        """
+        result = await db.execute(select(Event.title).where(Event.id == event_id))
+        OutboxRepository().add_message(
+            db,
+            topic=TOPIC_PERMISSION_CHANGED,
+            payload={
+                "event_id": event_id,
+                "event_title": result.scalar(),
+                "user_id": user_id,
+                "role": role,
+                "changer_id": changed_by
+            }
+        )
+    
+    async def get_role(
+        self, 
+        db: AsyncSession, 
+        *, 
+        event_id: str, 
+        user_id: str
+    ) -> Optional[str]:
+        """
+        Get a user's role on an event through the permission cache, None without a permission
+        """
+        async def load() -> Optional[str]:
+            group_ids = await GroupRepository().get_group_ids_for_user(db, user_id=user_id)
+            query = select(EventPermission.role).where(
+                and_(
+                    EventPermission.event_id == event_id,
+                    held_by(user_id, group_ids)
+                )
+            )
+            result = await db.execute(query)
+            return highest_role(result.scalars().all())
+        
+        return await permission_cache.get_role(event_id, user_id, load)
+    
     async def check_permission(
         self, 
         db: AsyncSession, 
@@ -131,15 +399,8 @@ class PermissionRepository(BaseRepository[EventPermission, EventPermissionCreate
         """
         Check if a user has the required permission for an event
         """
-        permission = await self.get_by_event_and_user(db, event_id=event_id, user_id=user_id)
-        if not permission:
+        role = await self.get_role(db, event_id=event_id, user_id=user_id)
+        if not role:
             return False
         
-        # Role hierarchy: OWNER > EDITOR > VIEWER
-        role_hierarchy = {
-            "OWNER": 3,
-            "EDITOR": 2,
-            "VIEWER": 1
-        }
-        
-        return role_hierarchy.get(permission.role, 0) >= role_hierarchy.get(required_role, 0)
+        return check_permissions(required_role, role)
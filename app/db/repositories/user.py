@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -32,6 +32,16 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         result = await db.execute(query)
         return result.scalars().first()
     
+    async def get_existing_ids(self, db: AsyncSession, *, user_ids: List[str]) -> Set[str]:
+        """
+        Get which of the given user ids exist, in one query
+        """
+        if not user_ids:
+            return set()
+        query = select(User.id).where(User.id.in_(user_ids))
+        result = await db.execute(query)
+        return set(result.scalars().all())
+    
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         """
         Create a new user with hashed password
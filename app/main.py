@@ -9,9 +9,17 @@ from fastapi.openapi.utils import get_openapi
 
 from app.api.auth import router as auth_router
 from app.api.events import router as events_router
+from app.api.groups import router as groups_router
 from app.api.notifications import router as notifications_router
+from app.api.sync import router as sync_router
+from app.api.metrics import router as metrics_router
 from app.core.config import settings
 from app.core.exceptions import AppException
+from app.services.notification import notification_service
+from app.services.outbox import outbox_dispatcher
+from app.services.notification_worker import notification_worker_pool
+from app.services.notification_push import notification_broker
+from app.services.calendar_io import ics_parser
 
 app = FastAPI(
     title="Collaborative Event Management System",
@@ -31,6 +39,27 @@ app.add_middleware(
 )
 
 
+# Deliver committed outbox messages to the notification service through the worker pool
+notification_service.subscribe_to(outbox_dispatcher, worker_pool=notification_worker_pool)
+
+
+@app.on_event("startup")
+async def start_outbox_dispatcher():
+    await notification_worker_pool.start()
+    await outbox_dispatcher.start()
+    await notification_broker.start()
+
+
+@app.on_event("shutdown")
+async def stop_outbox_dispatcher():
+    await notification_broker.stop()
+    await outbox_dispatcher.stop()
+    await notification_worker_pool.stop()
+    await notification_service.flush_pending()
+    await outbox_dispatcher.wait_acknowledged()
+    ics_parser.stop()
+
+
 @app.exception_handler(AppException)
 async def app_exception_handler(request: Request, exc: AppException):
     return JSONResponse(
@@ -110,7 +139,10 @@ async def get_open_api_endpoint():
 # Include routers
 app.include_router(auth_router.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(events_router.router, prefix="/api/events", tags=["Events"])
+app.include_router(groups_router.router, prefix="/api/groups", tags=["Groups"])
 app.include_router(notifications_router.router, prefix="/api/notifications", tags=["Notifications"])
+app.include_router(sync_router.router, prefix="/api/sync", tags=["Sync"])
+app.include_router(metrics_router.router, prefix="/api/metrics", tags=["Metrics"])
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any, Union
+from pydantic import BaseModel, Field, TypeAdapter, create_model, validator
+from typing import Optional, List, Dict, Any, Tuple, Union
 from datetime import datetime
+from functools import lru_cache
 import re
 
 
@@ -87,11 +88,65 @@ class Event(EventInDB):
     pass
 
 
+# fields clients can select with ?fields=, each backed by an events column
+EVENT_FIELDS = tuple(Event.model_fields)
+
+
+@lru_cache(maxsize=128)
+def event_fields_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    """
+    Serializer for lists of events restricted to some fields, built once per field set
+    """
+    if fields == EVENT_FIELDS:
+        return TypeAdapter(List[Event])
+    model = create_model(
+        "EventFields",
+        **{field: (Event.model_fields[field].annotation, Event.model_fields[field]) for field in fields}
+    )
+    return TypeAdapter(List[model])
+
+
+class AgendaItem(BaseModel):
+    """Schema for one upcoming occurrence of an event"""
+    event_id: str
+    title: str
+    location: Optional[str] = None
+    start_time: datetime
+    end_time: datetime
+    is_recurring: bool = False
+    current_version: int
+
+
 class EventBatch(BaseModel):
     """Schema for batch event creation"""
     events: List[EventCreate]
 
 
+class EventBatchUpdateItem(EventUpdate):
+    """Schema for one event of a batch update"""
+    id: str
+    expected_version: Optional[int] = Field(None, description="Fail the item unless the event is at this version")
+
+
+class EventBatchUpdate(BaseModel):
+    """Schema for updating several events at once"""
+    events: List[EventBatchUpdateItem]
+    change_comment: Optional[str] = None
+
+
+class EventBatchDelete(BaseModel):
+    """Schema for deleting several events at once"""
+    ids: List[str]
+
+
+class EventBatchItemResult(BaseModel):
+    """Schema for the outcome of one item of a batch update or delete"""
+    id: str
+    status: int
+    detail: Optional[str] = None
+    event: Optional[Event] = None
+
+
 class EventPermissionBase(BaseModel):
     """Base schema for event permission data"""
     role: str = Field(..., description="Role: OWNER, EDITOR, VIEWER")
@@ -109,6 +164,11 @@ class EventPermissionCreate(EventPermissionBase):
     user_id: str
 
 
+class EventGroupPermissionCreate(EventPermissionBase):
+    """Schema for sharing an event with a group"""
+    group_id: str
+
+
 class EventPermissionUpdate(EventPermissionBase):
     """Schema for updating an event permission"""
     pass
@@ -118,7 +178,8 @@ class EventPermissionInDB(EventPermissionBase):
     """Schema for event permission data from the database"""
     id: str
     event_id: str
-    user_id: str
+    user_id: Optional[str] = None
+    group_id: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -160,6 +221,18 @@ class EventVersion(EventVersionInDB):
     pass
 
 
+# precompiled serializers for the plain rows read by the list fast paths
+EVENT_PERMISSION_LIST = TypeAdapter(List[EventPermission])
+EVENT_VERSION_LIST = TypeAdapter(List[EventVersion])
+
+
+def dump_rows(adapter: TypeAdapter, rows: Any) -> List[Dict[str, Any]]:
+    """
+    Serialize database rows (Core rows or dicts) to JSON-ready dicts through a TypeAdapter
+    """
+    return adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+
+
 class EventDiff(BaseModel):
     """Schema for event diff between versions"""
     field: str
@@ -177,5 +250,6 @@ class EventChangelog(BaseModel):
 
 
 class EventShare(BaseModel):
-    """Schema for sharing an event with users"""
-    users: List[EventPermissionCreate]
+    """Schema for sharing an event with users and groups"""
+    users: List[EventPermissionCreate] = []
+    groups: List[EventGroupPermissionCreate] = []
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+
+class GroupCreate(BaseModel):
+    """Schema for creating a group"""
+    name: str = Field(..., min_length=1)
+    member_ids: List[str] = Field([], description="Ids of the users to add as members")
+
+
+class GroupMembers(BaseModel):
+    """Schema for adding members to a group"""
+    user_ids: List[str] = Field(..., min_length=1)
+
+
+class Group(BaseModel):
+    """Schema for group data returned to clients"""
+    id: str
+    name: str
+    created_by: str
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class NotificationReadRequest(BaseModel):
+    """Schema for marking several notifications as read"""
+    ids: List[str] = Field(..., max_length=1000, description="Ids of the notifications to mark as read")
+
+
+class UnreadCount(BaseModel):
+    """Schema for the number of unread notifications"""
+    unread: int
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+from app.schemas.event import Event
+
+
+class SyncTombstone(BaseModel):
+    """Schema for an event that is no longer visible to the user"""
+    event_id: str
+    change_type: str = Field(..., description="Why the event disappeared: deleted or revoked")
+    seq: int
+
+
+class SyncResponse(BaseModel):
+    """Schema for a page of changes since a sync cursor"""
+    cursor: int = Field(..., description="Cursor to send on the next sync")
+    has_more: bool = Field(False, description="Whether more changes are waiting after this cursor")
+    events: List[Event] = []
+    tombstones: List[SyncTombstone] = []
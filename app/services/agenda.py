@@ -0,0 +1,192 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache, MISSING
+from app.core.config import settings
+from app.core.recurrence import occurrences
+from app.db.models.event import Event
+from app.db.models.user import User
+from app.db.repositories.change import ChangeRepository, TOMBSTONE_CHANGES
+from app.db.repositories.event import EventRepository
+
+logger = logging.getLogger(__name__)
+
+
+class Agenda:
+    """
+    A user's upcoming occurrences, sorted by start
+
+    Holds every occurrence starting in [built_at, until). When the agenda would exceed
+    max_entries the latest occurrences are dropped and until moves back, so what is kept
+    is always a complete prefix of the user's schedule.
+    """
+
+    __slots__ = ("entries", "events", "until", "truncated", "max_entries", "generation", "cursor")
+
+    def __init__(self, until: datetime, max_entries: int, generation: int, cursor: int):
+        self.entries: List[Tuple[datetime, str, datetime]] = []
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.until = until
+        self.truncated = False
+        self.max_entries = max_entries
+        self.generation = generation
+        self.cursor = cursor
+
+    def put(self, event: Event, after: datetime) -> None:
+        """add or replace an event's occurrences"""
+        self.remove(event.id)
+        self.events[event.id] = {
+            "event_id": event.id,
+            "title": event.title,
+            "location": event.location,
+            "is_recurring": event.is_recurring,
+            "current_version": event.current_version,
+        }
+        for start, end in occurrences(
+            event.start_time,
+            event.end_time,
+            event.is_recurring,
+            event.recurrence_pattern,
+            after,
+            self.until,
+        ):
+            if start >= self.until:
+                break
+            insort(self.entries, (start, event.id, end))
+            if len(self.entries) > self.max_entries:
+                self.until = self.entries.pop()[0]
+                self.truncated = True
+
+    def remove(self, event_id: str) -> None:
+        """drop an event's occurrences"""
+        if self.events.pop(event_id, None) is not None:
+            self.entries = [entry for entry in self.entries if entry[1] != event_id]
+
+    def upcoming(self, now: datetime, limit: int) -> List[Dict[str, Any]]:
+        """the next limit occurrences starting at or after now"""
+        index = bisect_left(self.entries, (now,))
+        return [
+            {**self.events[event_id], "start_time": start, "end_time": end}
+            for start, event_id, end in self.entries[index:index + limit]
+        ]
+
+
+class AgendaCache:
+    """
+    Per-process cache of each user's upcoming occurrences behind `GET /api/events/agenda`
+
+    An agenda is built on first use from the user's upcoming and recurring events,
+    expanded over AGENDA_HORIZON_DAYS. Afterwards it is kept current incrementally from
+    the user's change feed: when the user's events_generation moved, only the changes
+    since the agenda's cursor are read and the events they name are reloaded or dropped.
+    Agendas are rebuilt when evicted, after AGENDA_MAX_AGE_SECONDS, when too many changes
+    piled up, or when a truncated agenda runs short of occurrences.
+    """
+
+    def __init__(
+        self,
+        max_users: Optional[int] = None,
+        horizon_days: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_age: Optional[float] = None,
+        max_changes: Optional[int] = None,
+        now: Callable[[], datetime] = datetime.utcnow,
+    ):
+        self.agendas = TTLCache(
+            max_users or settings.AGENDA_CACHE_SIZE,
+            max_age or settings.AGENDA_MAX_AGE_SECONDS
+        )
+        self.horizon = timedelta(days=horizon_days or settings.AGENDA_HORIZON_DAYS)
+        self.max_entries = max_entries or settings.AGENDA_MAX_ENTRIES
+        self.max_changes = max_changes or settings.AGENDA_MAX_CHANGES
+        self.now = now
+
+        self.builds = 0
+        self.catch_ups = 0
+        self.changes_applied = 0
+
+    async def get_upcoming(self, db: AsyncSession, *, user: User, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get a user's next occurrences, building or catching up their agenda as needed
+        """
+        now = self.now()
+        agenda = self.agendas.get(user.id)
+        if agenda is MISSING:
+            agenda = await self._build(db, user, now)
+        elif agenda.generation != user.events_generation:
+            agenda = await self._catch_up(db, user, agenda, now)
+
+        items = agenda.upcoming(now, limit)
+        if len(items) < limit and agenda.truncated:
+            agenda = await self._build(db, user, now)
+            items = agenda.upcoming(now, limit)
+        return items
+
+    def forget(self, user_id: str) -> None:
+        """drop a user's agenda, so that the next read rebuilds it"""
+        self.agendas.delete(user_id)
+
+    def clear(self) -> None:
+        """drop every agenda of this process"""
+        self.agendas.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "agendas": self.agendas.metrics(),
+            "max_entries": self.max_entries,
+            "horizon_days": self.horizon.days,
+            "builds": self.builds,
+            "catch_ups": self.catch_ups,
+            "changes_applied": self.changes_applied,
+        }
+
+    async def _build(self, db: AsyncSession, user: User, now: datetime) -> Agenda:
+        self.builds += 1
+        # read the cursor first: changes racing the load are replayed, never missed
+        cursor = await ChangeRepository().get_latest_seq(db, user_id=user.id)
+        events = await EventRepository().get_upcoming_for_user(db, user_id=user.id, after=now)
+
+        agenda = Agenda(now + self.horizon, self.max_entries, user.events_generation, cursor)
+        for event in events:
+            agenda.put(event, now)
+        self.agendas.set(user.id, agenda)
+        return agenda
+
+    async def _catch_up(self, db: AsyncSession, user: User, agenda: Agenda, now: datetime) -> Agenda:
+        changes = await ChangeRepository().get_changes_since(
+            db,
+            user_id=user.id,
+            cursor=agenda.cursor,
+            limit=self.max_changes + 1
+        )
+        if len(changes) > self.max_changes:
+            return await self._build(db, user, now)
+
+        self.catch_ups += 1
+        latest = {}
+        for change in changes:
+            latest[change.event_id] = change.change_type
+
+        live_ids = [event_id for event_id, change_type in latest.items() if change_type not in TOMBSTONE_CHANGES]
+        events = await EventRepository().get_events_by_ids_for_user(db, event_ids=live_ids, user_id=user.id)
+        for event_id in latest:
+            agenda.remove(event_id)
+        for event in events:
+            agenda.put(event, now)
+
+        self.changes_applied += len(changes)
+        if changes:
+            agenda.cursor = changes[-1].seq
+        agenda.generation = user.events_generation
+        return agenda
+
+
+agenda_cache = AgendaCache()
+
+
+def get_agenda_cache():
+    return agenda_cache
@@ -0,0 +1,189 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.ical import CALENDAR_FOOTER, CALENDAR_HEADER, format_vevent, parse_vevents
+from app.db.repositories.event import EventRepository
+from app.services.event_ingest import Record
+
+# (VEVENT number, its lines, or None when it was dropped for its size)
+Block = Tuple[int, Optional[List[str]]]
+
+
+async def export_calendar(
+    db: AsyncSession,
+    *,
+    user_id: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    page_size: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    Yield an iCalendar file of the user's events piece by piece
+
+    Events are read through get_events_for_user a page of ICS_EXPORT_PAGE_SIZE at a
+    time and each page is rendered and yielded before the next one is read, so only
+    one page is ever held in memory
+    """
+    page_size = page_size or settings.ICS_EXPORT_PAGE_SIZE
+    event_repo = EventRepository()
+    dtstamp = datetime.now(timezone.utc)
+
+    yield CALENDAR_HEADER
+    skip = 0
+    while True:
+        events = await event_repo.get_events_for_user(
+            db,
+            user_id=user_id,
+            skip=skip,
+            limit=page_size,
+            start_date=start_date,
+            end_date=end_date
+        )
+        if events:
+            yield "".join(format_vevent(event, dtstamp) for event in events)
+        if len(events) < page_size:
+            break
+        skip += page_size
+    yield CALENDAR_FOOTER
+
+
+class IcsParser:
+    """
+    Parser of VEVENT blocks, offloading large uploads to a process pool
+
+    Full batches of ICS_PARSE_BATCH_SIZE blocks are parsed in a pool of
+    ICS_PARSE_WORKERS processes, one batch ahead of the caller, so parsing runs
+    alongside the inserts of the previous batch. The last, partial batch is parsed in
+    process, which keeps small uploads off the pool. With no workers everything is
+    parsed in process
+    """
+
+    def __init__(self, workers: Optional[int] = None, batch_size: Optional[int] = None):
+        self.workers = settings.ICS_PARSE_WORKERS if workers is None else workers
+        self.batch_size = batch_size or settings.ICS_PARSE_BATCH_SIZE
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, blocks: List[Block]) -> "asyncio.Future[List[Record]]":
+        """start parsing a full batch, in the pool when there is one"""
+        loop = asyncio.get_running_loop()
+        to_parse = [(number, lines) for number, lines in blocks if lines is not None]
+        if self.workers > 0 and to_parse:
+            parsed = loop.run_in_executor(self._get_pool(), parse_vevents, to_parse)
+        else:
+            parsed = loop.create_future()
+            parsed.set_result(parse_vevents(to_parse))
+        return asyncio.ensure_future(self._merge(blocks, parsed))
+
+    def parse_now(self, blocks: List[Block]) -> List[Record]:
+        """parse a batch in process"""
+        parsed = parse_vevents([(number, lines) for number, lines in blocks if lines is not None])
+        return self._merged(blocks, parsed)
+
+    def stop(self) -> None:
+        """shut the pool down"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def _merge(self, blocks: List[Block], parsed: "asyncio.Future[List[Record]]") -> List[Record]:
+        return self._merged(blocks, await parsed)
+
+    @staticmethod
+    def _merged(blocks: List[Block], parsed: List[Record]) -> List[Record]:
+        """put dropped blocks back in stream order"""
+        by_number: Dict[int, Record] = {record[0]: record for record in parsed}
+        return [
+            by_number.get(number) or (number, None, "VEVENT is too large")
+            for number, _ in blocks
+        ]
+
+
+ics_parser = IcsParser()
+
+
+async def read_ics(
+    chunks: AsyncIterator[bytes],
+    parser: Optional[IcsParser] = None,
+    max_record_bytes: Optional[int] = None
+) -> AsyncIterator[Record]:
+    """
+    Read an iCalendar stream as it arrives and yield one record per VEVENT, numbered from 1
+
+    Only the current VEVENT's lines and the batches being parsed are buffered; other
+    components (VTIMEZONE, VTODO) are skipped. A VEVENT larger than max_record_bytes
+    is dropped as it streams in and reported as an error
+    """
+    parser = parser or ics_parser
+    max_record_bytes = max_record_bytes or settings.EVENT_INGEST_MAX_RECORD_BYTES
+    buffer = bytearray()
+    skipping_line = False
+    block: Optional[List[str]] = None
+    block_bytes = 0
+    number = 0
+    batch: List[Block] = []
+    parsing: Optional[asyncio.Future] = None
+
+    def take_line(raw: bytes) -> None:
+        nonlocal block, block_bytes, number
+        line = raw.rstrip(b"\r").decode("utf-8", errors="replace")
+        if block is None:
+            if line.strip().upper() == "BEGIN:VEVENT":
+                number += 1
+                block, block_bytes = [line], len(raw)
+            return
+        if block_bytes <= max_record_bytes:
+            block.append(line)
+            block_bytes += len(raw)
+        if line.strip().upper() == "END:VEVENT":
+            batch.append((number, block if block_bytes <= max_record_bytes else None))
+            block = None
+
+    try:
+        async for chunk in chunks:
+            lines = chunk.split(b"\n")
+            for raw in lines[:-1]:
+                if skipping_line:
+                    skipping_line = False
+                else:
+                    buffer += raw
+                    take_line(bytes(buffer))
+                buffer.clear()
+            if not skipping_line:
+                buffer += lines[-1]
+                if len(buffer) > max_record_bytes:
+                    # a single line this long can only belong to a dropped VEVENT
+                    block_bytes = max_record_bytes + 1
+                    skipping_line = True
+                    buffer.clear()
+
+            if len(batch) >= parser.batch_size:
+                submitted = parser.submit(batch)
+                batch = []
+                if parsing is not None:
+                    for record in await parsing:
+                        yield record
+                parsing = submitted
+
+        if buffer and not skipping_line:
+            take_line(bytes(buffer))
+        if parsing is not None:
+            for record in await parsing:
+                yield record
+            parsing = None
+        for record in parser.parse_now(batch):
+            yield record
+        if block is not None:
+            yield number, None, "VEVENT is not terminated"
+    finally:
+        if parsing is not None:
+            parsing.cancel()
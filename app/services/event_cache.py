@@ -0,0 +1,128 @@
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.cache import TwoTierCache
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models.event import Event
+from app.schemas.event import Event as EventSchema
+
+logger = logging.getLogger(__name__)
+
+
+class EventCache:
+    """
+    Read-through cache of serialized events keyed by (event_id, current_version)
+
+    A short-lived pointer maps each event id to its current version and the body is
+    stored under the versioned key, so a cached body never goes stale: a write bumps the
+    version and the old key is simply no longer read. Writers drop the pointer after
+    commit; other workers, or a pointer set by a read that raced the write, may serve
+    the previous version for at most EVENT_CACHE_VERSION_TTL_SECONDS, the pointer's TTL
+    in both tiers. Missing events are cached as well.
+
+    Misses are loaded in a session of session_factory rather than the caller's, since
+    a single-flight load is shared by every waiter and may outlive the request that
+    started it.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        version_ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+    ):
+        self.session_factory = session_factory
+        self.cache = TwoTierCache(
+            "event",
+            client,
+            max_size=max_size or settings.EVENT_CACHE_SIZE,
+            ttl=ttl or settings.EVENT_CACHE_TTL_SECONDS,
+            negative_ttl=negative_ttl or settings.EVENT_CACHE_NEGATIVE_TTL_SECONDS,
+        )
+        self.version_ttl = version_ttl or settings.EVENT_CACHE_VERSION_TTL_SECONDS
+
+    async def get(self, event_id: str) -> Optional[EventSchema]:
+        """
+        Get an event, loading it on a miss; None if it does not exist
+        """
+        for _ in range(2):
+            version = await self._get_version(event_id)
+            if version is None:
+                return None
+
+            body = await self.cache.get_or_load(
+                self.cache.key(event_id, version),
+                lambda: self._load_body(event_id, version)
+            )
+            if body is not None:
+                return EventSchema.model_validate(body)
+
+            # the pointer was older than the row; drop it and resolve the version again
+            await self.cache.delete(self.cache.key(event_id, "version"))
+        return None
+
+    async def invalidate(self, event_id: str) -> None:
+        """
+        Forget an event's current version, after it was updated or deleted
+        """
+        await self.cache.delete(self.cache.key(event_id, "version"))
+
+    def clear(self) -> None:
+        """drop every entry of this process"""
+        self.cache.l1.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        return self.cache.metrics()
+
+    async def _get_version(self, event_id: str) -> Optional[int]:
+        async def load() -> Optional[int]:
+            event = await self._load(event_id)
+            if event is None:
+                return None
+            # the row is at hand, so cache its body too
+            await self.cache.set(self.cache.key(event_id, event["current_version"]), event)
+            return event["current_version"]
+
+        return await self.cache.get_or_load(
+            self.cache.key(event_id, "version"),
+            load,
+            ttl=self.version_ttl,
+        )
+
+    async def _load_body(self, event_id: str, version: int) -> Optional[Dict[str, Any]]:
+        event = await self._load(event_id)
+        if event is None or event["current_version"] != version:
+            return None
+        return event
+
+    async def _load(self, event_id: str) -> Optional[Dict[str, Any]]:
+        async with self.session_factory() as db:
+            result = await db.execute(select(Event).where(Event.id == event_id))
+            event = result.scalars().first()
+            if event is None:
+                return None
+            return EventSchema.model_validate(event).model_dump(mode="json")
+
+
+def _create_event_cache() -> EventCache:
+    if settings.REDIS_URL:
+        try:
+            from redis import asyncio as aioredis
+            return EventCache(aioredis.from_url(settings.REDIS_URL, decode_responses=True))
+        except (ImportError, Exception) as e:
+            logger.warning(f"Failed to initialize Redis event cache: {e}")
+    return EventCache()
+
+
+event_cache = _create_event_cache()
+
+
+def get_event_cache():
+    return event_cache
@@ -0,0 +1,219 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import json
+
+import msgpack
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.db.repositories.event import EventRepository
+from app.schemas.event import EventCreate
+
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+MSGPACK_TYPES = {"application/msgpack", "application/x-msgpack"}
+
+# (1-based position in the stream, decoded record, error) as produced by the readers
+Record = Tuple[int, Any, Optional[str]]
+
+
+class StreamError(ValidationError):
+    """the stream cannot be read any further"""
+
+
+def records_for(content_type: Optional[str], chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """
+    Pick the record reader for a request's Content-Type
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_TYPES:
+        return read_ndjson(chunks)
+    if media_type in MSGPACK_TYPES:
+        return read_msgpack(chunks)
+    raise ValidationError(
+        f"Unsupported Content-Type {media_type or 'none'}; "
+        f"send one of {', '.join(sorted(NDJSON_TYPES | MSGPACK_TYPES))}"
+    )
+
+
+async def read_ndjson(
+    chunks: AsyncIterator[bytes],
+    max_record_bytes: Optional[int] = None
+) -> AsyncIterator[Record]:
+    """
+    Decode newline-delimited JSON as it arrives, numbering records by line
+
+    Blank lines are skipped. Only the current line is buffered, and a line longer than
+    max_record_bytes is dropped as it streams in and reported as an error
+    """
+    max_record_bytes = max_record_bytes or settings.EVENT_INGEST_MAX_RECORD_BYTES
+    buffer = bytearray()
+    oversized = False
+    line_number = 0
+
+    def finish_line() -> Optional[Record]:
+        nonlocal oversized
+        if oversized:
+            oversized = False
+            return line_number, None, f"Record exceeds {max_record_bytes} bytes"
+        if not buffer.strip():
+            return None
+        try:
+            return line_number, json.loads(bytes(buffer)), None
+        except ValueError as e:
+            return line_number, None, f"Invalid JSON: {e}"
+
+    async for chunk in chunks:
+        lines = chunk.split(b"\n")
+        for line in lines[:-1]:
+            line_number += 1
+            if not oversized:
+                buffer += line
+                oversized = len(buffer) > max_record_bytes
+            record = finish_line()
+            buffer.clear()
+            if record is not None:
+                yield record
+        if not oversized:
+            buffer += lines[-1]
+            if len(buffer) > max_record_bytes:
+                oversized = True
+                buffer.clear()
+
+    line_number += 1
+    record = finish_line()
+    if record is not None:
+        yield record
+
+
+async def read_msgpack(
+    chunks: AsyncIterator[bytes],
+    max_record_bytes: Optional[int] = None
+) -> AsyncIterator[Record]:
+    """
+    Decode a stream of concatenated msgpack objects as it arrives, numbering records from 1
+
+    Timestamps may be sent as msgpack timestamps or ISO strings. A record larger than
+    max_record_bytes or malformed data ends the stream with a StreamError, since the
+    next record cannot be located
+    """
+    max_record_bytes = max_record_bytes or settings.EVENT_INGEST_MAX_RECORD_BYTES
+    unpacker = msgpack.Unpacker(raw=False, timestamp=3, max_buffer_size=max_record_bytes)
+    number = 0
+    received = 0
+
+    async for chunk in chunks:
+        received += len(chunk)
+        try:
+            unpacker.feed(chunk)
+        except msgpack.BufferFull:
+            raise StreamError(f"Record {number + 1} exceeds {max_record_bytes} bytes")
+        while True:
+            try:
+                record = next(unpacker)
+            except StopIteration:
+                break
+            except (ValueError, msgpack.UnpackException) as e:
+                raise StreamError(f"Invalid msgpack after record {number}: {e}")
+            number += 1
+            yield number, record, None
+
+    if unpacker.tell() < received:
+        raise StreamError(f"Stream ended inside record {number + 1}")
+
+
+def validate_record(record: Any) -> Tuple[Optional[EventCreate], Optional[str]]:
+    """
+    Validate one decoded record as an EventCreate, returning (event, None) or (None, error)
+    """
+    if not isinstance(record, dict):
+        return None, "Record must be an object"
+    try:
+        return EventCreate(**record), None
+    except PydanticValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'record'}: {error['msg']}"
+            for error in e.errors()
+        )
+
+
+async def ingest_events(
+    db: AsyncSession,
+    *,
+    user_id: str,
+    records: AsyncIterator[Record],
+    chunk_size: Optional[int] = None,
+    check_conflicts: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Validate records as they are read and create the valid ones in chunks, yielding
+    one result per chunk and a final summary
+
+    Every chunk_size records (valid or not) are committed through the bulk insert path
+    and reported as {"chunk", "records", "events": [{"record", "id"}], "errors":
+    [{"record", "detail"}]}, so memory is bounded by one chunk whatever the stream's
+    length. Chunks committed before a stream error stay committed. With check_conflicts,
+    records overlapping the user's events or another record of their chunk are rejected
+    """
+    chunk_size = chunk_size or settings.EVENT_INGEST_CHUNK_SIZE
+    event_repo = EventRepository()
+    totals = {"chunks": 0, "records": 0, "created": 0, "failed": 0}
+    valid: List[Tuple[int, EventCreate]] = []
+    errors: List[Dict[str, Any]] = []
+
+    async def flush() -> Dict[str, Any]:
+        if check_conflicts and valid:
+            conflicts = await event_repo.count_conflicts_for_ranges(
+                db,
+                user_id=user_id,
+                ranges={str(number): (event_in.start_time, event_in.end_time) for number, event_in in valid},
+                moved=[str(number) for number, _ in valid]
+            )
+            for number, event_in in valid:
+                if conflicts[str(number)]:
+                    errors.append({
+                        "record": number,
+                        "detail": f"Event conflicts with {conflicts[str(number)]} other events"
+                    })
+            valid[:] = [(number, event_in) for number, event_in in valid if not conflicts[str(number)]]
+
+        event_ids = await event_repo.create_many_with_owner(
+            db,
+            objs_in=[event_in for _, event_in in valid],
+            user_id=user_id
+        )
+        totals["chunks"] += 1
+        totals["records"] += len(valid) + len(errors)
+        totals["created"] += len(event_ids)
+        totals["failed"] += len(errors)
+        result = {
+            "chunk": totals["chunks"],
+            "records": len(valid) + len(errors),
+            "events": [{"record": number, "id": event_id} for (number, _), event_id in zip(valid, event_ids)],
+            "errors": sorted(errors, key=lambda error: error["record"]),
+        }
+        valid.clear()
+        errors.clear()
+        return result
+
+    error = None
+    try:
+        async for number, record, detail in records:
+            event_in = None
+            if detail is None:
+                event_in, detail = validate_record(record)
+            if event_in is not None:
+                valid.append((number, event_in))
+            else:
+                errors.append({"record": number, "detail": detail})
+            if len(valid) + len(errors) >= chunk_size:
+                yield await flush()
+    except StreamError as e:
+        error = e.detail
+
+    if valid or errors:
+        yield await flush()
+    summary = {"done": error is None, **totals}
+    if error is not None:
+        summary["error"] = error
+    yield summary
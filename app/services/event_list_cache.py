@@ -0,0 +1,113 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TwoTierCache
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.schemas.event import EVENT_FIELDS, dump_rows, event_fields_adapter
+
+logger = logging.getLogger(__name__)
+
+
+class EventListCache:
+    """
+    Cache of serialized `GET /api/events` pages per user
+
+    Pages are keyed by (user_id, events_generation, start, end, skip, limit, fields). Every
+    change to an event a user can see, or to their access, bumps their generation in the
+    same transaction, so invalidation is a counter increment: later requests build new
+    keys and pages of older generations simply age out of the LRU. Memory is bounded by
+    EVENT_LIST_CACHE_SIZE pages of at most EVENT_LIST_CACHE_MAX_PAGE events; larger
+    pages bypass the cache.
+
+    Pages are loaded in a session of session_factory rather than the caller's, since a
+    single-flight load is shared by every waiter and may outlive the request that
+    started it.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        max_page: Optional[int] = None,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+    ):
+        self.session_factory = session_factory
+        self.cache = TwoTierCache(
+            "event_list",
+            client,
+            max_size=max_size or settings.EVENT_LIST_CACHE_SIZE,
+            ttl=ttl or settings.EVENT_LIST_CACHE_TTL_SECONDS,
+        )
+        self.max_page = max_page or settings.EVENT_LIST_CACHE_MAX_PAGE
+        self.bypassed = 0
+
+    async def get_page(
+        self,
+        *,
+        user_id: str,
+        generation: int,
+        skip: int,
+        limit: int,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        load: Callable[[AsyncSession], Awaitable[Sequence[Any]]],
+        fields: Tuple[str, ...] = EVENT_FIELDS,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a page of a user's events as dicts, calling load(db) for the rows on a miss
+
+        load returns database rows of the given fields, serialized through the field
+        set's precompiled TypeAdapter
+        """
+        async def load_page() -> List[Dict[str, Any]]:
+            async with self.session_factory() as db:
+                rows = await load(db)
+            return dump_rows(event_fields_adapter(fields), rows)
+
+        if not self.cacheable(limit):
+            self.bypassed += 1
+            return await load_page()
+
+        key = self.cache.key(
+            user_id,
+            generation,
+            start_date.isoformat() if start_date else "",
+            end_date.isoformat() if end_date else "",
+            skip,
+            limit,
+            ",".join(fields) if fields != EVENT_FIELDS else "*",
+        )
+        return await self.cache.get_or_load(key, load_page)
+
+    def cacheable(self, limit: int) -> bool:
+        """whether pages of this size are cached"""
+        return limit <= self.max_page
+
+    def clear(self) -> None:
+        """drop every entry of this process"""
+        self.cache.l1.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.cache.metrics(), "max_page": self.max_page, "bypassed": self.bypassed}
+
+
+def _create_event_list_cache() -> EventListCache:
+    if settings.REDIS_URL:
+        try:
+            from redis import asyncio as aioredis
+            return EventListCache(aioredis.from_url(settings.REDIS_URL, decode_responses=True))
+        except (ImportError, Exception) as e:
+            logger.warning(f"Failed to initialize Redis event list cache: {e}")
+    return EventListCache()
+
+
+event_list_cache = _create_event_list_cache()
+
+
+def get_event_list_cache():
+    return event_list_cache
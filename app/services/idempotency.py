@@ -0,0 +1,235 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from functools import lru_cache
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.cache import MISSING, TwoTierCache
+from app.core.config import settings
+from app.core.exceptions import ConflictError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+
+@lru_cache(maxsize=128)
+def response_adapter(response_type: Any) -> TypeAdapter:
+    """
+    Serializer of a handler's response type, built once per type
+    """
+    return TypeAdapter(response_type)
+
+
+class IdempotencyStore:
+    """
+    Store of responses to requests sent with an `Idempotency-Key` header
+
+    The first request with a key runs the handler; its successful response is stored for
+    IDEMPOTENCY_TTL_SECONDS and replayed to retries without running the handler again.
+    Keys are scoped per user and endpoint, and a retry whose body differs from the
+    original is rejected. Duplicates arriving while the first request runs wait for it:
+    in process on the claim of the first request, across workers by polling a Redis lock
+    for up to IDEMPOTENCY_WAIT_SECONDS before answering 409. Failed requests store
+    nothing, so a retry after an error runs again.
+
+    The handler always runs in the task of the request that claimed the key; the cache
+    only publishes its result, so a waiting duplicate never depends on another
+    request's session.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_size: Optional[int] = None,
+        ttl: Optional[int] = None,
+        wait: Optional[float] = None,
+        poll_interval: float = 0.05,
+    ):
+        self.cache = TwoTierCache(
+            "idempotency",
+            client,
+            max_size=max_size or settings.IDEMPOTENCY_CACHE_SIZE,
+            ttl=ttl or settings.IDEMPOTENCY_TTL_SECONDS,
+        )
+        self.wait = wait or settings.IDEMPOTENCY_WAIT_SECONDS
+        self.poll_interval = poll_interval
+        # keys whose handler runs in this process, resolved once it finished
+        self._running: Dict[str, asyncio.Future] = {}
+
+        self.stored = 0
+        self.replayed = 0
+        self.mismatched = 0
+
+    async def run(
+        self,
+        *,
+        user_id: str,
+        scope: str,
+        key: str,
+        payload: Any,
+        handler: Callable[[], Awaitable[Any]],
+        response_type: Any,
+        status_code: int,
+    ) -> Tuple[int, Any, bool]:
+        """
+        Run handler once per (user, scope, key) and return (status, JSON body, replayed)
+
+        The handler's result is serialized as response_type before it is stored. The
+        handler runs in the calling request's own task, never in one shared with other
+        requests, since it works with that request's session
+        """
+        if len(key) > MAX_KEY_LENGTH:
+            raise ValidationError(f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+
+        fingerprint = hashlib.sha256(
+            json.dumps(jsonable_encoder(payload), sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        cache_key = self.cache.key(user_id, scope, key)
+
+        while True:
+            stored = await self._get_stored(cache_key)
+            if stored is not None:
+                ran = False
+                break
+            running = self._running.get(cache_key)
+            if running is not None:
+                # wait for the request holding the key; if it failed, try to claim the key
+                self.cache.coalesced += 1
+                await asyncio.shield(running)
+                continue
+
+            stored, ran = await self._claim_and_run(
+                cache_key,
+                lambda: self._store(cache_key, fingerprint, handler, response_type, status_code)
+            )
+            break
+
+        if stored["fingerprint"] != fingerprint:
+            self.mismatched += 1
+            raise ValidationError("Idempotency-Key was already used with a different request body")
+        if not ran:
+            self.replayed += 1
+        return stored["status"], stored["body"], not ran
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.cache.metrics(),
+            "stored": self.stored,
+            "replayed": self.replayed,
+            "mismatched": self.mismatched,
+        }
+
+    async def _claim_and_run(
+        self,
+        cache_key: str,
+        store: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Hold a key in process and across workers while store() runs
+
+        Requests for the key in this process wait on the claim; other workers wait on
+        the Redis lock. Returns the stored response and whether store() ran
+        """
+        claim = asyncio.get_running_loop().create_future()
+        self._running[cache_key] = claim
+        try:
+            deadline = time.monotonic() + self.wait
+            while not await self._lock(cache_key):
+                if time.monotonic() >= deadline:
+                    raise ConflictError("A request with this Idempotency-Key is still in progress")
+                await asyncio.sleep(self.poll_interval)
+            try:
+                # another worker may have finished between our cache miss and the lock
+                stored = await self._get_stored(cache_key)
+                if stored is not None:
+                    return stored, False
+                return await store(), True
+            finally:
+                await self._unlock(cache_key)
+        finally:
+            del self._running[cache_key]
+            claim.set_result(None)
+
+    async def _store(
+        self,
+        cache_key: str,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Any]],
+        response_type: Any,
+        status_code: int,
+    ) -> Dict[str, Any]:
+        """run the handler and store its serialized response"""
+        adapter = response_adapter(response_type)
+        result = adapter.validate_python(await handler())
+        stored = {
+            "fingerprint": fingerprint,
+            "status": status_code,
+            "body": adapter.dump_python(result, mode="json"),
+        }
+        # stored before the lock is released, so waiters find it once they hold the lock
+        await self.cache.set(cache_key, stored)
+        self.stored += 1
+        return stored
+
+    async def _get_stored(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """the stored response of a key, from L1 or else Redis"""
+        stored = self.cache.l1.get(cache_key)
+        if stored is not MISSING:
+            return stored
+        stored = await self._get_shared(cache_key)
+        if stored is not None:
+            self.cache.l1.set(cache_key, stored)
+        return stored
+
+    async def _lock(self, cache_key: str) -> bool:
+        """claim a key across workers; always succeeds without Redis"""
+        if self.cache.client is None:
+            return True
+        try:
+            return bool(await self.cache.client.set(
+                f"{cache_key}:lock", "1", nx=True, ex=settings.IDEMPOTENCY_LOCK_TTL_SECONDS
+            ))
+        except Exception as e:
+            logger.warning(f"Error locking idempotency key in Redis: {e}")
+            return True
+
+    async def _unlock(self, cache_key: str) -> None:
+        if self.cache.client is None:
+            return
+        try:
+            await self.cache.client.delete(f"{cache_key}:lock")
+        except Exception as e:
+            logger.warning(f"Error unlocking idempotency key in Redis: {e}")
+
+    async def _get_shared(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        if self.cache.client is None:
+            return None
+        try:
+            raw = await self.cache.client.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Error reading idempotency key from Redis: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+
+def _create_idempotency_store() -> IdempotencyStore:
+    if settings.REDIS_URL:
+        try:
+            from redis import asyncio as aioredis
+            return IdempotencyStore(aioredis.from_url(settings.REDIS_URL, decode_responses=True))
+        except (ImportError, Exception) as e:
+            logger.warning(f"Failed to initialize Redis idempotency store: {e}")
+    return IdempotencyStore()
+
+
+idempotency_store = _create_idempotency_store()
+
+
+def get_idempotency_store():
+    return idempotency_store
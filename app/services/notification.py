@@ -1,5 +1,4 @@
-from typing import List, Dict, Any, Optional
-import json
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import logging
 from datetime import datetime
 from fastapi import BackgroundTasks, Depends
@@ -8,7 +7,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.db.base import get_db
 from app.db.models.event import EventPermission
+from app.db.repositories.group import GroupRepository
 from app.db.repositories.permission import PermissionRepository
+from app.db.repositories.outbox import (
+    TOPIC_EVENT_CREATED,
+    TOPIC_EVENT_UPDATED,
+    TOPIC_EVENT_DELETED,
+    TOPIC_PERMISSION_CHANGED,
+    TOPIC_PERMISSIONS_SHARED
+)
+from app.services.notification_store import (
+    InMemoryNotificationStore,
+    RedisNotificationStore,
+    DatabaseNotificationStore
+)
+from app.services.notification_coalescer import NotificationCoalescer
 
 logger = logging.getLogger(__name__)
 
@@ -19,22 +32,36 @@ class NotificationService:
     
     This service can be configured to use different notification backends:
     - In-memory (default): Stores notifications in memory (for development)
-    - Redis: Uses Redis pub/sub for real-time notifications (for production)
+    - Redis: Stores notifications in capped per-user Redis streams and publishes them
+      on pub/sub for real-time delivery (for production)
+    - Database: Stores notifications in the notifications table, shared by all worker
+      processes without Redis (NOTIFICATION_BACKEND=database)
     """
     
-    def __init__(self):
-        self.backend = "in-memory"  
-        self.notifications = {}  
+    def __init__(self, store=None, coalesce_window: Optional[float] = None):
+        self.store = store or InMemoryNotificationStore()
+        backend = settings.NOTIFICATION_BACKEND or ("redis" if settings.REDIS_URL else "in-memory")
         
-        if settings.REDIS_URL:
+        if store is None and backend == "database":
+            self.store = DatabaseNotificationStore()
+            logger.info("Using the database for notifications")
+        elif store is None and backend == "redis" and settings.REDIS_URL:
             try:
-                import redis
-                self.redis = redis.from_url(settings.REDIS_URL)
-                self.backend = "redis"
+                from redis import asyncio as aioredis
+                self.store = RedisNotificationStore(
+                    aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+                )
                 logger.info("Using Redis for notifications")
             except (ImportError, Exception) as e:
                 logger.warning(f"Failed to initialize Redis: {e}")
                 logger.warning("Falling back to in-memory notifications")
+        
+        self.backend = self.store.name
+        self.listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        
+        if coalesce_window is None:
+            coalesce_window = settings.NOTIFICATION_COALESCE_WINDOW_SECONDS
+        self.coalescer = NotificationCoalescer(self._send_many, coalesce_window) if coalesce_window > 0 else None
     
     async def notify_event_created(
         self, 
@@ -61,14 +88,17 @@ class NotificationService:
         event_id: str, 
         event_title: str, 
         updater_id: str,
+        version: Optional[int] = None,
         db: AsyncSession = Depends(get_db)
     ):
         """
         Notify users about an event update
+        
+        With coalescing, returns a future resolving once the merged notifications are written
         """
         
         permission_repo = PermissionRepository()
-        permissions = await permission_repo.get_by_event(db, event_id=event_id)
+        user_ids = await permission_repo.get_user_ids_by_event(db, event_id=event_id)
         
         
         notification = {
@@ -76,17 +106,25 @@ class NotificationService:
             "event_id": event_id,
             "event_title": event_title,
             "updater_id": updater_id,
+            "version": version,
             "timestamp": datetime.now().isoformat(),
             "message": f"Event updated: {event_title}"
         }
         
-        for permission in permissions:
-            if permission.user_id != updater_id:
-                notification_for_user = notification.copy()
-                notification_for_user["message"] = f"Event '{event_title}' was updated by another user"
-                await self._send_notification(permission.user_id, notification_for_user)
+        notification_for_others = notification.copy()
+        notification_for_others["message"] = f"Event '{event_title}' was updated by another user"
+        deliveries = [
+            (user_id, notification_for_others.copy())
+            for user_id in user_ids
+            if user_id != updater_id
+        ]
         
         notification["message"] = f"You updated the event: {event_title}"
+        
+        if self.coalescer is not None:
+            return await self.coalescer.add(event_id, deliveries + [(updater_id, notification)])
+        
+        await self._send_many(deliveries)
         await self._send_notification(updater_id, notification)
     
     async def notify_event_deleted(
@@ -100,6 +138,9 @@ class NotificationService:
         """
         Notify users about an event deletion
         """
+        if self.coalescer is not None:
+            await self.coalescer.flush(event_id)
+        
         notification = {
             "type": "event_deleted",
             "event_id": event_id,
@@ -109,11 +150,13 @@ class NotificationService:
             "message": f"Event deleted: {event_title}"
         }
         
-        for user_id in affected_users:
-            if user_id != deleter_id:
-                notification_for_user = notification.copy()
-                notification_for_user["message"] = f"Event '{event_title}' was deleted by another user"
-                await self._send_notification(user_id, notification_for_user)
+        notification_for_others = notification.copy()
+        notification_for_others["message"] = f"Event '{event_title}' was deleted by another user"
+        await self._send_many([
+            (user_id, notification_for_others.copy())
+            for user_id in affected_users
+            if user_id != deleter_id
+        ])
         
         notification["message"] = f"You deleted the event: {event_title}"
         await self._send_notification(deleter_id, notification)
@@ -154,21 +197,95 @@ class NotificationService:
             }
             await self._send_notification(changer_id, notification_for_changer)
     
-    async def get_notifications(self, user_id: str) -> List[Dict[str, Any]]:
+    async def notify_permissions_shared(
+        self, 
+        event_id: str, 
+        event_title: str, 
+        roles: Dict[str, str],
+        changer_id: str,
+        group_roles: Optional[Dict[str, str]] = None,
+        db: AsyncSession = Depends(get_db)
+    ):
         """
-        Get all notifications for a user
+        Notify every user of a bulk share about their role, and the changer once
+        
+        Members of shared groups are notified with their group's role unless they were
+        also shared with directly
         """
-        if self.backend == "redis":
-            try:
-                notifications_json = self.redis.get(f"notifications:{user_id}")
-                if notifications_json:
-                    return json.loads(notifications_json)
-                return []
-            except Exception as e:
-                logger.error(f"Error getting notifications from Redis: {e}")
-                return []
-        else:
-            return self.notifications.get(user_id, [])
+        timestamp = datetime.now().isoformat()
+        roles = dict(roles)
+        if group_roles:
+            members = await GroupRepository().get_member_ids(db, group_ids=list(group_roles))
+            for group_id, user_ids in members.items():
+                for user_id in user_ids:
+                    roles.setdefault(user_id, group_roles[group_id])
+        
+        await self._send_many([
+            (user_id, {
+                "type": "permission_changed",
+                "event_id": event_id,
+                "event_title": event_title,
+                "role": role,
+                "changer_id": changer_id,
+                "timestamp": timestamp,
+                "message": f"Your permission for event '{event_title}' was changed to {role}"
+            })
+            for user_id, role in roles.items()
+            if user_id != changer_id
+        ])
+        
+        await self._send_notification(changer_id, {
+            "type": "permissions_shared",
+            "event_id": event_id,
+            "event_title": event_title,
+            "roles": roles,
+            "group_roles": group_roles or {},
+            "timestamp": timestamp,
+            "message": f"You shared event '{event_title}' with {len(roles)} users"
+        })
+    
+    def subscribe_to(self, dispatcher, worker_pool=None) -> None:
+        """
+        Deliver outbox change events through this service
+        
+        Outbox payloads carry the keyword arguments of the matching notify_* method.
+        With a worker pool, delivery runs on the pool and the handler waits for it to finish,
+        so the outbox only marks a message processed once its fan-out is done. Coalesced
+        updates return the future of their window, which the dispatcher waits on instead.
+        """
+        handlers = {
+            TOPIC_EVENT_CREATED: self.notify_event_created,
+            TOPIC_EVENT_UPDATED: self.notify_event_updated,
+            TOPIC_EVENT_DELETED: self.notify_event_deleted,
+            TOPIC_PERMISSION_CHANGED: self.notify_permission_changed,
+            TOPIC_PERMISSIONS_SHARED: self.notify_permissions_shared,
+        }
+        
+        for topic, notify in handlers.items():
+            async def handler(payload: Dict[str, Any], db: AsyncSession, notify=notify):
+                if worker_pool is None:
+                    return await notify(**payload, db=db)
+                return await worker_pool.run(payload["event_id"], notify, payload)
+            
+            dispatcher.subscribe(topic, handler)
+    
+    async def get_notifications(
+        self,
+        user_id: str,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get notifications for a user, oldest first
+        
+        Without after, returns the newest ones; with after, only those following that
+        notification id. Ids increase, so clients can fetch just the new items.
+        """
+        try:
+            return await self.store.get(user_id, after=after, limit=limit)
+        except Exception as e:
+            logger.error(f"Error getting notifications from {self.backend}: {e}")
+            return []
     
     async def mark_as_read(self, user_id: str, notification_id: Optional[str] = None):
         """
@@ -176,61 +293,76 @@ class NotificationService:
         
         If notification_id is None, mark all notifications as read
         """
-        if self.backend == "redis":
-            try:
-                notifications_json = self.redis.get(f"notifications:{user_id}")
-                if notifications_json:
-                    notifications = json.loads(notifications_json)
-                    if notification_id:
-                        for notification in notifications:
-                            if notification.get("id") == notification_id:
-                                notification["read"] = True
-                                break
-                    else:
-                        for notification in notifications:
-                            notification["read"] = True
-                    
-                    self.redis.set(f"notifications:{user_id}", json.dumps(notifications))
-            except Exception as e:
-                logger.error(f"Error marking notifications as read in Redis: {e}")
-        else:
-            if user_id in self.notifications:
-                if notification_id:
-                    for notification in self.notifications[user_id]:
-                        if notification.get("id") == notification_id:
-                            notification["read"] = True
-                            break
-                else:
-                    for notification in self.notifications[user_id]:
-                        notification["read"] = True
+        try:
+            await self.store.mark_read(user_id, notification_id)
+        except Exception as e:
+            logger.error(f"Error marking notifications as read in {self.backend}: {e}")
+    
+    async def mark_many_as_read(self, user_id: str, notification_ids: List[str]):
+        """
+        Mark several notifications as read
+        """
+        try:
+            await self.store.mark_read_many(user_id, notification_ids)
+        except Exception as e:
+            logger.error(f"Error marking notifications as read in {self.backend}: {e}")
+    
+    async def get_unread_count(self, user_id: str) -> int:
+        """
+        Get the number of unread notifications from the backend's maintained counter
+        """
+        try:
+            return await self.store.unread_count(user_id)
+        except Exception as e:
+            logger.error(f"Error getting unread count from {self.backend}: {e}")
+            return 0
+    
+    async def flush_pending(self):
+        """
+        Write notifications still waiting in the coalescing window
+        """
+        if self.coalescer is not None:
+            await self.coalescer.flush()
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Report the notification backend, its storage counters and coalescing counters
+        """
+        metrics = {"backend": self.backend, **self.store.metrics()}
+        if self.coalescer is not None:
+            metrics["coalescing"] = self.coalescer.metrics()
+        return metrics
+    
+    async def _send_many(self, deliveries: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Send notifications to many users, one store write per NOTIFICATION_FANOUT_BATCH_SIZE recipients
+        """
+        batch_size = settings.NOTIFICATION_FANOUT_BATCH_SIZE
+        for start in range(0, len(deliveries), batch_size):
+            await self._store(deliveries[start:start + batch_size])
     
     async def _send_notification(self, user_id: str, notification: Dict[str, Any]):
         """
         Send a notification to a user
         """
-        notification["read"] = False
-        notification["id"] = f"{notification['type']}_{notification['timestamp']}"
+        await self._store([(user_id, notification)])
+    
+    async def _store(self, deliveries: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Write notifications to the store
         
-        if self.backend == "redis":
-            try:
-                notifications_json = self.redis.get(f"notifications:{user_id}")
-                if notifications_json:
-                    notifications = json.loads(notifications_json)
-                else:
-                    notifications = []
-                
-                notifications.append(notification)
-                self.redis.set(f"notifications:{user_id}", json.dumps(notifications))
-                
-                self.redis.publish(f"user:{user_id}:notifications", json.dumps(notification))
-            except Exception as e:
-                logger.error(f"Error sending notification via Redis: {e}")
-        else:
-            if user_id not in self.notifications:
-                self.notifications[user_id] = []
-            
-            self.notifications[user_id].append(notification)
-
+        Errors are logged and re-raised so the outbox retries the delivery. Stored
+        notifications are then passed to the in-process listeners.
+        """
+        try:
+            await self.store.add_many(deliveries)
+        except Exception as e:
+            logger.error(f"Error sending notifications via {self.backend}: {e}")
+            raise
+        
+        for listener in self.listeners:
+            for user_id, notification in deliveries:
+                listener(user_id, notification)
 
 notification_service = NotificationService()
 
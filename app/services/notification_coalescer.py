@@ -0,0 +1,112 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+Delivery = Tuple[str, Dict[str, Any]]
+SendMany = Callable[[List[Delivery]], Awaitable[None]]
+
+
+class NotificationCoalescer:
+    """
+    Merges bursts of event update notifications before they are stored
+
+    Notifications are keyed by (event_id, recipient). The first update of an event opens a
+    window of window seconds; further updates of that event within the window are folded
+    into the pending notification of each recipient, which then carries the range of
+    versions it covers and the number of updates. When the window closes, all recipients
+    of the event are written in one batch.
+
+    Pending notifications only live in process memory. add returns a future that resolves
+    once the window they joined has been written, and the outbox subscriber hands it back
+    to the dispatcher, which only marks the messages processed then. A crash inside the
+    window therefore leaves them in the outbox to be delivered again after restart.
+    """
+
+    def __init__(self, send_many: SendMany, window: float):
+        self.send_many = send_many
+        self.window = window
+        self.pending: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._written: Dict[str, asyncio.Future] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+
+        self.received_total = 0
+        self.written_total = 0
+
+    async def add(self, event_id: str, deliveries: List[Delivery]) -> asyncio.Future:
+        """
+        Queue update notifications for an event, merging them into pending ones
+
+        Returns a future resolving when the event's window is written, or failing with
+        the error of that write
+        """
+        written = self._written.get(event_id)
+        if written is None:
+            written = self._written[event_id] = asyncio.get_running_loop().create_future()
+        recipients = self.pending.setdefault(event_id, {})
+        for user_id, notification in deliveries:
+            self.received_total += 1
+            pending = recipients.get(user_id)
+            recipients[user_id] = _merge(pending, notification) if pending else _start(notification)
+
+        if event_id not in self._timers:
+            self._timers[event_id] = asyncio.create_task(self._flush_later(event_id))
+        return written
+
+    async def flush(self, event_id: Optional[str] = None) -> None:
+        """
+        Write pending notifications now, for one event or for all of them
+        """
+        event_ids = [event_id] if event_id is not None else list(self.pending)
+        for pending_event_id in event_ids:
+            timer = self._timers.pop(pending_event_id, None)
+            if timer is not None and timer is not asyncio.current_task():
+                timer.cancel()
+            recipients = self.pending.pop(pending_event_id, None)
+            written = self._written.pop(pending_event_id, None)
+            try:
+                if recipients:
+                    self.written_total += len(recipients)
+                    await self.send_many(list(recipients.items()))
+            except Exception as e:
+                if written is not None:
+                    written.set_exception(e)
+                raise
+            if written is not None:
+                written.set_result(None)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Report how many notifications came in and how many were written after merging
+        """
+        return {
+            "window_seconds": self.window,
+            "pending_events": len(self.pending),
+            "received_total": self.received_total,
+            "written_total": self.written_total,
+        }
+
+    async def _flush_later(self, event_id: str) -> None:
+        await asyncio.sleep(self.window)
+        try:
+            await self.flush(event_id)
+        except Exception as e:
+            logger.error(f"Error flushing coalesced notifications for event {event_id}: {e}")
+
+
+def _start(notification: Dict[str, Any]) -> Dict[str, Any]:
+    notification["updates"] = 1
+    notification["version_from"] = notification.get("version")
+    notification["version_to"] = notification.get("version")
+    return notification
+
+
+def _merge(pending: Dict[str, Any], notification: Dict[str, Any]) -> Dict[str, Any]:
+    updates = pending["updates"] + 1
+    merged = dict(notification)
+    merged["updates"] = updates
+    merged["version_from"] = pending["version_from"]
+    merged["version_to"] = notification.get("version")
+    merged["message"] = f"Event '{notification['event_title']}' was updated {updates} times"
+    return merged
@@ -0,0 +1,252 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from collections import defaultdict, deque
+import asyncio
+import json
+import logging
+
+from app.core.config import settings
+from app.db.repositories.notification import NotificationRepository
+from app.services.notification import NotificationService, notification_service
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    One client connection's buffer of notifications waiting to be pushed
+
+    The buffer holds at most max_pending notifications; a consumer that falls further
+    behind is marked as overflowed and dropped, and is expected to reconnect and resume
+    from its last event id
+    """
+
+    def __init__(self, user_id: str, max_pending: int):
+        self.user_id = user_id
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.ready = asyncio.Event()
+        self.overflowed = False
+
+    def offer(self, notification: Dict[str, Any]) -> bool:
+        """
+        Queue a notification, returning False once the subscription has overflowed
+        """
+        if self.overflowed:
+            return False
+        if len(self.pending) >= self.max_pending:
+            self.overflowed = True
+            self.pending.clear()
+            self.ready.set()
+            return False
+        self.pending.append(notification)
+        self.ready.set()
+        return True
+
+    async def next_batch(self, timeout: float) -> List[Dict[str, Any]]:
+        """
+        Wait up to timeout for notifications and take everything queued, [] on timeout
+        """
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return []
+        self.ready.clear()
+        batch = list(self.pending)
+        self.pending.clear()
+        return batch
+
+
+class NotificationBroker:
+    """
+    Per-process hub pushing new notifications to connected clients
+
+    The process has one source of new notifications whatever the number of connections:
+    a single pattern subscription to the user:*:notifications channels with the Redis
+    backend, one query over all connected users every NOTIFICATION_PUSH_POLL_INTERVAL_SECONDS
+    with the database backend, or the service's own deliveries with the in-memory backend.
+    Each notification is then copied into the buffers of that user's connections.
+    """
+
+    def __init__(
+        self,
+        service: NotificationService = notification_service,
+        max_pending: Optional[int] = None,
+        heartbeat_interval: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.service = service
+        self.max_pending = max_pending or settings.NOTIFICATION_PUSH_MAX_PENDING
+        self.heartbeat_interval = heartbeat_interval or settings.NOTIFICATION_PUSH_HEARTBEAT_SECONDS
+        self.poll_interval = poll_interval or settings.NOTIFICATION_PUSH_POLL_INTERVAL_SECONDS
+        self.subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+
+        self._started = False
+        self._task: Optional[asyncio.Task] = None
+
+        self.pushed_total = 0
+        self.dropped_total = 0
+
+    async def start(self) -> None:
+        """
+        Start listening for new notifications
+        """
+        if self._started:
+            return
+        self._started = True
+        if self.service.backend == "redis":
+            self._task = asyncio.create_task(self._listen_redis())
+        elif self.service.backend == "database":
+            self._task = asyncio.create_task(self._poll_database())
+        else:
+            self.service.listeners.append(self.publish)
+
+    async def stop(self) -> None:
+        """
+        Stop listening; open streams stay connected but receive nothing more
+        """
+        if not self._started:
+            return
+        self._started = False
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.publish in self.service.listeners:
+            self.service.listeners.remove(self.publish)
+
+    async def subscribe(self, user_id: str) -> Subscription:
+        """
+        Register a connection for a user's notifications
+        """
+        if not self._started:
+            await self.start()
+        subscription = Subscription(user_id, self.max_pending)
+        self.subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Remove a connection
+        """
+        connections = self.subscriptions.get(subscription.user_id)
+        if connections is None:
+            return
+        connections.discard(subscription)
+        if not connections:
+            del self.subscriptions[subscription.user_id]
+
+    def publish(self, user_id: str, notification: Dict[str, Any]) -> None:
+        """
+        Hand a notification to every connection of a user, dropping those that overflow
+        """
+        for subscription in list(self.subscriptions.get(user_id, ())):
+            if subscription.offer(notification):
+                self.pushed_total += 1
+            else:
+                self.unsubscribe(subscription)
+                self.dropped_total += 1
+
+    async def stream(self, user_id: str, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yield a user's notifications as server-sent events
+
+        Notifications after last_event_id are replayed from the store first. A comment line
+        is sent after heartbeat_interval seconds without notifications to keep proxies from
+        closing the connection, and an overflow event ends the stream of a slow consumer.
+        """
+        subscription = await self.subscribe(user_id)
+        try:
+            replayed = set()
+            if last_event_id:
+                for notification in await self.service.get_notifications(user_id, after=last_event_id):
+                    replayed.add(notification["id"])
+                    yield _format_event(notification)
+
+            while True:
+                batch = await subscription.next_batch(self.heartbeat_interval)
+                if subscription.overflowed:
+                    yield "event: overflow\ndata: {}\n\n"
+                    return
+                if not batch:
+                    yield ": heartbeat\n\n"
+                    continue
+                for notification in batch:
+                    if notification["id"] not in replayed:
+                        yield _format_event(notification)
+        finally:
+            self.unsubscribe(subscription)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Report connection counts and push counters
+        """
+        return {
+            "running": self._started,
+            "users": len(self.subscriptions),
+            "connections": sum(len(connections) for connections in self.subscriptions.values()),
+            "pushed_total": self.pushed_total,
+            "dropped_total": self.dropped_total,
+        }
+
+    async def _listen_redis(self) -> None:
+        pubsub = self.service.store.client.pubsub()
+        await pubsub.psubscribe(self.service.store.channel("*"))
+        try:
+            while True:
+                try:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error reading notifications from Redis: {e}")
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                if message is None or message["type"] != "pmessage":
+                    continue
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode("utf-8")
+                self.publish(channel.split(":")[1], json.loads(message["data"]))
+        finally:
+            await pubsub.close()
+
+    async def _poll_database(self) -> None:
+        repository = NotificationRepository()
+        store = self.service.store
+        cursor: Optional[int] = None
+
+        while True:
+            try:
+                async with store.session_factory() as db:
+                    if not self.subscriptions:
+                        cursor = None
+                    elif cursor is None:
+                        cursor = await repository.get_last_id(db)
+                    else:
+                        rows = await repository.get_for_users_since(
+                            db,
+                            user_ids=list(self.subscriptions),
+                            after=cursor
+                        )
+                        for row in rows:
+                            notification = dict(row.data)
+                            notification["id"] = str(row.id)
+                            notification["read"] = row.read
+                            self.publish(row.user_id, notification)
+                            cursor = row.id
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error polling notifications: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+
+def _format_event(notification: Dict[str, Any]) -> str:
+    return f"id: {notification['id']}\nevent: {notification['type']}\ndata: {json.dumps(notification)}\n\n"
+
+
+notification_broker = NotificationBroker()
+
+
+def get_notification_broker():
+    return notification_broker
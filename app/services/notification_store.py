@@ -0,0 +1,590 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import itertools
+import json
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.repositories.notification import NotificationRepository
+
+logger = logging.getLogger(__name__)
+
+Delivery = Tuple[str, Dict[str, Any]]
+
+
+class _RingBuffer:
+    """fixed-capacity buffer of one user's notifications, oldest overwritten first"""
+
+    __slots__ = ("slots", "expires_at", "head", "size", "index", "unread")
+
+    def __init__(self, capacity: int):
+        self.slots: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self.expires_at: List[float] = [0.0] * capacity
+        self.head = 0
+        self.size = 0
+        self.index: Dict[str, int] = {}
+        self.unread = 0
+
+    @property
+    def tail(self) -> int:
+        return (self.head - self.size) % len(self.slots)
+
+    def push(self, notification: Dict[str, Any], expires_at: float) -> bool:
+        """append a notification, returning True if the oldest one was overwritten"""
+        overwritten = self.size == len(self.slots)
+        if overwritten:
+            self._forget(self.head)
+        else:
+            self.size += 1
+        self.slots[self.head] = notification
+        self.expires_at[self.head] = expires_at
+        self.index[notification["id"]] = self.head
+        self.unread += 1
+        self.head = (self.head + 1) % len(self.slots)
+        return overwritten
+
+    def expire(self, now: float) -> int:
+        """drop notifications past their expiry; they are always the oldest ones"""
+        expired = 0
+        while self.size and self.expires_at[self.tail] <= now:
+            self._forget(self.tail)
+            self.size -= 1
+            expired += 1
+        return expired
+
+    def items(self) -> List[Dict[str, Any]]:
+        capacity = len(self.slots)
+        tail = self.tail
+        return [self.slots[(tail + i) % capacity] for i in range(self.size)]
+
+    def items_after(self, notification_id: str) -> List[Dict[str, Any]]:
+        """notifications newer than the given one"""
+        slot = self.index.get(notification_id)
+        if slot is None:
+            after = _int_id(notification_id)
+            if after is None:
+                return self.items()
+            return [notification for notification in self.items() if int(notification["id"]) > after]
+        capacity = len(self.slots)
+        skip = (slot - self.tail) % capacity + 1
+        return [self.slots[(self.tail + i) % capacity] for i in range(skip, self.size)]
+
+    def mark_read(self, notification_id: str) -> None:
+        slot = self.index.get(str(notification_id))
+        if slot is not None and not self.slots[slot]["read"]:
+            self.slots[slot]["read"] = True
+            self.unread -= 1
+
+    def mark_all_read(self) -> None:
+        for notification in self.items():
+            notification["read"] = True
+        self.unread = 0
+
+    def _forget(self, slot: int) -> None:
+        notification = self.slots[slot]
+        self.slots[slot] = None
+        if self.index.get(notification["id"]) == slot:
+            del self.index[notification["id"]]
+        if not notification["read"]:
+            self.unread -= 1
+
+
+class InMemoryNotificationStore:
+    """
+    Notification store keeping notifications in process memory (for development)
+
+    Notification ids come from a process-wide counter, so they are unique and increasing.
+    Each user gets a ring buffer of NOTIFICATION_MAX_PER_USER slots, so the newest
+    notifications overwrite the oldest, and notifications expire after
+    NOTIFICATION_TTL_SECONDS. An id to slot index makes marking one notification read
+    O(1) and the unread count is kept up to date on every change. Across users at most
+    NOTIFICATION_MEMORY_MAX_TOTAL notifications are held; past that, whole users are
+    evicted starting with the one least recently written to or read.
+    """
+
+    name = "in-memory"
+
+    def __init__(
+        self,
+        max_per_user: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        max_total: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_per_user = max_per_user or settings.NOTIFICATION_MAX_PER_USER
+        self.ttl_seconds = ttl_seconds or settings.NOTIFICATION_TTL_SECONDS
+        self.max_total = max_total or settings.NOTIFICATION_MEMORY_MAX_TOTAL
+        self.clock = clock
+        self._ids = itertools.count(1)
+
+        self.buffers: "OrderedDict[str, _RingBuffer]" = OrderedDict()
+        self.total = 0
+        self.expired_total = 0
+        self.overwritten_total = 0
+        self.evicted_users_total = 0
+
+    async def add_many(self, deliveries: List[Delivery]) -> List[Dict[str, Any]]:
+        """
+        Store notifications for their recipients and return them with id and read flag set
+        """
+        now = self.clock()
+        for user_id, notification in deliveries:
+            notification["read"] = False
+            notification["id"] = str(next(self._ids))
+
+            buffer = self._touch(user_id, now, create=True)
+            if buffer.push(notification, now + self.ttl_seconds):
+                self.overwritten_total += 1
+            else:
+                self.total += 1
+
+        self._evict_idle()
+        return [notification for _, notification in deliveries]
+
+    async def get(
+        self,
+        user_id: str,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a user's notifications, oldest first: the newest limit ones, or the first limit
+        following after
+        """
+        buffer = self._touch(user_id, self.clock())
+        if buffer is None:
+            return []
+        if after is not None:
+            return buffer.items_after(after)[:limit]
+        items = buffer.items()
+        return items[-limit:] if limit else items
+
+    async def mark_read(self, user_id: str, notification_id: Optional[str] = None) -> None:
+        """
+        Mark one notification, or all of them when notification_id is None, as read
+        """
+        buffer = self._touch(user_id, self.clock())
+        if buffer is None:
+            return
+        if notification_id is None:
+            buffer.mark_all_read()
+        else:
+            buffer.mark_read(notification_id)
+
+    async def mark_read_many(self, user_id: str, notification_ids: List[str]) -> None:
+        """
+        Mark several notifications as read
+        """
+        buffer = self._touch(user_id, self.clock())
+        if buffer is None:
+            return
+        for notification_id in notification_ids:
+            buffer.mark_read(notification_id)
+
+    async def unread_count(self, user_id: str) -> int:
+        """
+        Get the number of unread notifications of a user
+        """
+        buffer = self._touch(user_id, self.clock())
+        return buffer.unread if buffer else 0
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Report how many notifications are held and how many were dropped
+        """
+        return {
+            "users": len(self.buffers),
+            "notifications": self.total,
+            "max_total": self.max_total,
+            "expired_total": self.expired_total,
+            "overwritten_total": self.overwritten_total,
+            "evicted_users_total": self.evicted_users_total,
+        }
+
+    def _touch(self, user_id: str, now: float, create: bool = False) -> Optional[_RingBuffer]:
+        """get a user's buffer with expired notifications dropped and mark it recently used"""
+        buffer = self.buffers.get(user_id)
+        if buffer is None:
+            if not create:
+                return None
+            buffer = self.buffers[user_id] = _RingBuffer(self.max_per_user)
+        else:
+            self.buffers.move_to_end(user_id)
+
+        expired = buffer.expire(now)
+        self.total -= expired
+        self.expired_total += expired
+        return buffer
+
+    def _evict_idle(self) -> None:
+        """drop least recently used users until the global cap is respected"""
+        while self.total > self.max_total and len(self.buffers) > 1:
+            _, buffer = self.buffers.popitem(last=False)
+            self.total -= buffer.size
+            self.evicted_users_total += 1
+
+
+# compares stream entry ids "<ms>-<seq>"; milliseconds fit a Lua number exactly
+_LUA_ID_LE = """
+local function id_le(a, b)
+    local a_ms, a_seq = string.match(a, '^(%d+)-(%d+)$')
+    local b_ms, b_seq = string.match(b, '^(%d+)-(%d+)$')
+    a_ms, a_seq, b_ms, b_seq = tonumber(a_ms), tonumber(a_seq), tonumber(b_ms), tonumber(b_seq)
+    return a_ms < b_ms or (a_ms == b_ms and a_seq <= b_seq)
+end
+"""
+
+# KEYS: stream, read, read_until, unread; ARGV: max per user, ttl, data
+_ADD_SCRIPT = _LUA_ID_LE + """
+local id = redis.call('XADD', KEYS[1], '*', 'data', ARGV[3])
+local unread = 1
+local excess = redis.call('XLEN', KEYS[1]) - tonumber(ARGV[1])
+if excess > 0 then
+    local read_until = redis.call('GET', KEYS[3])
+    for _, entry in ipairs(redis.call('XRANGE', KEYS[1], '-', '+', 'COUNT', excess)) do
+        local was_read = redis.call('SREM', KEYS[2], entry[1]) == 1
+        if not was_read and not (read_until and id_le(entry[1], read_until)) then
+            unread = unread - 1
+        end
+    end
+    redis.call('XTRIM', KEYS[1], 'MAXLEN', ARGV[1])
+end
+redis.call('INCRBY', KEYS[4], unread)
+for _, key in ipairs(KEYS) do
+    redis.call('EXPIRE', key, ARGV[2])
+end
+return id
+"""
+
+# KEYS: stream, read, read_until, unread; ARGV: ttl, ids...
+_MARK_READ_SCRIPT = _LUA_ID_LE + """
+local read_until = redis.call('GET', KEYS[3])
+local marked = 0
+for index = 2, #ARGV do
+    local id = ARGV[index]
+    if not (read_until and id_le(id, read_until))
+        and #redis.call('XRANGE', KEYS[1], id, id, 'COUNT', 1) > 0
+        and redis.call('SADD', KEYS[2], id) == 1 then
+        marked = marked + 1
+    end
+end
+if marked > 0 then
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+    redis.call('DECRBY', KEYS[4], marked)
+end
+return marked
+"""
+
+# KEYS: stream, read, read_until, unread; ARGV: ttl
+_MARK_ALL_READ_SCRIPT = """
+local latest = redis.call('XREVRANGE', KEYS[1], '+', '-', 'COUNT', 1)
+if #latest == 0 then
+    return 0
+end
+redis.call('SET', KEYS[3], latest[1][1], 'EX', ARGV[1])
+redis.call('DEL', KEYS[2])
+redis.call('SET', KEYS[4], 0, 'EX', ARGV[1])
+return 1
+"""
+
+
+class RedisNotificationStore:
+    """
+    Notification store on Redis native data structures
+
+    Each user has a stream capped at NOTIFICATION_MAX_PER_USER entries, whose entry ids
+    double as notification ids, so they are unique and increase with time. Read state
+    is kept apart from the notifications: a "read until" stream id set by mark-all-read
+    plus a set of ids read individually after it, plus a maintained unread counter.
+    Every change to read state or to the stream runs as a Lua script that adjusts the
+    counter in the same step, including for unread entries trimmed off a full stream,
+    so concurrent calls never count a notification twice. Writes for a whole batch of
+    recipients go out as one pipeline, and every key expires NOTIFICATION_TTL_SECONDS
+    after its last write.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        client,
+        max_per_user: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+    ):
+        self.client = client
+        self.max_per_user = max_per_user or settings.NOTIFICATION_MAX_PER_USER
+        self.ttl_seconds = ttl_seconds or settings.NOTIFICATION_TTL_SECONDS
+        self._add = client.register_script(_ADD_SCRIPT)
+        self._mark_read = client.register_script(_MARK_READ_SCRIPT)
+        self._mark_all_read = client.register_script(_MARK_ALL_READ_SCRIPT)
+
+    @staticmethod
+    def stream_key(user_id: str) -> str:
+        return f"notifications:{user_id}:stream"
+
+    @staticmethod
+    def read_key(user_id: str) -> str:
+        return f"notifications:{user_id}:read"
+
+    @staticmethod
+    def read_until_key(user_id: str) -> str:
+        return f"notifications:{user_id}:read_until"
+
+    @staticmethod
+    def unread_key(user_id: str) -> str:
+        return f"notifications:{user_id}:unread"
+
+    @staticmethod
+    def channel(user_id: str) -> str:
+        return f"user:{user_id}:notifications"
+
+    def read_state_keys(self, user_id: str) -> List[str]:
+        """the keys every script takes, in order"""
+        return [
+            self.stream_key(user_id),
+            self.read_key(user_id),
+            self.read_until_key(user_id),
+            self.unread_key(user_id),
+        ]
+
+    async def add_many(self, deliveries: List[Delivery]) -> List[Dict[str, Any]]:
+        """
+        Append notifications to their recipients' streams and publish them
+
+        Costs two round trips per call whatever the number of recipients: one pipeline
+        of scripts appending to the streams, trimming them and adjusting the unread
+        counters, then one publishing the notifications with their new ids
+        """
+        if not deliveries:
+            return []
+
+        pipe = self.client.pipeline(transaction=False)
+        for user_id, notification in deliveries:
+            await self._add(
+                keys=self.read_state_keys(user_id),
+                args=[self.max_per_user, self.ttl_seconds, json.dumps(notification)],
+                client=pipe
+            )
+        results = await pipe.execute()
+
+        pipe = self.client.pipeline(transaction=False)
+        for (user_id, notification), entry_id in zip(deliveries, results):
+            notification["id"] = _decode(entry_id)
+            notification["read"] = False
+            pipe.publish(self.channel(user_id), json.dumps(notification))
+        await pipe.execute()
+
+        return [notification for _, notification in deliveries]
+
+    async def get(
+        self,
+        user_id: str,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a user's notifications, oldest first: the newest limit ones, or the first limit
+        following after, in one round trip
+        """
+        count = min(limit or self.max_per_user, self.max_per_user)
+        forward = after is not None and _stream_id(after) is not None
+
+        pipe = self.client.pipeline(transaction=False)
+        if forward:
+            pipe.xrange(self.stream_key(user_id), min=f"({after}", count=count)
+        else:
+            pipe.xrevrange(self.stream_key(user_id), count=count)
+        pipe.smembers(self.read_key(user_id))
+        pipe.get(self.read_until_key(user_id))
+        entries, read_ids, read_until = await pipe.execute()
+
+        read_ids = {_decode(entry_id) for entry_id in read_ids}
+        read_until = _stream_id(_decode(read_until)) if read_until else None
+
+        if not forward:
+            entries = list(reversed(entries))
+
+        notifications = []
+        for entry_id, fields in entries:
+            entry_id = _decode(entry_id)
+            notification = json.loads(_decode(fields.get("data", fields.get(b"data"))))
+            notification["id"] = entry_id
+            notification["read"] = entry_id in read_ids or (
+                read_until is not None and _stream_id(entry_id) <= read_until
+            )
+            notifications.append(notification)
+        return notifications
+
+    async def mark_read(self, user_id: str, notification_id: Optional[str] = None) -> None:
+        """
+        Mark one notification, or all of them when notification_id is None, as read
+        """
+        if notification_id is not None:
+            await self.mark_read_many(user_id, [notification_id])
+            return
+
+        await self._mark_all_read(keys=self.read_state_keys(user_id), args=[self.ttl_seconds])
+
+    async def mark_read_many(self, user_id: str, notification_ids: List[str]) -> None:
+        """
+        Mark several notifications as read in one round trip
+
+        A script adds the ids that are still stored and after "read until" to the read
+        set and takes the unread counter down by the number SADD actually added
+        """
+        notification_ids = list(dict.fromkeys(
+            notification_id for notification_id in notification_ids
+            if _stream_id(notification_id) is not None
+        ))
+        if not notification_ids:
+            return
+
+        await self._mark_read(
+            keys=self.read_state_keys(user_id),
+            args=[self.ttl_seconds, *(_full_stream_id(notification_id) for notification_id in notification_ids)]
+        )
+
+    async def unread_count(self, user_id: str) -> int:
+        """
+        Get a user's unread count from the maintained counter
+        """
+        return int(await self.client.get(self.unread_key(user_id)) or 0)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Report the per-user cap and expiry; storage counters live in Redis itself
+        """
+        return {"max_per_user": self.max_per_user, "ttl_seconds": self.ttl_seconds}
+
+
+class DatabaseNotificationStore:
+    """
+    Notification store on the notifications table
+
+    Every worker process sees the same notifications without needing Redis. Fan-out
+    inserts a whole batch of recipients in one statement, mark-read is a single
+    UPDATE over the user's unread rows, the unread count is kept in notification_counters
+    in the same transactions, and reads page by id (keyset) on the
+    (user_id, id) index, returning at most NOTIFICATION_MAX_PER_USER rows per call.
+    """
+
+    name = "database"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+        max_per_user: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.max_per_user = max_per_user or settings.NOTIFICATION_MAX_PER_USER
+        self.repository = NotificationRepository()
+
+    async def add_many(self, deliveries: List[Delivery]) -> List[Dict[str, Any]]:
+        """
+        Insert notifications for their recipients and return them with id and read flag set
+        """
+        if not deliveries:
+            return []
+        async with self.session_factory() as db:
+            ids = await self.repository.add_many(db, deliveries=deliveries)
+            await db.commit()
+
+        for (_, notification), notification_id in zip(deliveries, ids):
+            notification["id"] = str(notification_id)
+            notification["read"] = False
+        return [notification for _, notification in deliveries]
+
+    async def get(
+        self,
+        user_id: str,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a user's notifications, oldest first: the newest limit ones, or the first limit
+        following after
+        """
+        limit = min(limit or self.max_per_user, self.max_per_user)
+        async with self.session_factory() as db:
+            rows = await self.repository.get_for_user(
+                db,
+                user_id=user_id,
+                after=_int_id(after) if after is not None else None,
+                limit=limit
+            )
+
+        notifications = []
+        for row in rows:
+            notification = dict(row.data)
+            notification["id"] = str(row.id)
+            notification["read"] = row.read
+            notifications.append(notification)
+        return notifications
+
+    async def mark_read(self, user_id: str, notification_id: Optional[str] = None) -> None:
+        """
+        Mark one notification, or all of them when notification_id is None, as read
+        """
+        if notification_id is not None:
+            await self.mark_read_many(user_id, [notification_id])
+            return
+        async with self.session_factory() as db:
+            await self.repository.mark_read(db, user_id=user_id)
+            await db.commit()
+
+    async def mark_read_many(self, user_id: str, notification_ids: List[str]) -> None:
+        """
+        Mark several notifications as read with one UPDATE
+        """
+        ids = [_int_id(notification_id) for notification_id in notification_ids]
+        ids = [notification_id for notification_id in ids if notification_id is not None]
+        if not ids:
+            return
+        async with self.session_factory() as db:
+            await self.repository.mark_read(db, user_id=user_id, notification_ids=ids)
+            await db.commit()
+
+    async def unread_count(self, user_id: str) -> int:
+        """
+        Get a user's unread count from the maintained counter
+        """
+        async with self.session_factory() as db:
+            return await self.repository.count_unread(db, user_id=user_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Report the per-call read limit; storage counters live in the database
+        """
+        return {"max_per_user": self.max_per_user}
+
+
+def _int_id(value: str) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
+
+
+def _full_stream_id(value: str) -> str:
+    """spell out a stream entry id with its sequence, as scripts compare them"""
+    milliseconds, sequence = _stream_id(value)
+    return f"{milliseconds}-{sequence}"
+
+
+def _stream_id(value: str) -> Optional[Tuple[int, int]]:
+    """parse a stream entry id "<ms>-<seq>" into a comparable tuple"""
+    milliseconds, _, sequence = value.partition("-")
+    try:
+        return int(milliseconds), int(sequence or 0)
+    except ValueError:
+        return None
@@ -0,0 +1,130 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import zlib
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+NotifyCallable = Callable[..., Awaitable[Any]]
+Job = Tuple[NotifyCallable, Dict[str, Any], asyncio.Future]
+
+
+class NotificationWorkerPool:
+    """
+    Pool of asyncio workers delivering notification fan-out
+
+    Each worker owns a bounded queue and jobs are routed to a worker by event id, so
+    notifications for one event are delivered in submission order while different
+    events fan out in parallel. A full queue makes submit wait, which pushes back on
+    the outbox dispatcher instead of buffering without limit. Every job runs with its
+    own database session.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers or settings.NOTIFICATION_WORKERS
+        self.queue_size = queue_size or settings.NOTIFICATION_QUEUE_SIZE
+
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+
+        self.completed_total = 0
+        self.failed_total = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """
+        Start the worker tasks
+        """
+        if self._tasks:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        self._tasks = [
+            asyncio.create_task(self._work(queue))
+            for queue in self._queues
+        ]
+
+    async def stop(self) -> None:
+        """
+        Let queued jobs finish, then stop the workers
+        """
+        if not self._tasks:
+            return
+        for queue in self._queues:
+            await queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queues = []
+
+    async def submit(self, key: str, notify: NotifyCallable, kwargs: Dict[str, Any]) -> asyncio.Future:
+        """
+        Queue notify(**kwargs, db=<own session>) behind earlier jobs for the same key
+
+        Waits while the worker's queue is full and returns a future for the job's result
+        """
+        if not self._tasks:
+            await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues[zlib.crc32(key.encode("utf-8")) % len(self._queues)]
+        await queue.put((notify, kwargs, future))
+        return future
+
+    async def run(self, key: str, notify: NotifyCallable, kwargs: Dict[str, Any]) -> Any:
+        """
+        Submit a job and wait for it to finish
+        """
+        return await (await self.submit(key, notify, kwargs))
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while True:
+            notify, kwargs, future = await queue.get()
+            try:
+                async with self.session_factory() as db:
+                    result = await notify(**kwargs, db=db)
+            except Exception as e:
+                logger.error(f"Error delivering notification: {e}")
+                self.failed_total += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.completed_total += 1
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                queue.task_done()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Report queue depths and job counters
+        """
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "queue_depths": [queue.qsize() for queue in self._queues],
+            "queue_size": self.queue_size,
+            "completed_total": self.completed_total,
+            "failed_total": self.failed_total,
+        }
+
+
+notification_worker_pool = NotificationWorkerPool()
+
+
+def get_notification_worker_pool():
+    return notification_worker_pool
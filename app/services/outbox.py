@@ -0,0 +1,262 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from collections import defaultdict
+from datetime import datetime, timezone
+import asyncio
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models.outbox import OutboxMessage
+from app.db.repositories.outbox import OutboxRepository, OUTBOX_PENDING
+
+logger = logging.getLogger(__name__)
+
+# a handler may return an awaitable that completes once its delivery is durable
+OutboxHandler = Callable[[Dict[str, Any], AsyncSession], Awaitable[Optional[Awaitable[Any]]]]
+
+
+class OutboxDispatcher:
+    """
+    Background dispatcher draining the transactional outbox
+
+    Messages are delivered to every subscriber of their topic and only marked as processed
+    once all of them succeed, so delivery is at-least-once: a crash between delivery and the
+    final commit redelivers the batch after restart. Failed messages are retried until
+    OUTBOX_MAX_ATTEMPTS and then left in the table for inspection. Subscribers that hand work
+    to the notification worker pool wait for it, so a full pool slows the drain down.
+
+    A handler that defers its work, like a coalescing window, returns an awaitable
+    acknowledging it. The message is then only marked processed (or failed) once that
+    completes, and later drains skip it meanwhile instead of delivering it twice.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL_SECONDS
+        self.max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+        self.subscribers: Dict[str, List[OutboxHandler]] = defaultdict(list)
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._unacknowledged: Dict[int, asyncio.Task] = {}
+
+        self.delivered_total = 0
+        self.failed_total = 0
+        self.last_batch_size = 0
+        self.last_delivery_lag_seconds = 0.0
+        self.last_drain_at: Optional[float] = None
+
+    def subscribe(self, topic: str, handler: OutboxHandler) -> None:
+        """
+        Register a handler for a topic; handlers receive the payload and a fresh session
+        """
+        self.subscribers[topic].append(handler)
+
+    async def start(self) -> None:
+        """
+        Start draining in the background and wake up whenever a commit carries outbox messages
+        """
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        event.listen(Session, "after_commit", self._after_commit)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the background loop; undelivered messages stay in the outbox
+        """
+        if self._task is None:
+            return
+        event.remove(Session, "after_commit", self._after_commit)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def wait_acknowledged(self) -> None:
+        """
+        Wait until every delivered message has been acknowledged and marked
+        """
+        while self._unacknowledged:
+            await asyncio.gather(*self._unacknowledged.values(), return_exceptions=True)
+
+    def wake(self) -> None:
+        """
+        Ask the loop to drain now instead of waiting for the next poll
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _after_commit(self, session: Session) -> None:
+        if session.info.pop(OUTBOX_PENDING, False):
+            self.wake()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error draining outbox: {e}")
+                processed = 0
+
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        """
+        Deliver one batch of pending messages and return how many were handled
+
+        Messages for different events are delivered concurrently; messages for the same
+        event are delivered in order, and a failure holds back the rest of that event's
+        messages until the next drain
+        """
+        outbox_repo = OutboxRepository()
+
+        async with self.session_factory() as db:
+            messages = await outbox_repo.get_pending(
+                db,
+                limit=self.batch_size,
+                max_attempts=self.max_attempts,
+                exclude_ids=list(self._unacknowledged)
+            )
+
+            groups: Dict[Any, List[OutboxMessage]] = defaultdict(list)
+            for message in messages:
+                groups[message.payload.get("event_id")].append(message)
+
+            results = await asyncio.gather(*(
+                self._deliver_in_order(group) for group in groups.values()
+            ))
+
+            delivered = []
+            for group_delivered, group_deferred, failure in results:
+                delivered.extend(group_delivered)
+                for message, acks in group_deferred:
+                    self._unacknowledged[message.id] = asyncio.create_task(
+                        self._acknowledge(message.id, message.created_at, acks)
+                    )
+                if failure is not None:
+                    message, error = failure
+                    logger.error(f"Error delivering outbox message {message.id}: {error}")
+                    await outbox_repo.mark_failed(db, id=message.id, error=str(error))
+                    self.failed_total += 1
+
+            await outbox_repo.mark_processed(db, ids=[message.id for message in delivered])
+            await db.commit()
+
+        if delivered:
+            self.last_delivery_lag_seconds = max(
+                _age_seconds(message.created_at) for message in delivered
+            )
+        self.delivered_total += len(delivered)
+        self.last_batch_size = len(messages)
+        self.last_drain_at = time.time()
+        return len(messages)
+
+    async def _deliver_in_order(
+        self,
+        messages: List[OutboxMessage]
+    ) -> Tuple[
+        List[OutboxMessage],
+        List[Tuple[OutboxMessage, List[Awaitable[Any]]]],
+        Optional[Tuple[OutboxMessage, Exception]]
+    ]:
+        delivered = []
+        deferred = []
+        for message in messages:
+            acks = []
+            try:
+                for handler in self.subscribers.get(message.topic, []):
+                    async with self.session_factory() as handler_db:
+                        ack = await handler(message.payload, handler_db)
+                    if ack is not None:
+                        acks.append(ack)
+            except Exception as e:
+                return delivered, deferred, (message, e)
+            if acks:
+                deferred.append((message, acks))
+            else:
+                delivered.append(message)
+        return delivered, deferred, None
+
+    async def _acknowledge(self, id: int, created_at: Optional[datetime], acks: List[Awaitable[Any]]) -> None:
+        """mark a deferred delivery processed once all its handlers acknowledged it"""
+        outbox_repo = OutboxRepository()
+        try:
+            try:
+                await asyncio.gather(*acks)
+            except Exception as e:
+                logger.error(f"Error delivering outbox message {id}: {e}")
+                async with self.session_factory() as db:
+                    await outbox_repo.mark_failed(db, id=id, error=str(e))
+                    await db.commit()
+                self.failed_total += 1
+                self.wake()
+                return
+
+            async with self.session_factory() as db:
+                await outbox_repo.mark_processed(db, ids=[id])
+                await db.commit()
+            self.last_delivery_lag_seconds = _age_seconds(created_at)
+            self.delivered_total += 1
+        except Exception as e:
+            logger.error(f"Error acknowledging outbox message {id}: {e}")
+        finally:
+            self._unacknowledged.pop(id, None)
+
+    async def metrics(self) -> Dict[str, Any]:
+        """
+        Report backlog size, lag and delivery counters
+        """
+        async with self.session_factory() as db:
+            backlog = await OutboxRepository().get_backlog(db, max_attempts=self.max_attempts)
+
+        oldest = backlog["oldest_created_at"]
+        return {
+            "running": self._task is not None,
+            "pending": backlog["pending"],
+            "dead": backlog["dead"],
+            "lag_seconds": _age_seconds(oldest) if oldest else 0.0,
+            "last_delivery_lag_seconds": self.last_delivery_lag_seconds,
+            "delivered_total": self.delivered_total,
+            "failed_total": self.failed_total,
+            "unacknowledged": len(self._unacknowledged),
+            "last_batch_size": self.last_batch_size,
+            "last_drain_at": self.last_drain_at,
+        }
+
+
+def _age_seconds(created_at: Optional[datetime]) -> float:
+    if created_at is None:
+        return 0.0
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return max((datetime.now(timezone.utc) - created_at).total_seconds(), 0.0)
+
+
+outbox_dispatcher = OutboxDispatcher()
+
+
+def get_outbox_dispatcher():
+    return outbox_dispatcher
@@ -0,0 +1,175 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+from app.core.cache import TTLCache, MISSING
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# stored for users without a permission, so that denials are cached too
+NO_ROLE = ""
+
+
+class PermissionCache:
+    """
+    Cache of (event_id, user_id) -> role in front of the event_permissions table
+
+    An in-process LRU (L1) answers most lookups without a round trip. With Redis, a shared
+    tier (L2) keeps one hash per event mapping user ids to roles, so workers share loads
+    and an event can be invalidated with a single DEL. Users without a permission are
+    cached as well. Permission writes and event deletion invalidate both tiers in the
+    writing process; other workers keep their L1 entry for at most
+    PERMISSION_CACHE_L1_TTL_SECONDS, so keep it short.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_size: Optional[int] = None,
+        l1_ttl: Optional[float] = None,
+        ttl: Optional[int] = None,
+    ):
+        self.client = client
+        self.ttl = ttl or settings.PERMISSION_CACHE_TTL_SECONDS
+        self.l1 = TTLCache(
+            max_size or settings.PERMISSION_CACHE_SIZE,
+            l1_ttl or settings.PERMISSION_CACHE_L1_TTL_SECONDS
+        )
+
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(event_id: str) -> str:
+        return f"permissions:{event_id}"
+
+    async def get_role(
+        self,
+        event_id: str,
+        user_id: str,
+        load: Callable[[], Awaitable[Optional[str]]]
+    ) -> Optional[str]:
+        """
+        Get a user's role on an event, calling load() on a miss in both tiers
+        """
+        role = self.l1.get((event_id, user_id))
+        if role is not MISSING:
+            return role or None
+
+        if self.client is not None:
+            try:
+                role = await self.client.hget(self.key(event_id), user_id)
+            except Exception as e:
+                logger.warning(f"Error reading permission cache from Redis: {e}")
+                self.l2_errors += 1
+                role = None
+            if role is not None:
+                self.l2_hits += 1
+                role = role.decode("utf-8") if isinstance(role, bytes) else role
+                self.l1.set((event_id, user_id), role)
+                return role or None
+            self.l2_misses += 1
+
+        self.loads += 1
+        role = await load()
+        await self.set(event_id, user_id, role)
+        return role
+
+    def prime(self, event_id: str, user_id: str, role: Optional[str]) -> None:
+        """
+        Remember a role that was just read from the database, in this process only
+        """
+        self.l1.set((event_id, user_id), role or NO_ROLE)
+
+    async def set(self, event_id: str, user_id: str, role: Optional[str]) -> None:
+        """
+        Cache a role in both tiers
+        """
+        self.prime(event_id, user_id, role)
+        if self.client is None:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hset(self.key(event_id), user_id, role or NO_ROLE)
+            pipe.expire(self.key(event_id), self.ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Error writing permission cache to Redis: {e}")
+            self.l2_errors += 1
+
+    async def invalidate(self, event_id: str, user_id: Optional[str] = None) -> None:
+        """
+        Forget one user's role on an event, or every role on it when user_id is None
+        """
+        self.invalidations += 1
+        if user_id is not None:
+            self.l1.delete((event_id, user_id))
+        else:
+            self.l1.delete_where(lambda key: key[0] == event_id)
+
+        if self.client is None:
+            return
+        try:
+            if user_id is not None:
+                await self.client.hdel(self.key(event_id), user_id)
+            else:
+                await self.client.delete(self.key(event_id))
+        except Exception as e:
+            logger.warning(f"Error invalidating permission cache in Redis: {e}")
+            self.l2_errors += 1
+
+    async def invalidate_user(self, user_id: str, event_ids: List[str]) -> None:
+        """
+        Forget a user's roles, e.g. after their group memberships changed
+
+        Every L1 entry of the user is dropped; in Redis only the given events are touched
+        """
+        self.invalidations += 1
+        self.l1.delete_where(lambda key: key[1] == user_id)
+
+        if self.client is None or not event_ids:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for event_id in event_ids:
+                pipe.hdel(self.key(event_id), user_id)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Error invalidating permission cache in Redis: {e}")
+            self.l2_errors += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Report hit rates of both tiers and how often the database was consulted
+        """
+        return {
+            "l1": self.l1.metrics(),
+            "l2": {
+                "enabled": self.client is not None,
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "errors": self.l2_errors,
+            },
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+        }
+
+
+def _create_permission_cache() -> PermissionCache:
+    if settings.REDIS_URL:
+        try:
+            from redis import asyncio as aioredis
+            return PermissionCache(aioredis.from_url(settings.REDIS_URL, decode_responses=True))
+        except (ImportError, Exception) as e:
+            logger.warning(f"Failed to initialize Redis permission cache: {e}")
+    return PermissionCache()
+
+
+permission_cache = _create_permission_cache()
+
+
+def get_permission_cache():
+    return permission_cache
@@ -0,0 +1,106 @@
+"""
+Benchmark reading and serializing a 10k-event list page
+
+Compares the ORM path (Event objects through the identity map, then Pydantic
+from_attributes validation of each) with the Core fast path behind GET /api/events
+(a select() of plain columns mapped through a precompiled TypeAdapter), for the full
+field set and for a calendar grid's sparse fieldset.
+
+    python -m benchmarks.event_serialization [--events 10000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.repositories.event import EventRepository
+from app.schemas.event import EVENT_FIELDS, Event as EventSchema, EventCreate, dump_rows, event_fields_adapter
+
+USER_ID = "bench-user"
+GRID_FIELDS = ("title", "start_time", "end_time", "id", "current_version")
+
+
+async def seed(session_factory, events: int):
+    start = datetime(2025, 1, 1, 9)
+    async with session_factory() as db:
+        for offset in range(0, events, 1000):
+            await EventRepository().create_many_with_owner(
+                db,
+                objs_in=[
+                    EventCreate(
+                        title=f"Event {number}",
+                        description="Notes " * 40,
+                        start_time=start + timedelta(hours=number),
+                        end_time=start + timedelta(hours=number, minutes=30),
+                        location="Room 1",
+                        is_recurring=number % 10 == 0,
+                        recurrence_pattern={"frequency": "weekly", "by_day": ["MO"]} if number % 10 == 0 else None,
+                    )
+                    for number in range(offset, min(offset + 1000, events))
+                ],
+                user_id=USER_ID
+            )
+
+
+async def orm_path(db, events: int):
+    loaded = await EventRepository().get_events_for_user(db, user_id=USER_ID, limit=events)
+    started = time.perf_counter()
+    body = [EventSchema.model_validate(event).model_dump(mode="json") for event in loaded]
+    return body, started
+
+
+async def core_path(db, events: int, fields=EVENT_FIELDS):
+    rows = await EventRepository().get_event_rows_for_user(db, user_id=USER_ID, fields=fields, limit=events)
+    started = time.perf_counter()
+    body = dump_rows(event_fields_adapter(fields), rows)
+    return body, started
+
+
+async def measure(session_factory, path, repeat: int, *args):
+    """best (load, serialize) seconds over repeat runs, each in a fresh session"""
+    best = None
+    for _ in range(repeat):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            body, serialize_started = await path(db, *args)
+            finished = time.perf_counter()
+        timing = (serialize_started - started, finished - serialize_started, len(body))
+        if best is None or sum(timing[:2]) < sum(best[:2]):
+            best = timing
+    return best
+
+
+async def main(events: int, repeat: int):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        await seed(session_factory, events)
+
+        orm = await measure(session_factory, orm_path, repeat, events)
+        core = await measure(session_factory, core_path, repeat, events)
+        grid = await measure(session_factory, core_path, repeat, events, GRID_FIELDS)
+        await engine.dispose()
+
+    print(f"events:              {events} (best of {repeat})")
+    for name, (load, serialize, count) in (("ORM + from_attributes", orm), ("Core + TypeAdapter", core),
+                                           ("Core, grid fields", grid)):
+        print(f"{name + ':':<24} load {load * 1000:7.1f} ms   serialize {serialize * 1000:7.1f} ms   "
+              f"total {(load + serialize) * 1000:7.1f} ms   ({count} events)")
+    print(f"speedup:             {sum(orm[:2]) / sum(core[:2]):.1f}x full, "
+          f"{sum(orm[:2]) / sum(grid[:2]):.1f}x grid fields")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.events, args.repeat))
@@ -0,0 +1,85 @@
+"""
+Benchmark notification coalescing under a simulated collaborative editing burst
+
+A few editors take turns saving one event shared with many recipients. The same burst is
+replayed without coalescing and with a coalescing window, counting the notifications
+written to the store and the messages pushed to connected clients.
+
+    python -m benchmarks.notification_coalescing [--recipients 1000] [--updates 50]
+        [--interval-ms 20] [--window-ms 500]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models.event import EventPermission
+from app.services.notification import NotificationService
+
+EDITORS = 3
+
+
+async def replay_burst(session_factory, window: float, updates: int, interval: float):
+    service = NotificationService(coalesce_window=window)
+    pushed = []
+    service.listeners.append(lambda user_id, notification: pushed.append(user_id))
+
+    started = time.perf_counter()
+    async with session_factory() as db:
+        for version in range(2, updates + 2):
+            await service.notify_event_updated(
+                event_id="bench-event",
+                event_title="Planning",
+                updater_id=f"user-{version % EDITORS}",
+                version=version,
+                db=db
+            )
+            await asyncio.sleep(interval)
+    await service.flush_pending()
+    elapsed = time.perf_counter() - started
+
+    return service.store.total, len(pushed), elapsed
+
+
+async def main(recipients: int, updates: int, interval_ms: float, window_ms: float):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with session_factory() as db:
+            await db.execute(insert(EventPermission), [
+                {"id": f"perm-{i}", "event_id": "bench-event", "user_id": f"user-{i}", "role": "EDITOR"}
+                for i in range(recipients)
+            ])
+            await db.commit()
+
+        interval = interval_ms / 1000
+        plain = await replay_burst(session_factory, 0, updates, interval)
+        coalesced = await replay_burst(session_factory, window_ms / 1000, updates, interval)
+        await engine.dispose()
+
+    print(f"recipients:          {recipients}")
+    print(f"burst:               {updates} updates, one every {interval_ms} ms")
+    print(f"coalescing window:   {window_ms} ms")
+    print(f"without coalescing:  {plain[0]} writes, {plain[1]} pushes ({plain[2]:.2f} s)")
+    print(f"with coalescing:     {coalesced[0]} writes, {coalesced[1]} pushes ({coalesced[2]:.2f} s)")
+    print(f"reduction:           {plain[0] / max(coalesced[0], 1):.1f}x writes, "
+          f"{plain[1] / max(coalesced[1], 1):.1f}x pushes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipients", type=int, default=1000)
+    parser.add_argument("--updates", type=int, default=50)
+    parser.add_argument("--interval-ms", type=float, default=20.0)
+    parser.add_argument("--window-ms", type=float, default=500.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.recipients, args.updates, args.interval_ms, args.window_ms))
@@ -0,0 +1,100 @@
+"""
+Benchmark notification fan-out of one event update to 10k recipients
+
+Compares the old one-recipient-at-a-time loop with the worker pool's batched fan-out.
+Each store write is given a small simulated latency to stand in for a network round trip,
+so the batched path pays it once per NOTIFICATION_FANOUT_BATCH_SIZE recipients.
+
+    python -m benchmarks.notification_fanout [--recipients 10000] [--latency-ms 1]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models.event import EventPermission
+from app.db.repositories.permission import PermissionRepository
+from app.services.notification import NotificationService
+from app.services.notification_store import InMemoryNotificationStore
+from app.services.notification_worker import NotificationWorkerPool
+
+
+class SimulatedLatencyStore(InMemoryNotificationStore):
+    """in-memory store whose writes wait for one round trip like a remote backend would"""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    async def add_many(self, deliveries):
+        await asyncio.sleep(self.latency)
+        return await super().add_many(deliveries)
+
+
+async def sequential_fanout(service, session_factory, event_id):
+    """the pre-pool behaviour: load full permission rows, await each send in turn"""
+    async with session_factory() as db:
+        permissions = await PermissionRepository().get_by_event(db, event_id=event_id)
+    for permission in permissions:
+        await service._send_notification(permission.user_id, {
+            "type": "event_updated",
+            "event_id": event_id,
+            "timestamp": "",
+            "message": "Event 'Benchmark' was updated by another user",
+        })
+
+
+async def main(recipients: int, latency_ms: float):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with session_factory() as db:
+            await db.execute(insert(EventPermission), [
+                {"id": f"perm-{i}", "event_id": "bench-event", "user_id": f"user-{i}", "role": "VIEWER"}
+                for i in range(recipients)
+            ])
+            await db.commit()
+
+        latency = latency_ms / 1000
+
+        service = NotificationService(store=SimulatedLatencyStore(latency))
+        started = time.perf_counter()
+        await sequential_fanout(service, session_factory, "bench-event")
+        sequential = time.perf_counter() - started
+
+        service = NotificationService(store=SimulatedLatencyStore(latency))
+        pool = NotificationWorkerPool(session_factory=session_factory)
+        started = time.perf_counter()
+        await pool.run("bench-event", service.notify_event_updated, {
+            "event_id": "bench-event",
+            "event_title": "Benchmark",
+            "updater_id": "user-0",
+        })
+        pooled = time.perf_counter() - started
+        await pool.stop()
+
+        delivered = service.store.total
+        await engine.dispose()
+
+    print(f"recipients:            {recipients}")
+    print(f"simulated write latency: {latency_ms} ms")
+    print(f"sequential fan-out:    {sequential:.3f} s")
+    print(f"worker pool fan-out:   {pooled:.3f} s ({delivered} notifications delivered)")
+    print(f"speedup:               {sequential / pooled:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipients", type=int, default=10000)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.recipients, args.latency_ms))
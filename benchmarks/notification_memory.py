@@ -0,0 +1,64 @@
+"""
+Benchmark memory held by the in-memory notification store
+
+Fills the store the way fan-out does, with per-recipient copies of one notification per
+event, and reports the memory traced per notification and per 1M notifications. The
+global cap is raised above the number stored so nothing is evicted while measuring.
+
+    python -m benchmarks.notification_memory [--notifications 1000000] [--users 10000]
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.services.notification_store import InMemoryNotificationStore
+
+
+def make_notification(event: int):
+    return {
+        "type": "event_updated",
+        "event_id": f"{event:08d}-0000-0000-0000-000000000000",
+        "event_title": f"Planning session {event}",
+        "updater_id": "00000000-0000-0000-0000-000000000000",
+        "version": 2,
+        "timestamp": datetime.now().isoformat(),
+        "message": f"Event 'Planning session {event}' was updated by another user",
+    }
+
+
+async def main(notifications: int, users: int):
+    per_user = -(-notifications // users)
+    store = InMemoryNotificationStore(max_per_user=per_user, max_total=notifications + 1)
+
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    for event in range(per_user):
+        notification = make_notification(event)
+        await store.add_many([
+            (f"user-{user}", notification.copy())
+            for user in range(users)
+        ])
+
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stored = store.total
+    print(f"notifications stored:     {stored} ({users} users x {per_user})")
+    print(f"fill time:                {elapsed:.2f} s")
+    print(f"bytes per notification:   {used / stored:.0f}")
+    print(f"memory per 1M:            {used / stored * 1_000_000 / 2**20:.0f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--notifications", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main(args.notifications, args.users))
@@ -0,0 +1,66 @@
+"""Add changed-fields bitmask to event versions
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+VERSIONED_FIELDS = (
+    'title',
+    'description',
+    'start_time',
+    'end_time',
+    'location',
+    'is_recurring',
+    'recurrence_pattern',
+)
+
+
+def upgrade():
+    with op.batch_alter_table('event_versions') as batch_op:
+        batch_op.add_column(
+            sa.Column('changed_fields', sa.Integer(), nullable=False, server_default='0')
+        )
+
+    op.create_index(
+        'ix_event_versions_event_id_changed_fields',
+        'event_versions',
+        ['event_id', 'changed_fields'],
+    )
+
+    # Backfill masks by diffing each version against its predecessor
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        'SELECT id, event_id, version_number, ' + ', '.join(VERSIONED_FIELDS) +
+        ' FROM event_versions ORDER BY event_id, version_number'
+    )).mappings().all()
+
+    previous = None
+    for row in rows:
+        if previous is not None and previous['event_id'] == row['event_id']:
+            mask = 0
+            for bit, field in enumerate(VERSIONED_FIELDS):
+                if previous[field] != row[field]:
+                    mask |= 1 << bit
+            if mask:
+                conn.execute(
+                    sa.text('UPDATE event_versions SET changed_fields = :mask WHERE id = :id'),
+                    {'mask': mask, 'id': row['id']},
+                )
+        previous = row
+
+
+def downgrade():
+    op.drop_index('ix_event_versions_event_id_changed_fields', table_name='event_versions')
+    with op.batch_alter_table('event_versions') as batch_op:
+        batch_op.drop_column('changed_fields')
@@ -0,0 +1,22 @@
+"""Add id/version covering index on events for conditional requests
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_events_id_current_version', 'events', ['id', 'current_version'])
+
+
+def downgrade():
+    op.drop_index('ix_events_id_current_version', table_name='events')
@@ -0,0 +1,34 @@
+"""Add per-user change feed for delta sync
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'event_changes',
+        sa.Column('seq', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('event_id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('change_type', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sqlite_autoincrement=True,
+    )
+    op.create_index('ix_event_changes_user_id_seq', 'event_changes', ['user_id', 'seq'])
+
+
+def downgrade():
+    op.drop_index('ix_event_changes_user_id_seq', table_name='event_changes')
+    op.drop_table('event_changes')
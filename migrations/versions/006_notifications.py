@@ -0,0 +1,37 @@
+"""Add notifications table for the database notification backend
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'notifications',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('event_id', sa.String(), nullable=True),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.Column('read', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sqlite_autoincrement=True,
+    )
+    op.create_index('ix_notifications_user_id_id', 'notifications', ['user_id', 'id'])
+    op.create_index('ix_notifications_user_id_read', 'notifications', ['user_id', 'read'])
+
+
+def downgrade():
+    op.drop_index('ix_notifications_user_id_read', table_name='notifications')
+    op.drop_index('ix_notifications_user_id_id', table_name='notifications')
+    op.drop_table('notifications')
@@ -0,0 +1,31 @@
+"""Add maintained unread notification counters
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'notification_counters',
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('unread', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute(
+        "INSERT INTO notification_counters (user_id, unread) "
+        "SELECT user_id, COUNT(*) FROM notifications WHERE read = false GROUP BY user_id"
+    )
+
+
+def downgrade():
+    op.drop_table('notification_counters')
@@ -0,0 +1,55 @@
+"""Add groups and allow event permissions to target a group
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'groups',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('created_by', sa.String(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        'group_memberships',
+        sa.Column('group_id', sa.String(), sa.ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_group_memberships_user_id', 'group_memberships', ['user_id'])
+    
+    with op.batch_alter_table('event_permissions') as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.String(), nullable=True)
+        batch_op.add_column(sa.Column('group_id', sa.String(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_event_permissions_group_id_groups', 'groups', ['group_id'], ['id'], ondelete='CASCADE'
+        )
+    op.create_index(
+        'ix_event_permissions_event_id_group_id', 'event_permissions', ['event_id', 'group_id'], unique=True
+    )
+    op.create_index('ix_event_permissions_group_id', 'event_permissions', ['group_id'])
+
+
+def downgrade():
+    op.drop_index('ix_event_permissions_group_id', 'event_permissions')
+    op.drop_index('ix_event_permissions_event_id_group_id', 'event_permissions')
+    op.execute("DELETE FROM event_permissions WHERE group_id IS NOT NULL")
+    with op.batch_alter_table('event_permissions') as batch_op:
+        batch_op.drop_constraint('fk_event_permissions_group_id_groups', type_='foreignkey')
+        batch_op.drop_column('group_id')
+        batch_op.alter_column('user_id', existing_type=sa.String(), nullable=False)
+    op.drop_table('group_memberships')
+    op.drop_table('groups')
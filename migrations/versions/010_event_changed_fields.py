@@ -0,0 +1,39 @@
+"""Keep the changed-fields bitmask of an event's current version on the event
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'events',
+        sa.Column('changed_fields', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    op.execute(
+        'UPDATE events SET changed_fields = ('
+        'SELECT event_versions.changed_fields FROM event_versions '
+        'WHERE event_versions.event_id = events.id '
+        'AND event_versions.version_number = events.current_version'
+        ') WHERE EXISTS ('
+        'SELECT 1 FROM event_versions '
+        'WHERE event_versions.event_id = events.id '
+        'AND event_versions.version_number = events.current_version'
+        ')'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.drop_column('changed_fields')
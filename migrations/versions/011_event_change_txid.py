@@ -0,0 +1,31 @@
+"""Record the writing transaction of each change feed row
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('event_changes', sa.Column('txid', sa.BigInteger(), nullable=True))
+
+    # rows written before this revision are all committed, so they sort before any new one
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('UPDATE event_changes SET txid = 0')
+
+    op.create_index('ix_event_changes_user_id_txid_seq', 'event_changes', ['user_id', 'txid', 'seq'])
+
+
+def downgrade():
+    op.drop_index('ix_event_changes_user_id_txid_seq', table_name='event_changes')
+    with op.batch_alter_table('event_changes') as batch_op:
+        batch_op.drop_column('txid')
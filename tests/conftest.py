@@ -1,13 +1,21 @@
 import pytest
+import pytest_asyncio
 import asyncio
+from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from typing import Generator, AsyncGenerator
 from fastapi.testclient import TestClient
+from httpx import AsyncClient
 
-from app.db.base import Base, get_db
+from app.db.base import Base, SessionLocal, get_db
 from app.main import app
 from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.repositories.user import UserRepository
+from app.schemas.user import UserCreate
+from app.services.event_cache import event_cache
+from app.services.event_list_cache import event_list_cache
 
 
 # Use in-memory SQLite for testing
@@ -84,3 +92,79 @@ def client():
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    """Create an isolated database file and return a session factory bound to it."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db_session(session_factory):
+    """Create a database session on the isolated test database."""
+    async with session_factory() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def api_client(session_factory):
+    """Create an async client whose requests use the isolated test database."""
+    async def _override_get_db():
+        async with session_factory() as session:
+            yield session
+            await session.commit()
+    
+    app.dependency_overrides[get_db] = _override_get_db
+    # the caches load misses in sessions of their own
+    caches = (event_cache, event_list_cache)
+    for cache in caches:
+        cache.session_factory = session_factory
+    
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    
+    app.dependency_overrides = {}
+    for cache in caches:
+        cache.session_factory = SessionLocal
+
+
+@pytest.fixture
+def make_user(session_factory):
+    """Factory creating a user and returning (user, auth headers)."""
+    async def _make_user(username: str):
+        async with session_factory() as session:
+            user = await UserRepository().create(
+                session,
+                obj_in=UserCreate(
+                    username=username,
+                    email=f"{username}@example.com",
+                    password="testpass123"
+                )
+            )
+        headers = {"Authorization": f"Bearer {create_access_token(user.id)}"}
+        return user, headers
+    
+    return _make_user
+
+
+@pytest.fixture
+def make_event():
+    """Factory building an event payload one hour long, on the given day of January 2024."""
+    def _make_event(title: str = "Standup", day: int = 1, hour: int = 10, **fields):
+        start = datetime(2024, 1, day, hour)
+        return {
+            "title": title,
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+            **fields
+        }
+    
+    return _make_event
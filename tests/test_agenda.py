@@ -0,0 +1,106 @@
+import pytest
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+from sqlalchemy import event as sa_event
+
+from app.core.recurrence import occurrences
+from app.services.agenda import Agenda, agenda_cache
+
+
+def test_recurring_events_expand_with_their_duration():
+    pattern = {"frequency": "weekly", "interval": 1, "by_day": ["MO", "WE"], "count": 4}
+    expanded = list(occurrences(
+        datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 10), True, pattern,
+        after=datetime(2030, 1, 8), before=datetime(2031, 1, 1)
+    ))
+    assert expanded == [
+        (datetime(2030, 1, 9, 9), datetime(2030, 1, 9, 10)),
+        (datetime(2030, 1, 14, 9), datetime(2030, 1, 14, 10)),
+        (datetime(2030, 1, 16, 9), datetime(2030, 1, 16, 10)),
+    ]
+
+
+def test_agenda_keeps_a_complete_prefix_when_full():
+    daily = SimpleNamespace(
+        id="daily", title="Daily", location=None, current_version=1,
+        start_time=datetime(2030, 1, 1, 9), end_time=datetime(2030, 1, 1, 10),
+        is_recurring=True, recurrence_pattern={"frequency": "daily"}
+    )
+    once = SimpleNamespace(
+        id="once", title="Once", location=None, current_version=1,
+        start_time=datetime(2030, 1, 10, 9), end_time=datetime(2030, 1, 10, 10),
+        is_recurring=False, recurrence_pattern=None
+    )
+    agenda = Agenda(datetime(2031, 1, 1), max_entries=3, generation=0, cursor=0)
+    agenda.put(daily, datetime(2030, 1, 1))
+    agenda.put(once, datetime(2030, 1, 1))
+
+    assert agenda.truncated
+    assert agenda.until == datetime(2030, 1, 4, 9)
+    assert [item["start_time"].day for item in agenda.upcoming(datetime(2030, 1, 2), 10)] == [2, 3]
+    assert "once" not in {entry[1] for entry in agenda.entries}
+
+
+@pytest.mark.asyncio
+async def test_agenda_merges_occurrences_and_follows_changes(api_client, make_user, session_factory):
+    base = (datetime.utcnow() + timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
+    at = lambda day, hour: (base + timedelta(days=day, hours=hour)).isoformat()[:16]
+    owner, owner_headers = await make_user("agendaowner")
+    viewer, viewer_headers = await make_user("agendaviewer")
+    agenda_cache.clear()
+
+    async def agenda(headers, limit=20):
+        response = await api_client.get("/api/events/agenda", params={"limit": limit}, headers=headers)
+        assert response.status_code == 200
+        return [(item["title"], item["start_time"][:16]) for item in response.json()]
+
+    await api_client.post("/api/events", json={
+        "title": "Past", "start_time": "2020-01-01T10:00:00", "end_time": "2020-01-01T11:00:00"
+    }, headers=owner_headers)
+    response = await api_client.post("/api/events", json={
+        "title": "Launch", "start_time": at(2, 12), "end_time": at(2, 13)
+    }, headers=owner_headers)
+    launch_id = response.json()["id"]
+    await api_client.post("/api/events", json={
+        "title": "Standup", "start_time": at(0, 9), "end_time": (base + timedelta(hours=9, minutes=15)).isoformat(),
+        "is_recurring": True,
+        "recurrence_pattern": {"frequency": "daily", "interval": 1, "count": 3}
+    }, headers=owner_headers)
+
+    assert await agenda(owner_headers) == [
+        ("Standup", at(0, 9)),
+        ("Standup", at(1, 9)),
+        ("Standup", at(2, 9)),
+        ("Launch", at(2, 12)),
+    ]
+    assert await agenda(owner_headers, limit=2) == [
+        ("Standup", at(0, 9)),
+        ("Standup", at(1, 9)),
+    ]
+    assert await agenda(viewer_headers) == []
+
+    # an unchanged agenda is served without touching the database beyond the user lookup
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    sa_event.listen(engine, "before_cursor_execute", record)
+    await agenda(owner_headers)
+    sa_event.remove(engine, "before_cursor_execute", record)
+    assert len(statements) == 1
+
+    builds = agenda_cache.builds
+    await api_client.put(f"/api/events/{launch_id}", json={
+        "title": "Launch (moved)", "start_time": at(-1, 12), "end_time": at(-1, 13)
+    }, headers=owner_headers)
+    await api_client.post(
+        f"/api/events/{launch_id}/share",
+        json={"users": [{"user_id": viewer.id, "role": "VIEWER"}]},
+        headers=owner_headers
+    )
+    assert (await agenda(owner_headers))[0] == ("Launch (moved)", at(-1, 12))
+    assert await agenda(viewer_headers) == [("Launch (moved)", at(-1, 12))]
+
+    await api_client.delete(f"/api/events/{launch_id}", headers=owner_headers)
+    assert [title for title, _ in await agenda(owner_headers)] == ["Standup"] * 3
+    assert await agenda(viewer_headers) == []
+    assert agenda_cache.builds == builds
@@ -0,0 +1,170 @@
+import pytest
+from sqlalchemy import event as sa_event, func, select
+
+from app.db.models.event import Event, EventVersion
+
+
+async def create(api_client, headers, *events):
+    response = await api_client.post("/api/events/batch", json={"events": list(events)}, headers=headers)
+    assert response.status_code == 201, response.text
+    return [item["id"] for item in response.json()]
+
+
+@pytest.mark.asyncio
+async def test_batch_update_writes_in_constant_statements(api_client, make_user, make_event, session_factory, db_session):
+    owner, headers = await make_user("batchowner")
+    ids = await create(api_client, headers, *(make_event(f"Meeting {day}", day) for day in range(1, 9)))
+
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    sa_event.listen(engine, "before_cursor_execute", record)
+
+    async def move(event_ids, hour):
+        statements.clear()
+        response = await api_client.patch(
+            "/api/events/batch",
+            json={
+                "events": [
+                    {"id": event_id, "start_time": f"2024-01-{day:02d}T{hour}:00:00",
+                     "end_time": f"2024-01-{day:02d}T{hour + 1}:00:00"}
+                    for day, event_id in enumerate(event_ids, start=1)
+                ],
+                "change_comment": "Moved to the afternoon"
+            },
+            headers=headers
+        )
+        return response, len(statements)
+
+    response, few = await move(ids[:2], 14)
+    assert response.status_code == 200, response.text
+    response, many = await move(ids, 15)
+    sa_event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert many == few
+    assert [item["status"] for item in response.json()] == [200] * 8
+    assert response.json()[0]["event"]["start_time"].startswith("2024-01-01T15:00")
+    assert [item["event"]["current_version"] for item in response.json()] == [3, 3] + [2] * 6
+
+    result = await db_session.execute(
+        select(func.count()).select_from(EventVersion).where(EventVersion.change_comment == "Moved to the afternoon")
+    )
+    assert result.scalar() == 10
+
+    response = await api_client.get(f"/api/events/{ids[0]}", headers=headers)
+    assert response.json()["current_version"] == 3
+    response = await api_client.get(f"/api/events/{ids[0]}/changelog", headers=headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_atomic_batch_update_fails_as_a_whole(api_client, make_user, make_event):
+    owner, owner_headers = await make_user("atomicowner")
+    other, other_headers = await make_user("atomicother")
+    own = await create(api_client, owner_headers, make_event("Mine", 1), make_event("Also mine", 2))
+    foreign = await create(api_client, other_headers, make_event("Theirs", 20))
+
+    response = await api_client.patch(
+        "/api/events/batch",
+        json={"events": [
+            {"id": own[0], "title": "Renamed"},
+            {"id": foreign[0], "title": "Taken over"},
+            {"id": "missing", "title": "Nothing"},
+        ]},
+        headers=owner_headers
+    )
+    assert response.status_code == 403
+    assert [(item["id"], item["status"]) for item in response.json()["detail"]] == [
+        (foreign[0], 403), ("missing", 404)
+    ]
+    assert (await api_client.get(f"/api/events/{own[0]}", headers=owner_headers)).json()["title"] == "Mine"
+
+    # moving both events onto the same slot conflicts within the batch
+    response = await api_client.patch(
+        "/api/events/batch",
+        json={"events": [
+            {"id": own[0], "start_time": "2024-01-05T10:00:00", "end_time": "2024-01-05T11:00:00"},
+            {"id": own[1], "start_time": "2024-01-05T10:30:00", "end_time": "2024-01-05T11:30:00"},
+        ]},
+        headers=owner_headers
+    )
+    assert response.status_code == 409
+    assert {item["id"] for item in response.json()["detail"]} == set(own)
+
+    response = await api_client.patch(
+        "/api/events/batch",
+        json={"events": [{"id": own[0], "title": "Stale", "expected_version": 7}]},
+        headers=owner_headers
+    )
+    assert response.status_code == 412
+
+    response = await api_client.patch(
+        "/api/events/batch",
+        json={"events": [{"id": own[0], "title": "A"}, {"id": own[0], "title": "B"}]},
+        headers=owner_headers
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_per_item_batch_update_uses_savepoints(api_client, make_user, make_event):
+    owner, headers = await make_user("itemowner")
+    other, other_headers = await make_user("itemother")
+    ids = await create(api_client, headers, make_event("First", 1), make_event("Second", 2), make_event("Third", 3))
+    foreign = await create(api_client, other_headers, make_event("Theirs", 20))
+
+    response = await api_client.patch(
+        "/api/events/batch",
+        params={"atomic": "false"},
+        json={"events": [
+            {"id": ids[0], "title": "First (renamed)"},
+            # title is required, so this write fails inside its savepoint
+            {"id": ids[1], "title": None},
+            {"id": foreign[0], "title": "Taken over"},
+            {"id": ids[2], "location": "Room 2"},
+        ]},
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()] == [200, 422, 403, 200]
+    assert response.json()[0]["event"]["title"] == "First (renamed)"
+    assert (await api_client.get(f"/api/events/{ids[1]}", headers=headers)).json()["title"] == "Second"
+    assert (await api_client.get(f"/api/events/{ids[2]}", headers=headers)).json()["location"] == "Room 2"
+
+
+@pytest.mark.asyncio
+async def test_batch_delete(api_client, make_user, make_event, db_session):
+    owner, headers = await make_user("deleteowner")
+    viewer, viewer_headers = await make_user("deleteviewer")
+    ids = await create(api_client, headers, make_event("Gone 1", 1), make_event("Gone 2", 2), make_event("Kept", 3))
+    for event_id in ids:
+        await api_client.post(
+            f"/api/events/{event_id}/share",
+            json={"users": [{"user_id": viewer.id, "role": "VIEWER"}]},
+            headers=headers
+        )
+    cursor = (await api_client.get("/api/sync", headers=viewer_headers)).json()["cursor"]
+
+    response = await api_client.request(
+        "DELETE", "/api/events/batch", json={"ids": [ids[0], "missing"]}, headers=headers
+    )
+    assert response.status_code == 404
+
+    response = await api_client.request(
+        "DELETE", "/api/events/batch", json={"ids": ids[:2]}, headers=viewer_headers
+    )
+    assert response.status_code == 403
+
+    response = await api_client.request(
+        "DELETE", "/api/events/batch", params={"atomic": "false"}, json={"ids": [*ids[:2], "missing"]}, headers=headers
+    )
+    assert [item["status"] for item in response.json()] == [204, 204, 404]
+
+    result = await db_session.execute(select(Event.title).where(Event.id.in_(ids)))
+    assert result.scalars().all() == ["Kept"]
+    response = await api_client.get("/api/sync", params={"cursor": cursor}, headers=viewer_headers)
+    assert sorted((t["event_id"], t["change_type"]) for t in response.json()["tombstones"]) == sorted(
+        (event_id, "deleted") for event_id in ids[:2]
+    )
@@ -0,0 +1,106 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.core.ical import fold, parse_vevent
+from app.services.calendar_io import IcsParser, ics_parser, read_ics
+
+
+def vevents(text):
+    return text.count("BEGIN:VEVENT")
+
+
+@pytest.mark.asyncio
+async def test_export_streams_pages_and_imports_back(api_client, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "ICS_EXPORT_PAGE_SIZE", 2)
+    owner, headers = await make_user("icsowner")
+    events = [
+        {
+            "title": "Standup, daily",
+            "description": "Agenda:\nupdates; blockers",
+            "start_time": "2025-05-05T09:00:00",
+            "end_time": "2025-05-05T09:15:00",
+            "is_recurring": True,
+            "recurrence_pattern": {"frequency": "weekly", "interval": 2, "by_day": ["MO", "WE"], "count": 10},
+        },
+        {"title": "Review", "location": "Room 4", "start_time": "2025-05-06T14:00:00", "end_time": "2025-05-06T15:00:00"},
+        {"title": "Retro", "start_time": "2025-05-07T16:00:00", "end_time": "2025-05-07T17:00:00"},
+    ]
+    response = await api_client.post("/api/events/batch", json={"events": events}, headers=headers)
+    assert response.status_code == 201, response.text
+
+    response = await api_client.get("/api/events/calendar.ics", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/calendar")
+    text = response.text
+    assert text.startswith("BEGIN:VCALENDAR\r\n") and text.endswith("END:VCALENDAR\r\n")
+    assert vevents(text) == 3
+    assert "SUMMARY:Standup\\, daily\r\n" in text
+    assert "DESCRIPTION:Agenda:\\nupdates\\; blockers\r\n" in text
+    assert "RRULE:FREQ=WEEKLY;INTERVAL=2;COUNT=10;BYDAY=MO,WE\r\n" in text
+    assert "DTSTART:20250506T140000Z\r\n" in text
+
+    monkeypatch.setattr(ics_parser, "batch_size", 2)
+    importer, importer_headers = await make_user("icsimporter")
+    try:
+        response = await api_client.post(
+            "/api/events/calendar.ics",
+            content=text.encode(),
+            headers={**importer_headers, "Content-Type": "text/calendar"}
+        )
+    finally:
+        ics_parser.stop()
+    assert response.status_code == 200, response.text
+    *chunks, summary = [json.loads(line) for line in response.text.splitlines()]
+    assert summary == {"done": True, "chunks": 1, "records": 3, "created": 3, "failed": 0}
+
+    response = await api_client.get("/api/events", headers=importer_headers)
+    imported = {event["title"]: event for event in response.json()}
+    assert imported["Standup, daily"]["description"] == "Agenda:\nupdates; blockers"
+    assert imported["Standup, daily"]["recurrence_pattern"]["by_day"] == ["MO", "WE"]
+    assert imported["Standup, daily"]["recurrence_pattern"]["interval"] == 2
+    assert imported["Review"]["location"] == "Room 4"
+
+
+def test_parse_vevent_handles_common_shapes():
+    lines = fold("DESCRIPTION:" + "x" * 100).rstrip("\r\n").split("\r\n")
+    record = parse_vevent([
+        "BEGIN:VEVENT",
+        "DTSTART;TZID=Europe/Berlin:20250701T100000",
+        "DURATION:PT1H30M",
+        "SUMMARY:Folded",
+        *lines,
+        "BEGIN:VALARM",
+        "SUMMARY:Alarm",
+        "END:VALARM",
+        "END:VEVENT",
+    ])
+    assert record["title"] == "Folded"
+    assert record["description"] == "x" * 100
+    assert record["start_time"] == datetime(2025, 7, 1, 8, 0)
+    assert record["end_time"] == datetime(2025, 7, 1, 9, 30)
+
+    all_day = parse_vevent(["BEGIN:VEVENT", "DTSTART;VALUE=DATE:20250704", "SUMMARY:Holiday", "END:VEVENT"])
+    assert all_day["end_time"] == datetime(2025, 7, 5)
+
+    with pytest.raises(ValueError, match="BYSETPOS"):
+        parse_vevent(["BEGIN:VEVENT", "DTSTART:20250701T100000Z", "RRULE:FREQ=MONTHLY;BYSETPOS=-1", "END:VEVENT"])
+
+
+@pytest.mark.asyncio
+async def test_read_ics_reports_bad_vevents_in_order():
+    async def chunks():
+        yield b"BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nDTSTART:2025070"
+        yield b"1T100000Z\r\nSUMMARY:One\r\nEND:VEVENT\r\nBEGIN:VEVENT\r\nSUMMARY:" + b"y" * 300
+        yield b"\r\nEND:VEVENT\r\nBEGIN:VEVENT\r\nSUMMARY:No start\r\nEND:VEVENT\r\n"
+        yield b"BEGIN:VEVENT\r\nDTSTART:20250702T100000Z\r\n"
+
+    records = [record async for record in read_ics(chunks(), IcsParser(workers=0, batch_size=2), max_record_bytes=200)]
+
+    assert [number for number, _, _ in records] == [1, 2, 3, 4]
+    assert records[0][1]["title"] == "One"
+    assert records[1][2] == "VEVENT is too large"
+    assert records[2][2] == "VEVENT without DTSTART"
+    assert records[3][2] == "VEVENT is not terminated"
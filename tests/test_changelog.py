@@ -0,0 +1,57 @@
+import pytest
+
+from app.db.models.event import FIELD_BITS
+from app.db.repositories.event import EventRepository
+
+
+
+@pytest.mark.asyncio
+async def test_versions_store_changed_fields_mask(api_client, make_user, make_event, db_session):
+    user, headers = await make_user("maskuser")
+
+    response = await api_client.post("/api/events", json=make_event("Planning", description="Quarterly planning", location="Room 1"), headers=headers)
+    assert response.status_code == 201
+    event_id = response.json()["id"]
+
+    response = await api_client.put(
+        f"/api/events/{event_id}",
+        json={"title": "Planning v2", "start_time": "2024-01-01T10:30:00"},
+        headers=headers
+    )
+    assert response.status_code == 200
+
+    version = await EventRepository().get_version(db_session, event_id=event_id, version_number=2)
+    assert version.changed_fields == FIELD_BITS["title"] | FIELD_BITS["start_time"]
+
+
+@pytest.mark.asyncio
+async def test_changelog_filters_by_field(api_client, make_user, make_event):
+    user, headers = await make_user("changeloguser")
+
+    response = await api_client.post("/api/events", json=make_event("Planning", description="Quarterly planning", location="Room 1"), headers=headers)
+    event_id = response.json()["id"]
+
+    await api_client.put(f"/api/events/{event_id}", json={"title": "Renamed"}, headers=headers)
+    await api_client.put(
+        f"/api/events/{event_id}",
+        json={"start_time": "2024-01-01T09:00:00"},
+        headers=headers
+    )
+    await api_client.put(f"/api/events/{event_id}", json={"location": "Room 2"}, headers=headers)
+
+    response = await api_client.get(
+        f"/api/events/{event_id}/changelog",
+        params={"field": "start_time"},
+        headers=headers
+    )
+    assert response.status_code == 200
+    changelog = response.json()
+    assert [entry["version_number"] for entry in changelog] == [3]
+    assert [change["field"] for change in changelog[0]["changes"]] == ["start_time"]
+
+    response = await api_client.get(
+        f"/api/events/{event_id}/changelog",
+        params={"field": "attendees"},
+        headers=headers
+    )
+    assert response.status_code == 400
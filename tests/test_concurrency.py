@@ -0,0 +1,145 @@
+import pytest
+
+from app.db.models.event import fields_from_mask
+from app.db.repositories.event import EventRepository
+
+
+
+@pytest.mark.asyncio
+async def test_if_match_compare_and_swap(api_client, make_user, make_event, db_session):
+    owner, headers = await make_user("casowner")
+
+    response = await api_client.post("/api/events", json=make_event(), headers=headers)
+    event_id = response.json()["id"]
+
+    response = await api_client.put(
+        f"/api/events/{event_id}",
+        json={"title": "Standup (moved)"},
+        headers={**headers, "If-Match": '"1"'}
+    )
+    assert response.status_code == 200
+    assert response.json()["current_version"] == 2
+    assert response.json()["title"] == "Standup (moved)"
+
+    # a second editor still holding version 1 must not overwrite the change
+    response = await api_client.put(
+        f"/api/events/{event_id}",
+        json={"title": "Lost update"},
+        headers={**headers, "If-Match": "1"}
+    )
+    assert response.status_code == 412
+
+    version = await EventRepository().get_version(db_session, event_id=event_id, version_number=2)
+    assert version.title == "Standup (moved)"
+    assert await EventRepository().get_version(db_session, event_id=event_id, version_number=3) is None
+
+
+@pytest.mark.asyncio
+async def test_if_match_records_only_fields_that_changed(api_client, make_user, make_event, db_session):
+    owner, headers = await make_user("casmask")
+    event = make_event(is_recurring=True, recurrence_pattern={"frequency": "weekly", "by_day": ["TH"]})
+
+    response = await api_client.post("/api/events", json=event, headers=headers)
+    event_id = response.json()["id"]
+
+    # a client sending its whole form back with only the location edited
+    response = await api_client.put(
+        f"/api/events/{event_id}",
+        json={**event, "location": "Room 2"},
+        headers={**headers, "If-Match": "1"}
+    )
+    assert response.status_code == 200
+
+    version = await EventRepository().get_version(db_session, event_id=event_id, version_number=2)
+    assert fields_from_mask(version.changed_fields) == ["location"]
+
+    response = await api_client.get(
+        f"/api/events/{event_id}/changelog",
+        params={"field": "title"},
+        headers=headers
+    )
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_if_match_reports_missing_and_forbidden(api_client, make_user, make_event):
+    owner, owner_headers = await make_user("casowner2")
+    other, other_headers = await make_user("casother")
+
+    response = await api_client.post("/api/events", json=make_event(), headers=owner_headers)
+    event_id = response.json()["id"]
+
+    response = await api_client.put(
+        f"/api/events/{event_id}",
+        json={"title": "Hijack"},
+        headers={**other_headers, "If-Match": "1"}
+    )
+    assert response.status_code == 403
+
+    response = await api_client.put(
+        "/api/events/does-not-exist",
+        json={"title": "Nothing"},
+        headers={**owner_headers, "If-Match": "1"}
+    )
+    assert response.status_code == 404
+
+    response = await api_client.put(
+        f"/api/events/{event_id}",
+        json={"title": "Bad header"},
+        headers={**owner_headers, "If-Match": "abc"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_single_event(api_client, make_user, make_event):
+    owner, headers = await make_user("etagowner")
+
+    response = await api_client.post("/api/events", json=make_event(), headers=headers)
+    event_id = response.json()["id"]
+
+    response = await api_client.get(f"/api/events/{event_id}", headers=headers)
+    etag = response.headers["ETag"]
+    assert etag == f'"{event_id}.1"'
+
+    response = await api_client.get(
+        f"/api/events/{event_id}",
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = await api_client.put(
+        f"/api/events/{event_id}",
+        json={"title": "Renamed"},
+        headers={**headers, "If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{event_id}.2"'
+
+    response = await api_client.get(
+        f"/api/events/{event_id}",
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_event_list(api_client, make_user, make_event):
+    owner, headers = await make_user("etaglist")
+
+    response = await api_client.post("/api/events", json=make_event(), headers=headers)
+    event_id = response.json()["id"]
+
+    response = await api_client.get("/api/events", headers=headers)
+    etag = response.headers["ETag"]
+
+    response = await api_client.get("/api/events", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    await api_client.put(f"/api/events/{event_id}", json={"title": "Changed"}, headers=headers)
+
+    response = await api_client.get("/api/events", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import event as sa_event
+
+from app.services.event_cache import event_cache
+from app.services.permission_cache import permission_cache
+
+
+# the separate query check_permission used to issue after the event had been loaded
+ROLE_LOOKUP = "SELECT event_permissions.role FROM event_permissions"
+
+
+@pytest.fixture
+def statements(session_factory):
+    """Collect the SQL statements executed against the test database."""
+    engine = session_factory.kw["bind"].sync_engine
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(" ".join(statement.split()))
+
+    sa_event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    sa_event.remove(engine, "before_cursor_execute", record)
+
+
+def reads_before_first_write(executed):
+    reads = []
+    for statement in executed:
+        if not statement.startswith("SELECT"):
+            break
+        reads.append(statement)
+    return reads
+
+
+@pytest.mark.asyncio
+async def test_event_routes_load_event_and_role_once(api_client, make_user, make_event, statements):
+    owner, headers = await make_user("accessowner")
+    viewer, _ = await make_user("accessviewer")
+
+    response = await api_client.post("/api/events", json=make_event("Review"), headers=headers)
+    event_id = response.json()["id"]
+    await api_client.put(f"/api/events/{event_id}", json={"title": "Review v2"}, headers=headers)
+
+    async def reads(method, url, **kwargs):
+        permission_cache.l1.clear()
+        event_cache.clear()
+        statements.clear()
+        response = await api_client.request(method, url, headers=kwargs.pop("headers", headers), **kwargs)
+        assert response.status_code < 300, response.text
+        return reads_before_first_write(statements)
+
+    # user lookup, the user's group ids, then event and role in one query, then whatever
+    # the route itself needs; GET /{event_id} reads through the caches instead
+    expected = {
+        ("GET", f"/api/events/{event_id}/history/1"): 4,
+        ("GET", f"/api/events/{event_id}/changelog"): 4,
+        ("GET", f"/api/events/{event_id}/diff/1/2"): 5,
+        ("GET", f"/api/events/{event_id}/permissions"): 4,
+        ("PUT", f"/api/events/{event_id}"): 3,
+        ("POST", f"/api/events/{event_id}/rollback/1"): 4,
+    }
+    for (method, url), count in expected.items():
+        kwargs = {"json": {"title": "Review v3"}} if method == "PUT" else {}
+        executed = await reads(method, url, **kwargs)
+        assert len(executed) == count, (method, url, executed)
+        assert sum("FROM events" in statement for statement in executed) == 1, (method, url)
+        assert not any(statement.startswith(ROLE_LOOKUP) for statement in executed), (method, url)
+
+    etag = (await api_client.get(f"/api/events/{event_id}", headers=headers)).headers["ETag"]
+    executed = await reads(
+        "PUT",
+        f"/api/events/{event_id}",
+        json={"title": "Review v4"},
+        headers={**headers, "If-Match": etag}
+    )
+    # a conditional write: only the user is read before the UPDATE
+    assert len(executed) == 1, executed
+    assert not any("FROM events" in statement for statement in executed)
+    assert statements[len(executed)].startswith("UPDATE events")
+
+    await api_client.post(
+        f"/api/events/{event_id}/share",
+        json={"users": [{"user_id": viewer.id, "role": "VIEWER"}]},
+        headers=headers
+    )
+    executed = await reads("DELETE", f"/api/events/{event_id}")
+    assert not any(statement.startswith(ROLE_LOOKUP) for statement in executed)
+
+
+@pytest.mark.asyncio
+async def test_event_routes_enforce_declared_minimum_role(api_client, make_user, make_event):
+    owner, owner_headers = await make_user("roleowner")
+    viewer, viewer_headers = await make_user("roleviewer")
+    stranger, stranger_headers = await make_user("rolestranger")
+
+    response = await api_client.post("/api/events", json=make_event("Review"), headers=owner_headers)
+    event_id = response.json()["id"]
+    await api_client.post(
+        f"/api/events/{event_id}/share",
+        json={"users": [{"user_id": viewer.id, "role": "VIEWER"}]},
+        headers=owner_headers
+    )
+
+    assert (await api_client.get(f"/api/events/{event_id}", headers=viewer_headers)).status_code == 200
+    assert (await api_client.get(f"/api/events/{event_id}/changelog", headers=viewer_headers)).status_code == 200
+    assert (await api_client.put(
+        f"/api/events/{event_id}", json={"title": "No"}, headers=viewer_headers
+    )).status_code == 403
+    assert (await api_client.post(f"/api/events/{event_id}/rollback/1", headers=viewer_headers)).status_code == 403
+    assert (await api_client.get(f"/api/events/{event_id}/permissions", headers=viewer_headers)).status_code == 403
+    assert (await api_client.delete(f"/api/events/{event_id}", headers=viewer_headers)).status_code == 403
+
+    assert (await api_client.get(f"/api/events/{event_id}", headers=stranger_headers)).status_code == 404
+    assert (await api_client.get(f"/api/events/{event_id}/changelog", headers=stranger_headers)).status_code == 403
+    assert (await api_client.get("/api/events/missing/changelog", headers=owner_headers)).status_code == 404
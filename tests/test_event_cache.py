@@ -0,0 +1,147 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fakeredis import aioredis
+from sqlalchemy import event as sa_event
+
+from app.core.cache import TwoTierCache
+from app.services.event_cache import EventCache
+
+
+
+def loader(values, calls, delay=0):
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return values.get("value")
+    return load
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = TwoTierCache("test")
+    calls = []
+    load = loader({"value": {"title": "Hot"}}, calls, delay=0.01)
+
+    results = await asyncio.gather(*(cache.get_or_load("hot", load) for _ in range(500)))
+
+    assert len(calls) == 1
+    assert all(result == {"title": "Hot"} for result in results)
+    assert cache.metrics()["coalesced"] == 499
+
+
+@pytest.mark.asyncio
+async def test_misses_are_cached_until_the_negative_ttl():
+    now = [0.0]
+    cache = TwoTierCache("test", ttl=300, negative_ttl=30, clock=lambda: now[0])
+    values, calls = {}, []
+
+    assert await cache.get_or_load("gone", loader(values, calls)) is None
+    assert await cache.get_or_load("gone", loader(values, calls)) is None
+    assert len(calls) == 1
+    assert cache.metrics()["negative_hits"] == 1
+
+    values["value"] = 1
+    now[0] = 31
+    assert await cache.get_or_load("gone", loader(values, calls)) == 1
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_workers_share_loads_through_redis():
+    client = aioredis.FakeRedis(decode_responses=True)
+    worker_a = TwoTierCache("test", client)
+    worker_b = TwoTierCache("test", client)
+    calls = []
+
+    assert await worker_a.get_or_load("key", loader({"value": [1, 2]}, calls)) == [1, 2]
+    assert await worker_b.get_or_load("key", loader({"value": [1, 2]}, calls)) == [1, 2]
+    assert await worker_b.get_or_load("missing", loader({}, calls)) is None
+    assert await worker_a.get_or_load("missing", loader({}, calls)) is None
+    assert len(calls) == 2
+    assert worker_b.metrics()["l2"]["hits"] == 1
+
+    await worker_a.delete("key")
+    assert await worker_b.get_or_load("key", loader({"value": [3]}, calls)) == [1, 2]
+    worker_b.l1.clear()
+    assert await worker_b.get_or_load("key", loader({"value": [3]}, calls)) == [3]
+
+    # an L2 hit only fills L1 and leaves the entry's expiry alone
+    await client.set(worker_a.key("short"), "[4]", ex=5)
+    assert await worker_b.get_or_load(worker_a.key("short"), loader({}, calls)) == [4]
+    assert 0 < await client.ttl(worker_a.key("short")) <= 5
+    assert worker_b.l1.get(worker_a.key("short")) == [4]
+
+
+@pytest.mark.asyncio
+async def test_get_event_reads_through_the_cache(api_client, make_user, make_event, session_factory):
+    owner, headers = await make_user("cachedowner")
+
+    response = await api_client.post("/api/events", json=make_event(), headers=headers)
+    event_id = response.json()["id"]
+    assert (await api_client.get(f"/api/events/{event_id}", headers=headers)).status_code == 200
+
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    sa_event.listen(engine, "before_cursor_execute", record)
+    response = await api_client.get(f"/api/events/{event_id}", headers=headers)
+    sa_event.remove(engine, "before_cursor_execute", record)
+
+    # only the user lookup of authentication reaches the database
+    assert response.status_code == 200
+    assert len(statements) == 1
+    assert response.json()["title"] == "Standup"
+    assert response.headers["ETag"].endswith('.1"')
+
+    await api_client.put(f"/api/events/{event_id}", json={"title": "Standup (moved)"}, headers=headers)
+    response = await api_client.get(f"/api/events/{event_id}", headers=headers)
+    assert response.json()["title"] == "Standup (moved)"
+    assert response.json()["current_version"] == 2
+
+    await api_client.delete(f"/api/events/{event_id}", headers=headers)
+    assert (await api_client.get(f"/api/events/{event_id}", headers=headers)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_shared_load_outlives_the_caller_that_started_it(api_client, make_user, make_event, session_factory):
+    owner, headers = await make_user("cachedcancel")
+    event_id = (await api_client.post("/api/events", json=make_event(), headers=headers)).json()["id"]
+    opened, release = asyncio.Event(), asyncio.Event()
+
+    @asynccontextmanager
+    async def gated_sessions():
+        opened.set()
+        await release.wait()
+        async with session_factory() as db:
+            yield db
+
+    cache = EventCache(session_factory=gated_sessions)
+    first = asyncio.ensure_future(cache.get(event_id))
+    await opened.wait()
+    second = asyncio.ensure_future(cache.get(event_id))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert (await second).title == "Standup"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert cache.metrics()["loads"] == 1
+    assert cache.metrics()["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_version_pointers_expire_from_redis_after_the_version_ttl(
+    api_client, make_user, make_event, session_factory
+):
+    owner, headers = await make_user("cachedpointer")
+    event_id = (await api_client.post("/api/events", json=make_event(), headers=headers)).json()["id"]
+    client = aioredis.FakeRedis(decode_responses=True)
+    cache = EventCache(client, ttl=300, version_ttl=5, session_factory=session_factory)
+
+    assert (await cache.get(event_id)).title == "Standup"
+
+    assert 0 < await client.ttl(cache.cache.key(event_id, "version")) <= 5
+    assert await client.ttl(cache.cache.key(event_id, 1)) > 5
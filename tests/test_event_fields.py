@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import event as sa_event
+
+from app.core.config import settings
+from app.db.repositories.event import EventRepository
+from app.schemas.event import Event as EventSchema
+from app.services.event_list_cache import event_list_cache
+
+
+# fields a calendar grid does not need
+DETAILS = {"description": "A long description " * 50, "recurrence_pattern": {"frequency": "weekly"}}
+
+
+async def create(api_client, headers, *events):
+    response = await api_client.post("/api/events/batch", json={"events": list(events)}, headers=headers)
+    assert response.status_code == 201, response.text
+    return [item["id"] for item in response.json()]
+
+
+def capture(session_factory):
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    listen = lambda conn, cursor, statement, *args: statements.append(statement)
+    sa_event.listen(engine, "before_cursor_execute", listen)
+    return statements, lambda: sa_event.remove(engine, "before_cursor_execute", listen)
+
+
+@pytest.mark.asyncio
+async def test_fields_select_only_requested_columns(api_client, make_user, make_event, session_factory):
+    event_list_cache.clear()
+    user, headers = await make_user("gridview")
+    await create(api_client, headers, make_event("Grid one", 1, **DETAILS), make_event("Grid two", 2, **DETAILS))
+
+    statements, stop = capture(session_factory)
+    response = await api_client.get(
+        "/api/events",
+        params={"fields": "title,start_time,end_time"},
+        headers=headers
+    )
+    stop()
+
+    assert response.status_code == 200, response.text
+    assert [sorted(item) for item in response.json()] == [
+        ["current_version", "end_time", "id", "start_time", "title"]
+    ] * 2
+    assert response.headers["ETag"]
+    event_selects = [statement for statement in statements if "FROM events" in statement]
+    assert event_selects and all("description" not in statement for statement in event_selects)
+
+    response = await api_client.get("/api/events", params={"fields": "title,secret"}, headers=headers)
+    assert response.status_code == 422
+    assert "secret" in response.json()["detail"]
+
+    response = await api_client.get("/api/events", headers=headers)
+    assert "description" in response.json()[0]
+
+
+@pytest.mark.asyncio
+async def test_ids_multi_get_resolves_accessible_events_in_order(
+    api_client, make_user, make_event, session_factory, monkeypatch
+):
+    owner, headers = await make_user("multiget")
+    other, other_headers = await make_user("multigetother")
+    first, second = await create(
+        api_client, headers, make_event("First", 3, **DETAILS), make_event("Second", 4, **DETAILS)
+    )
+    foreign, = await create(api_client, other_headers, make_event("Foreign", 5, **DETAILS))
+
+    statements, stop = capture(session_factory)
+    response = await api_client.get(
+        "/api/events",
+        params={"ids": f"{second},{foreign},missing,{first},{second}", "fields": "title"},
+        headers=headers
+    )
+    stop()
+
+    assert response.status_code == 200, response.text
+    assert [(item["id"], item["title"]) for item in response.json()] == [(second, "Second"), (first, "First")]
+    assert len([statement for statement in statements if "FROM events" in statement]) == 1
+
+    response = await api_client.get("/api/events", params={"ids": first}, headers=headers)
+    assert response.json()[0]["description"].startswith("A long description")
+
+    monkeypatch.setattr(settings, "EVENT_MULTI_GET_MAX_IDS", 2)
+    response = await api_client.get("/api/events", params={"ids": f"{first},{second},{foreign}"}, headers=headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_row_fast_path_matches_orm_serialization(api_client, make_user, make_event, db_session):
+    event_list_cache.clear()
+    user, headers = await make_user("fastpath")
+    await create(
+        api_client,
+        headers,
+        make_event("Plain", 6, **DETAILS),
+        {**make_event("Recurring", 7, **DETAILS), "is_recurring": True, "location": "Hall",
+         "recurrence_pattern": {"frequency": "monthly", "by_month_day": [7], "count": 3}}
+    )
+
+    response = await api_client.get("/api/events", headers=headers)
+
+    events = await EventRepository().get_events_for_user(db_session, user_id=user.id)
+    assert response.json() == [EventSchema.model_validate(item).model_dump(mode="json") for item in events]
+    assert response.json()[1]["recurrence_pattern"]["interval"] == 1
+
+
+@pytest.mark.asyncio
+async def test_projected_pages_do_not_share_the_full_page_etag(api_client, make_user, make_event):
+    event_list_cache.clear()
+    user, headers = await make_user("projected")
+    first, second = await create(api_client, headers, make_event("One", 8), make_event("Two", 9))
+
+    for params in ({}, {"limit": 1000}):
+        projected = await api_client.get("/api/events", params={**params, "fields": "title"}, headers=headers)
+        full = await api_client.get(
+            "/api/events", params=params, headers={**headers, "If-None-Match": projected.headers["ETag"]}
+        )
+        assert full.status_code == 200
+        assert full.headers["ETag"] != projected.headers["ETag"]
+        assert "description" in full.json()[0]
+
+    by_ids = await api_client.get("/api/events", params={"ids": f"{first},{second}"}, headers=headers)
+    page = await api_client.get("/api/events", headers={**headers, "If-None-Match": by_ids.headers["ETag"]})
+    assert page.status_code == 200
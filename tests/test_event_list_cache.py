@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import event as sa_event
+
+from app.services.event_list_cache import EventListCache, event_list_cache
+
+
+@pytest.fixture
+def statements(session_factory):
+    engine = session_factory.kw["bind"].sync_engine
+    executed = []
+    record = lambda conn, cursor, statement, *args: executed.append(statement)
+    sa_event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    sa_event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.mark.asyncio
+async def test_repeated_pages_only_load_the_user(api_client, make_user, make_event, statements):
+    owner, headers = await make_user("listowner")
+    await api_client.post("/api/events", json=make_event("Planning"), headers=headers)
+    params = {"start_date": "2024-01-01T00:00:00", "end_date": "2024-01-31T00:00:00", "limit": 20}
+
+    first = await api_client.get("/api/events", params=params, headers=headers)
+    statements.clear()
+    hits = event_list_cache.metrics()["l1"]["hits"]
+    second = await api_client.get("/api/events", params=params, headers=headers)
+
+    assert second.json() == first.json()
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert len(statements) == 1
+    assert event_list_cache.metrics()["l1"]["hits"] == hits + 1
+
+    statements.clear()
+    response = await api_client.get(
+        "/api/events", params=params, headers={**headers, "If-None-Match": first.headers["ETag"]}
+    )
+    assert response.status_code == 304
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_visible_changes_bump_the_generation(api_client, make_user, make_event):
+    owner, owner_headers = await make_user("genowner")
+    viewer, viewer_headers = await make_user("genviewer")
+
+    async def titles(headers):
+        response = await api_client.get("/api/events", headers=headers)
+        return [item["title"] for item in response.json()]
+
+    response = await api_client.post("/api/events", json=make_event("Retro"), headers=owner_headers)
+    event_id = response.json()["id"]
+    assert await titles(owner_headers) == ["Retro"]
+    assert await titles(viewer_headers) == []
+
+    await api_client.post(
+        f"/api/events/{event_id}/share",
+        json={"users": [{"user_id": viewer.id, "role": "VIEWER"}]},
+        headers=owner_headers
+    )
+    assert await titles(viewer_headers) == ["Retro"]
+
+    await api_client.put(f"/api/events/{event_id}", json={"title": "Retro (moved)"}, headers=owner_headers)
+    assert await titles(owner_headers) == ["Retro (moved)"]
+    assert await titles(viewer_headers) == ["Retro (moved)"]
+
+    await api_client.delete(f"/api/events/{event_id}/permissions/{viewer.id}", headers=owner_headers)
+    assert await titles(viewer_headers) == []
+
+    await api_client.post("/api/events", json=make_event("Demo", 2),
+                          headers=owner_headers)
+    assert await titles(owner_headers) == ["Retro (moved)", "Demo"]
+
+
+@pytest.mark.asyncio
+async def test_large_pages_bypass_the_cache(session_factory):
+    cache = EventListCache(max_size=1, max_page=10, session_factory=session_factory)
+    calls = []
+
+    async def load(db):
+        calls.append(db)
+        return []
+
+    for _ in range(2):
+        await cache.get_page(user_id="u", generation=0, skip=0, limit=50, start_date=None, end_date=None, load=load)
+    assert len(calls) == 2
+    assert cache.metrics()["bypassed"] == 2
+
+    for generation in (0, 0, 1):
+        await cache.get_page(
+            user_id="u", generation=generation, skip=0, limit=10, start_date=None, end_date=None, load=load
+        )
+    assert len(calls) == 4
+    assert cache.metrics()["l1"]["size"] == 1
@@ -0,0 +1,177 @@
+import pytest
+from sqlalchemy import event as sa_event, func, select
+
+from app.db.models.event import EventPermission
+from app.db.repositories.permission import PermissionRepository
+
+
+
+@pytest.mark.asyncio
+async def test_event_shared_with_group_is_visible_to_its_members(api_client, make_user, make_event, db_session):
+    owner, owner_headers = await make_user("groupowner")
+    alice, alice_headers = await make_user("groupalice")
+    bob, bob_headers = await make_user("groupbob")
+    carol, carol_headers = await make_user("groupcarol")
+
+    response = await api_client.post(
+        "/api/groups",
+        json={"name": "Team", "member_ids": [alice.id, bob.id]},
+        headers=owner_headers
+    )
+    assert response.status_code == 201
+    group_id = response.json()["id"]
+
+    response = await api_client.post("/api/events", json=make_event("Offsite"), headers=owner_headers)
+    event_id = response.json()["id"]
+    response = await api_client.post(
+        f"/api/events/{event_id}/share",
+        json={"groups": [{"group_id": group_id, "role": "VIEWER"}]},
+        headers=owner_headers
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["group_id"] == group_id
+
+    # one row for the owner and one for the whole group
+    result = await db_session.execute(
+        select(func.count()).select_from(EventPermission).where(EventPermission.event_id == event_id)
+    )
+    assert result.scalar() == 2
+    assert set(await PermissionRepository().get_user_ids_by_event(db_session, event_id=event_id)) == {
+        owner.id, alice.id, bob.id
+    }
+
+    assert (await api_client.get(f"/api/events/{event_id}", headers=alice_headers)).status_code == 200
+    assert (await api_client.get(f"/api/events/{event_id}", headers=carol_headers)).status_code == 404
+    assert (await api_client.put(
+        f"/api/events/{event_id}", json={"title": "No"}, headers=alice_headers
+    )).status_code == 403
+
+    # a direct share on top of the group one: the higher role wins and the event is listed once
+    await api_client.post(
+        f"/api/events/{event_id}/share",
+        json={"users": [{"user_id": alice.id, "role": "EDITOR"}]},
+        headers=owner_headers
+    )
+    response = await api_client.get("/api/events", headers=alice_headers)
+    assert [event["id"] for event in response.json()] == [event_id]
+    assert (await api_client.put(
+        f"/api/events/{event_id}", json={"title": "Offsite (agenda)"}, headers=alice_headers
+    )).status_code == 200
+
+    # membership changes apply right away
+    await api_client.post(f"/api/groups/{group_id}/members", json={"user_ids": [carol.id]}, headers=owner_headers)
+    assert (await api_client.get(f"/api/events/{event_id}", headers=carol_headers)).status_code == 200
+
+    response = await api_client.delete(f"/api/groups/{group_id}/members/{bob.id}", headers=owner_headers)
+    assert response.status_code == 204
+    assert (await api_client.get(f"/api/events/{event_id}", headers=bob_headers)).status_code == 404
+    response = await api_client.get("/api/sync", headers=bob_headers)
+    assert [(tombstone["event_id"], tombstone["change_type"]) for tombstone in response.json()["tombstones"]] == [
+        (event_id, "revoked")
+    ]
+
+    response = await api_client.delete(f"/api/events/{event_id}/groups/{group_id}", headers=owner_headers)
+    assert response.status_code == 204
+    assert (await api_client.get(f"/api/events/{event_id}", headers=carol_headers)).status_code == 404
+    assert (await api_client.get(f"/api/events/{event_id}", headers=alice_headers)).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_direct_share_keeps_group_access_in_sync(api_client, make_user, make_event):
+    owner, owner_headers = await make_user("bothowner")
+    member, member_headers = await make_user("bothmember")
+    response = await api_client.post(
+        "/api/groups",
+        json={"name": "Readers", "member_ids": [member.id]},
+        headers=owner_headers
+    )
+    group_id = response.json()["id"]
+    response = await api_client.post("/api/events", json=make_event("Offsite"), headers=owner_headers)
+    event_id = response.json()["id"]
+    await api_client.post(
+        f"/api/events/{event_id}/share",
+        json={
+            "users": [{"user_id": member.id, "role": "EDITOR"}],
+            "groups": [{"group_id": group_id, "role": "VIEWER"}]
+        },
+        headers=owner_headers
+    )
+    cursor = (await api_client.get("/api/sync", headers=member_headers)).json()["cursor"]
+
+    response = await api_client.delete(f"/api/events/{event_id}/permissions/{member.id}", headers=owner_headers)
+    assert response.status_code == 204
+    assert (await api_client.get(f"/api/events/{event_id}", headers=member_headers)).status_code == 200
+
+    response = await api_client.get("/api/sync", params={"cursor": cursor}, headers=member_headers)
+    assert response.json()["tombstones"] == []
+    assert [event["id"] for event in response.json()["events"]] == [event_id]
+
+    await api_client.delete(f"/api/events/{event_id}/groups/{group_id}", headers=owner_headers)
+    response = await api_client.get("/api/sync", params={"cursor": cursor}, headers=member_headers)
+    assert [(tombstone["event_id"], tombstone["change_type"]) for tombstone in response.json()["tombstones"]] == [
+        (event_id, "revoked")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_group_ids_are_resolved_once_per_request(api_client, make_user, make_event, session_factory):
+    owner, owner_headers = await make_user("onceowner")
+    member, member_headers = await make_user("oncemember")
+
+    response = await api_client.post(
+        "/api/groups",
+        json={"name": "Editors", "member_ids": [member.id]},
+        headers=owner_headers
+    )
+    group_id = response.json()["id"]
+    response = await api_client.post("/api/events", json=make_event("Offsite"), headers=owner_headers)
+    event_id = response.json()["id"]
+    await api_client.post(
+        f"/api/events/{event_id}/share",
+        json={"groups": [{"group_id": group_id, "role": "EDITOR"}]},
+        headers=owner_headers
+    )
+
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    sa_event.listen(engine, "before_cursor_execute", record)
+
+    # authorization, the conflict check and the compare-and-swap all need the member's groups
+    response = await api_client.put(
+        f"/api/events/{event_id}",
+        json={"start_time": "2024-01-01T11:00:00", "end_time": "2024-01-01T12:00:00"},
+        headers={**member_headers, "If-Match": "1"}
+    )
+    sa_event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    lookups = [statement for statement in statements if statement.startswith("SELECT group_memberships.group_id")]
+    assert len(lookups) == 1
+
+
+@pytest.mark.asyncio
+async def test_only_the_group_creator_manages_members(api_client, make_user):
+    owner, owner_headers = await make_user("manageowner")
+    member, member_headers = await make_user("managemember")
+
+    response = await api_client.post(
+        "/api/groups",
+        json={"name": "Closed", "member_ids": [member.id]},
+        headers=owner_headers
+    )
+    group_id = response.json()["id"]
+
+    response = await api_client.get("/api/groups", headers=member_headers)
+    assert [group["id"] for group in response.json()] == [group_id]
+    response = await api_client.get(f"/api/groups/{group_id}/members", headers=member_headers)
+    assert response.json() == [member.id]
+
+    response = await api_client.post(
+        f"/api/groups/{group_id}/members", json={"user_ids": [owner.id]}, headers=member_headers
+    )
+    assert response.status_code == 403
+    response = await api_client.post(
+        f"/api/groups/{group_id}/members", json={"user_ids": ["nobody"]}, headers=owner_headers
+    )
+    assert response.status_code == 404
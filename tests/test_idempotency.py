@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from fakeredis import aioredis
+from sqlalchemy import event as sa_event, func, select
+
+from app.db.models.event import Event
+from app.services.idempotency import IdempotencyStore, response_adapter
+
+
+
+async def count_events(db_session, title):
+    result = await db_session.execute(select(func.count()).select_from(Event).where(Event.title == title))
+    return result.scalar()
+
+
+@pytest.mark.asyncio
+async def test_retries_replay_the_stored_response(api_client, make_user, make_event, session_factory, db_session):
+    owner, headers = await make_user("idemowner")
+    headers = {**headers, "Idempotency-Key": "create-flight-1"}
+    flight = make_event("Flight")
+
+    first = await api_client.post("/api/events", json=flight, headers=headers)
+    assert first.status_code == 201
+    assert "Idempotency-Replayed" not in first.headers
+
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    sa_event.listen(engine, "before_cursor_execute", record)
+    retry = await api_client.post("/api/events", json=flight, headers=headers)
+    sa_event.remove(engine, "before_cursor_execute", record)
+
+    assert retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotency-Replayed"] == "true"
+    # only the user lookup of authentication
+    assert len(statements) == 1
+    assert await count_events(db_session, "Flight") == 1
+
+    response = await api_client.post("/api/events", json={**flight, "title": "Train"}, headers=headers)
+    assert response.status_code == 422
+
+    # keys are scoped per endpoint: the batch runs and hits the event created above
+    response = await api_client.post("/api/events/batch", json={"events": [flight]}, headers=headers)
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_the_first_request(api_client, make_user, make_event, db_session):
+    owner, headers = await make_user("idemracer")
+    headers = {**headers, "Idempotency-Key": "batch-1"}
+    batch = {"events": [
+        make_event("Leg 1", 1),
+        make_event("Leg 2", 2),
+    ]}
+
+    responses = await asyncio.gather(*(
+        api_client.post("/api/events/batch", json=batch, headers=headers) for _ in range(5)
+    ))
+
+    assert {response.status_code for response in responses} == {201}
+    assert len({tuple(event["id"] for event in response.json()) for response in responses}) == 1
+    assert await count_events(db_session, "Leg 1") == 1
+
+
+@pytest.mark.asyncio
+async def test_workers_share_responses_through_redis():
+    client = aioredis.FakeRedis(decode_responses=True)
+    worker_a = IdempotencyStore(client, poll_interval=0.01)
+    worker_b = IdempotencyStore(client, poll_interval=0.01)
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"id": len(calls)}
+
+    async def run(store):
+        return await store.run(
+            user_id="alice", scope="create", key="k", payload={"a": 1},
+            handler=handler, response_type=dict, status_code=201
+        )
+
+    first, second = await asyncio.gather(run(worker_a), run(worker_b))
+
+    assert len(calls) == 1
+    assert first[:2] == second[:2] == (201, {"id": 1})
+    assert sorted([first[2], second[2]]) == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_handler_runs_in_the_task_of_the_request_that_claimed_the_key():
+    store = IdempotencyStore()
+    started = asyncio.Event()
+    tasks = []
+
+    async def handler():
+        tasks.append(asyncio.current_task())
+        started.set()
+        await asyncio.sleep(0.05)
+        return {"id": len(tasks)}
+
+    async def run():
+        return await store.run(
+            user_id="alice", scope="create", key="k", payload={"a": 1},
+            handler=handler, response_type=dict, status_code=201
+        )
+
+    first = asyncio.ensure_future(run())
+    await started.wait()
+    second = asyncio.ensure_future(run())
+    await asyncio.sleep(0)
+    # the first request goes away mid-handler: the duplicate runs the handler itself
+    first.cancel()
+
+    assert await second == (201, {"id": 2}, False)
+    assert tasks == [first, second]
+    assert await run() == (201, {"id": 2}, True)
+    assert response_adapter(dict) is response_adapter(dict)
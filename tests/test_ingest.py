@@ -0,0 +1,142 @@
+import json
+from datetime import datetime, timezone
+
+import msgpack
+import pytest
+from sqlalchemy import event as sa_event, func, select
+
+from app.core.config import settings
+from app.db.models.event import Event, EventChange, EventPermission, EventVersion
+from app.db.models.outbox import OutboxMessage
+from app.services.event_ingest import read_ndjson
+
+
+def results(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def count(db_session, model, *where):
+    result = await db_session.execute(select(func.count()).select_from(model).where(*where))
+    return result.scalar()
+
+
+@pytest.mark.asyncio
+async def test_ndjson_ingest_streams_chunk_results(api_client, make_user, make_event, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "EVENT_INGEST_CHUNK_SIZE", 3)
+    user, headers = await make_user("ingester")
+    lines = [json.dumps(make_event(f"Imported {day}", day)) for day in range(1, 8)]
+    lines[1] = json.dumps({"title": "No times"})
+    lines[4] = "{not json"
+    body = "\n".join(lines[:3]) + "\n\n" + "\n".join(lines[3:]) + "\n"
+
+    response = await api_client.post(
+        "/api/events/ingest",
+        content=body.encode(),
+        headers={**headers, "Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    *chunks, summary = results(response)
+    assert [chunk["records"] for chunk in chunks] == [3, 3, 1]
+    assert [item["record"] for item in chunks[0]["events"]] == [1, 3]
+    assert [error["record"] for error in chunks[0]["errors"]] == [2]
+    assert "start_time" in chunks[0]["errors"][0]["detail"]
+    assert chunks[1]["errors"][0]["record"] == 6
+    assert chunks[1]["errors"][0]["detail"].startswith("Invalid JSON")
+    assert summary == {"done": True, "chunks": 3, "records": 7, "created": 5, "failed": 2}
+
+    event_ids = [item["id"] for chunk in chunks for item in chunk["events"]]
+    assert await count(db_session, Event, Event.id.in_(event_ids)) == 5
+    assert await count(db_session, EventPermission, EventPermission.event_id.in_(event_ids)) == 5
+    assert await count(db_session, EventVersion, EventVersion.event_id.in_(event_ids)) == 5
+    assert await count(db_session, EventChange, EventChange.user_id == user.id) == 5
+    assert await count(db_session, OutboxMessage, OutboxMessage.topic == "event_created") == 5
+
+    response = await api_client.get("/api/events", headers=headers)
+    assert sorted(event["title"] for event in response.json()) == [
+        "Imported 1", "Imported 3", "Imported 4", "Imported 6", "Imported 7"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_msgpack_ingest_writes_each_chunk_in_constant_statements(
+    api_client, make_user, session_factory, monkeypatch
+):
+    monkeypatch.setattr(settings, "EVENT_INGEST_CHUNK_SIZE", 50)
+    user, headers = await make_user("packer")
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    listen = lambda conn, cursor, statement, *args: statements.append(statement)
+
+    async def ingest(records):
+        statements.clear()
+        sa_event.listen(engine, "before_cursor_execute", listen)
+        try:
+            response = await api_client.post(
+                "/api/events/ingest",
+                content=b"".join(msgpack.packb(item, datetime=True) for item in records),
+                headers={**headers, "Content-Type": "application/msgpack"}
+            )
+        finally:
+            sa_event.remove(engine, "before_cursor_execute", listen)
+        assert response.status_code == 200, response.text
+        return results(response)[-1], len(statements)
+
+    start = datetime(2025, 4, 1, 9, tzinfo=timezone.utc)
+    packed = {"title": "Packed", "start_time": start, "end_time": start.replace(hour=10)}
+    few_summary, few = await ingest([packed] * 2)
+    many_summary, many = await ingest([packed] * 50)
+
+    assert few_summary["created"] == 2
+    assert many_summary["created"] == 50
+    assert many == few
+
+
+@pytest.mark.asyncio
+async def test_ingest_rejects_bad_streams(api_client, make_user, make_event, monkeypatch):
+    user, headers = await make_user("badstream")
+
+    response = await api_client.post(
+        "/api/events/ingest",
+        content=json.dumps([make_event("Listed", 1)]).encode(),
+        headers={**headers, "Content-Type": "application/json"}
+    )
+    assert response.status_code == 422
+
+    truncated = msgpack.packb(make_event("Whole", 1)) + msgpack.packb(make_event("Cut off", 2))[:10]
+    response = await api_client.post(
+        "/api/events/ingest",
+        content=truncated,
+        headers={**headers, "Content-Type": "application/msgpack"}
+    )
+    *chunks, summary = results(response)
+    assert summary["done"] is False
+    assert summary["created"] == 1
+    assert "record 2" in summary["error"]
+
+    monkeypatch.setattr(settings, "EVENT_INGEST_CHUNK_SIZE", 10)
+    response = await api_client.post(
+        "/api/events/ingest",
+        content=(json.dumps(make_event("Early", 3)) + "\n" + json.dumps(make_event("Overlap", 3)) + "\n").encode(),
+        params={"check_conflicts": "true"},
+        headers={**headers, "Content-Type": "application/x-ndjson"}
+    )
+    chunk, summary = results(response)
+    assert summary["created"] == 0
+    assert [error["record"] for error in chunk["errors"]] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_reader_buffers_one_line_at_a_time():
+    async def chunks():
+        yield b'{"a": 1}\n{"b"'
+        yield b': 2}\n' + b'x' * 40
+        yield b'y' * 40 + b'\n{"c": 3}'
+
+    records = [item async for item in read_ndjson(chunks(), max_record_bytes=64)]
+
+    assert records[0] == (1, {"a": 1}, None)
+    assert records[1] == (2, {"b": 2}, None)
+    assert records[2][0] == 3 and records[2][2] == "Record exceeds 64 bytes"
+    assert records[3] == (4, {"c": 3}, None)
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+
+from app.db.models.event import EventPermission
+from app.services.notification import NotificationService
+from app.services.outbox import OutboxDispatcher
+
+
+@pytest.mark.asyncio
+async def test_burst_of_updates_becomes_one_notification_per_recipient(session_factory):
+    async with session_factory() as db:
+        db.add_all([
+            EventPermission(event_id="event-1", user_id=user_id, role="EDITOR")
+            for user_id in ("alice", "bob", "carol")
+        ])
+        await db.commit()
+
+    service = NotificationService(coalesce_window=0.05)
+
+    async with session_factory() as db:
+        for version in range(2, 7):
+            await service.notify_event_updated(
+                event_id="event-1",
+                event_title=f"Draft {version}",
+                updater_id="alice",
+                version=version,
+                db=db
+            )
+
+    assert await service.get_notifications("bob") == []
+    await asyncio.sleep(0.1)
+
+    for user_id in ("alice", "bob", "carol"):
+        [notification] = await service.get_notifications(user_id)
+        assert notification["updates"] == 5
+        assert (notification["version_from"], notification["version_to"]) == (2, 6)
+        assert notification["message"] == "Event 'Draft 6' was updated 5 times"
+
+    assert service.metrics()["coalescing"]["received_total"] == 15
+    assert service.metrics()["coalescing"]["written_total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_delete_flushes_pending_updates_first(session_factory):
+    async with session_factory() as db:
+        db.add(EventPermission(event_id="event-1", user_id="bob", role="VIEWER"))
+        await db.commit()
+
+    service = NotificationService(coalesce_window=10)
+
+    async with session_factory() as db:
+        await service.notify_event_updated(
+            event_id="event-1", event_title="Review", updater_id="alice", version=2, db=db
+        )
+        await service.notify_event_deleted(
+            event_id="event-1", event_title="Review", deleter_id="alice", affected_users=["bob"], db=db
+        )
+
+    assert [n["type"] for n in await service.get_notifications("bob")] == ["event_updated", "event_deleted"]
+    assert service.coalescer.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_coalesced_updates_stay_in_outbox_until_written(api_client, make_user, session_factory):
+    owner, headers = await make_user("coalesceowner")
+    response = await api_client.post(
+        "/api/events",
+        json={"title": "Plan", "start_time": "2024-05-01T10:00:00", "end_time": "2024-05-01T11:00:00"},
+        headers=headers
+    )
+    event_id = response.json()["id"]
+    for version in range(2, 5):
+        await api_client.put(f"/api/events/{event_id}", json={"title": f"Plan v{version}"}, headers=headers)
+
+    # a process that dies inside the window never writes its merged notification
+    crashed = NotificationService(coalesce_window=10)
+    dispatcher = OutboxDispatcher(session_factory=session_factory)
+    crashed.subscribe_to(dispatcher)
+    assert await dispatcher.drain_once() == 4
+    assert await dispatcher.drain_once() == 0
+    assert (await dispatcher.metrics())["pending"] == 3
+    for task in [*crashed.coalescer._timers.values(), *dispatcher._unacknowledged.values()]:
+        task.cancel()
+
+    # after a restart the updates are delivered again and only then marked processed
+    service = NotificationService(coalesce_window=0.05)
+    dispatcher = OutboxDispatcher(session_factory=session_factory)
+    service.subscribe_to(dispatcher)
+    assert await dispatcher.drain_once() == 3
+    assert (await dispatcher.metrics())["unacknowledged"] == 3
+    await dispatcher.wait_acknowledged()
+
+    metrics = await dispatcher.metrics()
+    assert (metrics["pending"], metrics["delivered_total"]) == (0, 3)
+    [notification] = await service.get_notifications(owner.id)
+    assert (notification["version_from"], notification["version_to"]) == (2, 4)
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import pytest
+from fakeredis import aioredis
+
+from app.services.notification import NotificationService
+from app.services.notification_push import NotificationBroker
+from app.services.notification_store import DatabaseNotificationStore, RedisNotificationStore
+
+
+def make_notification(message):
+    return {"type": "event_updated", "event_id": "event-1", "timestamp": message, "message": message}
+
+
+def parse_event(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return fields["id"], json.loads(fields["data"])
+
+
+async def next_event(stream, timeout=2):
+    return await asyncio.wait_for(stream.__anext__(), timeout=timeout)
+
+
+@pytest.mark.asyncio
+async def test_stream_pushes_heartbeats_and_resumes_from_last_event_id():
+    service = NotificationService()
+    broker = NotificationBroker(service, heartbeat_interval=0.05)
+
+    stream = broker.stream("alice")
+    pending = asyncio.create_task(next_event(stream))
+    await asyncio.sleep(0.01)
+    await service._send_notification("alice", make_notification("first"))
+
+    event_id, data = parse_event(await pending)
+    assert data["message"] == "first"
+    assert await next_event(stream) == ": heartbeat\n\n"
+
+    await stream.aclose()
+    assert broker.metrics()["connections"] == 0
+
+    await service._send_many([("alice", make_notification(f"missed {i}")) for i in range(2)])
+
+    stream = broker.stream("alice", last_event_id=event_id)
+    replayed = [parse_event(await next_event(stream))[1]["message"] for _ in range(2)]
+    assert replayed == ["missed 0", "missed 1"]
+    await stream.aclose()
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_stream_drops_slow_consumer():
+    service = NotificationService()
+    broker = NotificationBroker(service, max_pending=2, heartbeat_interval=1)
+
+    slow = broker.stream("alice")
+    fast = broker.stream("alice")
+    pending = asyncio.gather(next_event(slow), next_event(fast))
+    await asyncio.sleep(0.01)
+
+    await service._send_notification("alice", make_notification("one"))
+    await pending
+
+    await service._send_many([("alice", make_notification(f"burst {i}")) for i in range(2)])
+    assert [parse_event(await next_event(fast))[1]["message"] for _ in range(2)] == ["burst 0", "burst 1"]
+
+    await service._send_notification("alice", make_notification("two"))
+
+    assert await next_event(slow) == "event: overflow\ndata: {}\n\n"
+    assert broker.metrics()["dropped_total"] >= 1
+    await fast.aclose()
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_stream_receives_notifications_through_redis_pubsub():
+    client = aioredis.FakeRedis(decode_responses=True)
+    service = NotificationService(store=RedisNotificationStore(client))
+    broker = NotificationBroker(service, heartbeat_interval=1)
+
+    stream = broker.stream("alice")
+    pending = asyncio.create_task(next_event(stream))
+    await asyncio.sleep(0.1)
+
+    await service._send_notification("alice", make_notification("via redis"))
+    await service._send_notification("bob", make_notification("not for alice"))
+
+    event_id, data = parse_event(await pending)
+    assert data["message"] == "via redis"
+    assert event_id == (await service.get_notifications("alice"))[0]["id"]
+    await stream.aclose()
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_stream_polls_database_for_all_connections_at_once(session_factory):
+    service = NotificationService(store=DatabaseNotificationStore(session_factory=session_factory))
+    broker = NotificationBroker(service, heartbeat_interval=1, poll_interval=0.01)
+
+    alice = broker.stream("alice")
+    bob = broker.stream("bob")
+    pending = asyncio.gather(next_event(alice), next_event(bob))
+    await asyncio.sleep(0.1)
+
+    await service._send_many([
+        ("alice", make_notification("for alice")),
+        ("bob", make_notification("for bob")),
+    ])
+
+    alice_event, bob_event = await pending
+    assert parse_event(alice_event)[1]["message"] == "for alice"
+    assert parse_event(bob_event)[1]["message"] == "for bob"
+    await alice.aclose()
+    await bob.aclose()
+    await broker.stop()
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import pytest
+from fakeredis import aioredis
+
+from app.services.notification import NotificationService
+from app.services.notification_store import (
+    InMemoryNotificationStore,
+    RedisNotificationStore,
+    DatabaseNotificationStore
+)
+
+
+def make_notification(message):
+    return {"type": "event_updated", "event_id": "event-1", "timestamp": message, "message": message}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_memory_store_ring_buffer_overwrites_and_counts_unread():
+    store = InMemoryNotificationStore(max_per_user=3)
+
+    stored = await store.add_many([("alice", make_notification(f"update {i}")) for i in range(5)])
+    assert [n["message"] for n in await store.get("alice")] == ["update 2", "update 3", "update 4"]
+    assert await store.unread_count("alice") == 3
+
+    await store.mark_read("alice", stored[0]["id"])
+    await store.mark_read("alice", stored[3]["id"])
+    await store.mark_read("alice", stored[3]["id"])
+    assert await store.unread_count("alice") == 2
+
+    await store.add_many([("alice", make_notification("update 5"))])
+    assert [n["read"] for n in await store.get("alice")] == [True, False, False]
+    assert await store.unread_count("alice") == 2
+
+    await store.mark_read("alice")
+    assert await store.unread_count("alice") == 0
+    assert store.metrics()["notifications"] == 3
+
+
+@pytest.mark.asyncio
+async def test_memory_store_expires_and_evicts_idle_users():
+    clock = FakeClock()
+    store = InMemoryNotificationStore(max_per_user=10, ttl_seconds=60, max_total=4, clock=clock)
+
+    await store.add_many([("alice", make_notification("old"))])
+    clock.now = 30
+    await store.add_many([("alice", make_notification("new")), ("bob", make_notification("hi"))])
+    clock.now = 61
+    assert [n["message"] for n in await store.get("alice")] == ["new"]
+    assert await store.unread_count("alice") == 1
+
+    await store.add_many([("carol", make_notification(f"c{i}")) for i in range(2)])
+    await store.add_many([("dave", make_notification("d"))])
+
+    assert "bob" not in store.buffers
+    assert set(store.buffers) == {"alice", "carol", "dave"}
+    assert store.metrics()["evicted_users_total"] == 1
+    assert store.metrics()["expired_total"] == 1
+    assert store.total == 4
+
+
+@pytest.mark.asyncio
+async def test_redis_store_keeps_capped_streams_and_separate_read_state():
+    client = aioredis.FakeRedis(decode_responses=True)
+    service = NotificationService(store=RedisNotificationStore(client, max_per_user=3))
+    assert service.backend == "redis"
+
+    await service._send_many([
+        (user_id, make_notification(f"update {i}"))
+        for i in range(5)
+        for user_id in ("alice", "bob")
+    ])
+
+    notifications = await service.get_notifications("alice")
+    assert [n["message"] for n in notifications] == ["update 2", "update 3", "update 4"]
+    ids = [n["id"] for n in notifications]
+    assert ids == sorted(ids, key=lambda i: tuple(map(int, i.split("-"))))
+    assert not any(n["read"] for n in notifications)
+
+    await service.mark_as_read("alice", ids[1])
+    assert [n["read"] for n in await service.get_notifications("alice")] == [False, True, False]
+
+    await service.mark_as_read("alice")
+    await service._send_notification("alice", make_notification("update 5"))
+    assert [n["read"] for n in await service.get_notifications("alice")] == [True, True, False]
+
+    assert not any(n["read"] for n in await service.get_notifications("bob"))
+    assert await client.ttl(RedisNotificationStore.stream_key("alice")) > 0
+
+
+@pytest.mark.asyncio
+async def test_redis_store_counts_unread_exactly_under_races_and_trimming():
+    client = aioredis.FakeRedis(decode_responses=True)
+    store = RedisNotificationStore(client, max_per_user=3)
+
+    stored = await store.add_many([("alice", make_notification(f"update {i}")) for i in range(3)])
+    ids = [notification["id"] for notification in stored]
+    await asyncio.gather(*(store.mark_read_many("alice", ids[:2]) for _ in range(5)))
+    assert await store.unread_count("alice") == 1
+
+    # trimming drops one read and one unread notification
+    await store.add_many([("alice", make_notification(f"update {i}")) for i in range(3, 5)])
+    assert [n["message"] for n in await store.get("alice")] == ["update 2", "update 3", "update 4"]
+    assert await store.unread_count("alice") == 3
+    assert await client.smembers(RedisNotificationStore.read_key("alice")) == set()
+
+    await store.mark_read_many("alice", [ids[0], ids[2]])
+    assert await store.unread_count("alice") == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_store_publishes_notifications_with_their_ids():
+    client = aioredis.FakeRedis(decode_responses=True)
+    store = RedisNotificationStore(client)
+
+    pubsub = client.pubsub()
+    await pubsub.subscribe(RedisNotificationStore.channel("alice"))
+    await pubsub.get_message(timeout=1)
+
+    [stored] = await store.add_many([("alice", make_notification("hello"))])
+    message = await pubsub.get_message(timeout=1)
+    await pubsub.close()
+
+    assert json.loads(message["data"]) == stored
+    assert stored["id"] == (await store.get("alice"))[0]["id"]
+
+
+@pytest.mark.asyncio
+async def test_database_store_bulk_inserts_and_pages_by_id(session_factory):
+    store = DatabaseNotificationStore(session_factory=session_factory, max_per_user=3)
+    service = NotificationService(store=store)
+    assert service.backend == "database"
+
+    await service._send_many([
+        (user_id, make_notification(f"update {i}"))
+        for i in range(5)
+        for user_id in ("alice", "bob")
+    ])
+
+    newest = await store.get("alice")
+    assert [n["message"] for n in newest] == ["update 2", "update 3", "update 4"]
+
+    first_page = await store.get("alice", after="0", limit=2)
+    assert [n["message"] for n in first_page] == ["update 0", "update 1"]
+    next_page = await store.get("alice", after=first_page[-1]["id"], limit=2)
+    assert [n["message"] for n in next_page] == ["update 2", "update 3"]
+
+    await service.mark_as_read("alice", first_page[0]["id"])
+    await service.mark_as_read("alice", "not-an-id")
+    assert await store.unread_count("alice") == 4
+
+    await service.mark_as_read("alice")
+    assert await store.unread_count("alice") == 0
+    assert await store.unread_count("bob") == 5
+
+
+@pytest.fixture(params=["in-memory", "redis", "database"])
+def any_store(request, session_factory):
+    if request.param == "redis":
+        return RedisNotificationStore(aioredis.FakeRedis(decode_responses=True), max_per_user=10)
+    if request.param == "database":
+        return DatabaseNotificationStore(session_factory=session_factory, max_per_user=10)
+    return InMemoryNotificationStore(max_per_user=10)
+
+
+@pytest.mark.asyncio
+async def test_stores_page_by_increasing_ids_and_maintain_unread_counts(any_store):
+    service = NotificationService(store=any_store)
+    await service._send_many([("alice", make_notification(f"update {i}")) for i in range(6)])
+    await service._send_notification("bob", make_notification("other user"))
+
+    newest = await service.get_notifications("alice", limit=2)
+    assert [n["message"] for n in newest] == ["update 4", "update 5"]
+
+    first = await service.get_notifications("alice", limit=3, after="0")
+    assert [n["message"] for n in first] == ["update 0", "update 1", "update 2"]
+    rest = await service.get_notifications("alice", after=first[-1]["id"])
+    assert [n["message"] for n in rest] == ["update 3", "update 4", "update 5"]
+    assert len({n["id"] for n in first + rest}) == 6
+    assert await service.get_notifications("alice", after=rest[-1]["id"]) == []
+
+    assert await service.get_unread_count("alice") == 6
+    await service.mark_many_as_read("alice", [first[0]["id"], first[1]["id"], first[1]["id"], "bogus"])
+    assert await service.get_unread_count("alice") == 4
+    await service.mark_as_read("alice", first[0]["id"])
+    assert await service.get_unread_count("alice") == 4
+
+    read = [n["read"] for n in await service.get_notifications("alice")]
+    assert read == [True, True, False, False, False, False]
+
+    await service.mark_as_read("alice")
+    assert await service.get_unread_count("alice") == 0
+    await service._send_notification("alice", make_notification("after mark all"))
+    assert await service.get_unread_count("alice") == 1
+    assert await service.get_unread_count("bob") == 1
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+
+from app.db.models.event import EventPermission
+from app.services.notification import NotificationService
+from app.services.notification_worker import NotificationWorkerPool
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_keeps_per_event_order(session_factory):
+    pool = NotificationWorkerPool(session_factory=session_factory, workers=3, queue_size=1)
+    delivered = []
+
+    async def notify(event_id, step, delay, db):
+        await asyncio.sleep(delay)
+        delivered.append((event_id, step))
+
+    futures = []
+    for step in range(5):
+        for event_id, delay in (("a", 0.003), ("b", 0.0), ("c", 0.001)):
+            futures.append(await pool.submit(event_id, notify, {"event_id": event_id, "step": step, "delay": delay}))
+    await asyncio.gather(*futures)
+    await pool.stop()
+
+    for event_id in ("a", "b", "c"):
+        assert [step for key, step in delivered if key == event_id] == list(range(5))
+    assert pool.metrics()["completed_total"] == 15
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_fans_out_update_with_own_session(session_factory):
+    async with session_factory() as db:
+        db.add_all([
+            EventPermission(event_id="event-1", user_id=f"user-{i}", role="VIEWER")
+            for i in range(250)
+        ])
+        await db.commit()
+
+    service = NotificationService()
+    pool = NotificationWorkerPool(session_factory=session_factory, workers=2)
+
+    await pool.run(
+        "event-1",
+        service.notify_event_updated,
+        {"event_id": "event-1", "event_title": "All hands", "updater_id": "user-0", "version": 2}
+    )
+    await pool.stop()
+
+    assert len(service.store.buffers) == 250
+    assert all(buffer.size == 1 for buffer in service.store.buffers.values())
+    [notification] = await service.get_notifications("user-0")
+    assert notification["message"] == "You updated the event: All hands"
@@ -0,0 +1,36 @@
+import pytest
+
+from app.services.notification import notification_service
+
+
+@pytest.mark.asyncio
+async def test_incremental_fetch_unread_count_and_bulk_mark_read(api_client, make_user):
+    user, headers = await make_user("notified")
+    await notification_service._send_many([
+        (user.id, {"type": "event_updated", "event_id": "event-1", "timestamp": "", "message": f"update {i}"})
+        for i in range(4)
+    ])
+
+    response = await api_client.get("/api/notifications", params={"limit": 2, "after": "0"}, headers=headers)
+    page = response.json()
+    assert [n["message"] for n in page] == ["update 0", "update 1"]
+
+    response = await api_client.get("/api/notifications", params={"after": page[-1]["id"]}, headers=headers)
+    assert [n["message"] for n in response.json()] == ["update 2", "update 3"]
+
+    response = await api_client.get("/api/notifications/unread_count", headers=headers)
+    assert response.json() == {"unread": 4}
+
+    response = await api_client.post(
+        "/api/notifications/read",
+        json={"ids": [n["id"] for n in page]},
+        headers=headers
+    )
+    assert response.status_code == 204
+    response = await api_client.get("/api/notifications/unread_count", headers=headers)
+    assert response.json() == {"unread": 2}
+
+    response = await api_client.post("/api/notifications/read", headers=headers)
+    assert response.status_code == 204
+    response = await api_client.get("/api/notifications/unread_count", headers=headers)
+    assert response.json() == {"unread": 0}
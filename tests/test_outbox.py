@@ -0,0 +1,64 @@
+import pytest
+
+from app.services.outbox import OutboxDispatcher
+
+
+
+@pytest.mark.asyncio
+async def test_outbox_delivers_committed_changes_once(api_client, make_user, make_event, session_factory):
+    owner, headers = await make_user("outboxowner")
+    member, _ = await make_user("outboxmember")
+
+    response = await api_client.post("/api/events", json=make_event("Retro"), headers=headers)
+    event_id = response.json()["id"]
+    await api_client.post(
+        f"/api/events/{event_id}/share",
+        json={"users": [{"user_id": member.id, "role": "VIEWER"}]},
+        headers=headers
+    )
+    await api_client.put(f"/api/events/{event_id}", json={"title": "Retro v2"}, headers=headers)
+
+    delivered = []
+
+    async def record(payload, db):
+        delivered.append(payload)
+
+    dispatcher = OutboxDispatcher(session_factory=session_factory)
+    for topic in ("event_created", "event_updated", "permissions_shared"):
+        dispatcher.subscribe(topic, record)
+
+    assert (await dispatcher.metrics())["pending"] == 3
+    assert await dispatcher.drain_once() == 3
+    assert [payload["event_id"] for payload in delivered] == [event_id] * 3
+    assert delivered[2]["version"] == 2
+
+    # processed messages are not redelivered
+    assert await dispatcher.drain_once() == 0
+    metrics = await dispatcher.metrics()
+    assert metrics["pending"] == 0
+    assert metrics["delivered_total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_outbox_retries_failed_deliveries(api_client, make_user, make_event, session_factory):
+    owner, headers = await make_user("outboxretry")
+    await api_client.post("/api/events", json=make_event("Retro"), headers=headers)
+
+    attempts = []
+
+    async def flaky(payload, db):
+        attempts.append(payload)
+        if len(attempts) == 1:
+            raise RuntimeError("subscriber unavailable")
+
+    dispatcher = OutboxDispatcher(session_factory=session_factory)
+    dispatcher.subscribe("event_created", flaky)
+
+    await dispatcher.drain_once()
+    assert (await dispatcher.metrics())["pending"] == 1
+
+    await dispatcher.drain_once()
+    metrics = await dispatcher.metrics()
+    assert metrics["pending"] == 0
+    assert metrics["failed_total"] == 1
+    assert len(attempts) == 2
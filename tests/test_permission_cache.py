@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from fakeredis import aioredis
+
+from app.services.permission_cache import PermissionCache, permission_cache
+
+
+def loader(roles, calls):
+    async def load():
+        calls.append(1)
+        return roles.get("role")
+    return load
+
+
+@pytest.mark.asyncio
+async def test_cache_shares_roles_and_denials_between_workers_through_redis():
+    client = aioredis.FakeRedis(decode_responses=True)
+    worker_a = PermissionCache(client, l1_ttl=0.05)
+    worker_b = PermissionCache(client, l1_ttl=0.05)
+    roles, calls = {"role": "EDITOR"}, []
+
+    assert await worker_a.get_role("event-1", "alice", loader(roles, calls)) == "EDITOR"
+    assert await worker_a.get_role("event-1", "alice", loader(roles, calls)) == "EDITOR"
+    assert await worker_b.get_role("event-1", "alice", loader(roles, calls)) == "EDITOR"
+    assert len(calls) == 1
+    assert worker_a.metrics()["l1"]["hits"] == 1
+    assert worker_b.metrics()["l2"]["hits"] == 1
+
+    assert await worker_a.get_role("event-1", "mallory", loader({}, calls)) is None
+    assert await worker_b.get_role("event-1", "mallory", loader({}, calls)) is None
+    assert len(calls) == 2
+
+    roles["role"] = "VIEWER"
+    await worker_a.invalidate("event-1")
+    assert await worker_a.get_role("event-1", "alice", loader(roles, calls)) == "VIEWER"
+
+    await asyncio.sleep(0.06)
+    assert await worker_b.get_role("event-1", "alice", loader(roles, calls)) == "VIEWER"
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_l1_is_bounded():
+    cache = PermissionCache(max_size=2)
+    for user_id in ("a", "b", "c"):
+        await cache.set("event-1", user_id, "VIEWER")
+    assert cache.metrics()["l1"]["size"] == 2
+    assert cache.metrics()["l1"]["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_permission_writes_invalidate_the_cache(api_client, make_user):
+    owner, owner_headers = await make_user("cacheowner")
+    member, member_headers = await make_user("cachemember")
+
+    response = await api_client.post(
+        "/api/events",
+        json={"title": "Cached", "start_time": "2024-05-01T10:00:00", "end_time": "2024-05-01T11:00:00"},
+        headers=owner_headers
+    )
+    event_id = response.json()["id"]
+
+    loads = permission_cache.loads
+    response = await api_client.put(f"/api/events/{event_id}", json={"title": "Owner edit"}, headers=owner_headers)
+    assert response.status_code == 200
+    assert permission_cache.loads == loads
+
+    await api_client.post(
+        f"/api/events/{event_id}/share",
+        json={"users": [{"user_id": member.id, "role": "VIEWER"}]},
+        headers=owner_headers
+    )
+    response = await api_client.put(f"/api/events/{event_id}", json={"title": "Member edit"}, headers=member_headers)
+    assert response.status_code == 403
+
+    response = await api_client.put(
+        f"/api/events/{event_id}/permissions/{member.id}",
+        params={"role": "EDITOR"},
+        headers=owner_headers
+    )
+    assert response.status_code == 200
+    response = await api_client.put(f"/api/events/{event_id}", json={"title": "Member edit"}, headers=member_headers)
+    assert response.status_code == 200
+
+    await api_client.delete(f"/api/events/{event_id}/permissions/{member.id}", headers=owner_headers)
+    response = await api_client.get(f"/api/events/{event_id}", headers=member_headers)
+    assert response.status_code == 404
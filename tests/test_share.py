@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import event as sa_event, func, select
+
+from app.db.models.event import EventPermission
+from app.db.models.outbox import OutboxMessage
+from app.services.notification import NotificationService
+
+
+
+@pytest.mark.asyncio
+async def test_share_upserts_all_users_in_constant_statements(api_client, make_user, make_event, session_factory, db_session):
+    owner, headers = await make_user("shareowner")
+    team = [(await make_user(f"teammate{i}"))[0] for i in range(12)]
+
+    response = await api_client.post("/api/events", json=make_event("All hands"), headers=headers)
+    event_id = response.json()["id"]
+
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    sa_event.listen(engine, "before_cursor_execute", record)
+
+    async def share(users):
+        statements.clear()
+        response = await api_client.post(
+            f"/api/events/{event_id}/share",
+            json={"users": [{"user_id": user.id, "role": role} for user, role in users]},
+            headers=headers
+        )
+        return response, len(statements)
+
+    response, few = await share([(user, "VIEWER") for user in team[:2]])
+    assert response.status_code == 200
+    response, many = await share([(user, "VIEWER") for user in team[2:]])
+    assert response.status_code == 200
+    assert len(response.json()) == 10
+    assert many == few
+
+    # sharing again changes roles in place
+    response, _ = await share([(user, "EDITOR") for user in team[:5]])
+    assert {permission["role"] for permission in response.json()} == {"EDITOR"}
+    sa_event.remove(engine, "before_cursor_execute", record)
+
+    result = await db_session.execute(
+        select(EventPermission.role, func.count()).where(EventPermission.event_id == event_id)
+        .group_by(EventPermission.role)
+    )
+    assert dict(result.all()) == {"OWNER": 1, "EDITOR": 5, "VIEWER": 7}
+
+    result = await db_session.execute(
+        select(func.count()).select_from(OutboxMessage).where(OutboxMessage.topic == "permissions_shared")
+    )
+    assert result.scalar() == 3
+
+    response = await api_client.post(
+        f"/api/events/{event_id}/share",
+        json={"users": [{"user_id": team[0].id, "role": "OWNER"}, {"user_id": "nobody", "role": "VIEWER"}]},
+        headers=headers
+    )
+    assert response.status_code == 404
+    assert "nobody" in response.json()["detail"]
+    response = await api_client.get(f"/api/events/{event_id}/permissions", headers=headers)
+    assert {p["role"] for p in response.json() if p["user_id"] == team[0].id} == {"EDITOR"}
+
+
+@pytest.mark.asyncio
+async def test_bulk_share_notifies_each_user_and_the_changer_once():
+    service = NotificationService()
+
+    await service.notify_permissions_shared(
+        event_id="event-1",
+        event_title="All hands",
+        roles={"alice": "VIEWER", "bob": "EDITOR", "owner": "OWNER"},
+        changer_id="owner",
+        db=None
+    )
+
+    assert (await service.get_notifications("bob"))[0]["role"] == "EDITOR"
+    assert (await service.get_notifications("alice"))[0]["role"] == "VIEWER"
+    changer = await service.get_notifications("owner")
+    assert len(changer) == 1
+    assert changer[0]["type"] == "permissions_shared"
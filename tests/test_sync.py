@@ -0,0 +1,140 @@
+import os
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models.event import EventChange
+from app.db.repositories.change import ChangeRepository, CHANGE_CREATED
+from app.db.repositories.user import UserRepository
+from app.schemas.user import UserCreate
+
+
+@pytest.mark.asyncio
+async def test_sync_returns_changes_and_tombstones(api_client, make_user, make_event):
+    owner, owner_headers = await make_user("syncowner")
+    member, member_headers = await make_user("syncmember")
+
+    response = await api_client.post("/api/events", json=make_event("Kickoff", 1), headers=owner_headers)
+    kickoff_id = response.json()["id"]
+    response = await api_client.post("/api/events", json=make_event("Review", 2), headers=owner_headers)
+    review_id = response.json()["id"]
+
+    for event_id in (kickoff_id, review_id):
+        response = await api_client.post(
+            f"/api/events/{event_id}/share",
+            json={"users": [{"user_id": member.id, "role": "VIEWER"}]},
+            headers=owner_headers
+        )
+        assert response.status_code == 200
+
+    response = await api_client.get("/api/sync", headers=member_headers)
+    assert response.status_code == 200
+    first = response.json()
+    assert {event["id"] for event in first["events"]} == {kickoff_id, review_id}
+    assert first["tombstones"] == []
+
+    response = await api_client.get("/api/sync", params={"cursor": first["cursor"]}, headers=member_headers)
+    assert response.json()["events"] == []
+    assert response.json()["cursor"] == first["cursor"]
+
+    await api_client.put(f"/api/events/{kickoff_id}", json={"title": "Kickoff v2"}, headers=owner_headers)
+    await api_client.delete(f"/api/events/{review_id}", headers=owner_headers)
+
+    response = await api_client.get("/api/sync", params={"cursor": first["cursor"]}, headers=member_headers)
+    second = response.json()
+    assert [event["title"] for event in second["events"]] == ["Kickoff v2"]
+    assert [(t["event_id"], t["change_type"]) for t in second["tombstones"]] == [(review_id, "deleted")]
+    assert second["cursor"] > first["cursor"]
+
+    response = await api_client.delete(
+        f"/api/events/{kickoff_id}/permissions/{member.id}",
+        headers=owner_headers
+    )
+    assert response.status_code == 204
+
+    response = await api_client.get("/api/sync", params={"cursor": second["cursor"]}, headers=member_headers)
+    third = response.json()
+    assert third["events"] == []
+    assert [(t["event_id"], t["change_type"]) for t in third["tombstones"]] == [(kickoff_id, "revoked")]
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_with_has_more(api_client, make_user, make_event):
+    owner, headers = await make_user("syncpager")
+
+    for day in range(1, 4):
+        await api_client.post("/api/events", json=make_event(f"Event {day}", day), headers=headers)
+
+    response = await api_client.get("/api/sync", params={"limit": 2}, headers=headers)
+    page = response.json()
+    assert len(page["events"]) == 2
+    assert page["has_more"] is True
+
+    response = await api_client.get("/api/sync", params={"cursor": page["cursor"], "limit": 2}, headers=headers)
+    page = response.json()
+    assert len(page["events"]) == 1
+    assert page["has_more"] is False
+
+
+async def write_change(db, user_id, event_id):
+    await db.execute(insert(EventChange), [{"event_id": event_id, "user_id": user_id, "change_type": CHANGE_CREATED}])
+
+
+@pytest.mark.asyncio
+async def test_sync_serves_a_change_committed_after_the_cursor_was_read(
+    api_client, make_user, make_event, session_factory
+):
+    owner, headers = await make_user("synclate")
+    response = await api_client.post("/api/events", json=make_event("Early", 5), headers=headers)
+    event_id = response.json()["id"]
+    first = (await api_client.get("/api/sync", headers=headers)).json()
+
+    async with session_factory() as writer:
+        await write_change(writer, owner.id, event_id)
+        pending = (await api_client.get("/api/sync", params={"cursor": first["cursor"]}, headers=headers)).json()
+        await writer.commit()
+    assert pending["events"] == [] and pending["cursor"] == first["cursor"]
+
+    response = await api_client.get("/api/sync", params={"cursor": pending["cursor"]}, headers=headers)
+    assert [event["id"] for event in response.json()["events"]] == [event_id]
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_POSTGRES_URL"), reason="set TEST_POSTGRES_URL to a postgresql+asyncpg URL")
+@pytest.mark.asyncio
+async def test_sync_holds_back_changes_behind_a_running_transaction_on_postgres():
+    engine = create_async_engine(os.environ["TEST_POSTGRES_URL"])
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    change_repo = ChangeRepository()
+
+    try:
+        async with session_factory() as db:
+            user = await UserRepository().create(
+                db,
+                obj_in=UserCreate(username="syncpg", email="syncpg@example.com", password="testpass123")
+            )
+
+        # the first writer takes the lower seq but commits after the second one
+        async with session_factory() as first, session_factory() as second:
+            await write_change(first, user.id, "event-a")
+            await write_change(second, user.id, "event-b")
+            await second.commit()
+
+            async with session_factory() as reader:
+                assert await change_repo.get_changes_since(reader, user_id=user.id) == []
+                assert await change_repo.get_latest_seq(reader, user_id=user.id) == 0
+            await first.commit()
+
+        async with session_factory() as reader:
+            changes = await change_repo.get_changes_since(reader, user_id=user.id)
+            assert [change.event_id for change in changes] == ["event-a", "event-b"]
+            assert await change_repo.get_changes_since(reader, user_id=user.id, cursor=changes[-1].seq) == []
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()